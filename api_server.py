@@ -4,23 +4,56 @@ FastAPI Server for N8N Workflow Documentation
 High-performance API with sub-100ms response times.
 """
 
+import time
+
+# Taken before the heavy imports so STARTUP_PROFILE can report their cost
+_startup_clock = time.perf_counter()
+
 from fastapi import FastAPI, HTTPException, Query, BackgroundTasks, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
+from fastapi.responses import (
+    HTMLResponse,
+    FileResponse,
+    JSONResponse,
+    StreamingResponse,
+)
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, field_validator
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable
+import asyncio
 import json
+import mimetypes
 import os
 import re
+import zlib
 import urllib.parse
 from pathlib import Path
-import uvicorn
-import time
 from collections import defaultdict
 
-from workflow_db import WorkflowDatabase
+from workflow_db import (
+    GRAPH_METRIC_COLUMNS,
+    ResultCache,
+    WorkflowDatabase,
+    normalize_query,
+)
+from search_suggest import TRIE_TOP_K, SuggestionIndex
+
+# Startup profiling: set STARTUP_PROFILE=1 to print per-phase timings
+STARTUP_PROFILE = os.environ.get("STARTUP_PROFILE", "").lower() in ("true", "1", "yes")
+startup_timings: List[tuple] = []
+
+
+def record_startup_phase(phase: str):
+    """Record the time spent since the previous startup phase."""
+    global _startup_clock
+    now = time.perf_counter()
+    startup_timings.append((phase, (now - _startup_clock) * 1000))
+    _startup_clock = now
+
+
+record_startup_phase("imports")
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -55,8 +88,57 @@ app.add_middleware(
     allow_headers=["Content-Type", "Authorization"],  # Security fix: Restrict headers
 )
 
-# Initialize database
-db = WorkflowDatabase()
+# Initialize database lazily: the schema check runs on first use, not at import
+db = WorkflowDatabase(lazy=True)
+suggestion_index = SuggestionIndex(db)
+related_index = None
+
+
+def get_related_index():
+    """The related-workflows index, created on first use so numpy stays out of startup."""
+    global related_index
+    if related_index is None:
+        from workflow_similarity import RelatedWorkflowsIndex
+
+        related_index = RelatedWorkflowsIndex(db.db_path)
+    return related_index
+
+
+class SingleFlight:
+    """Coalesces concurrent identical requests into one in-flight computation.
+
+    The first caller for a key starts the work in the threadpool; callers
+    arriving before it finishes await the same task and share its result (or
+    exception). A caller disconnecting does not cancel the shared work.
+    """
+
+    def __init__(self):
+        self.in_flight: Dict[Any, asyncio.Future] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def run(self, key: Any, func: Callable, *args) -> Any:
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(run_in_threadpool(func, *args))
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self.in_flight),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+        }
+
+
+request_coalescer = SingleFlight()
+
+record_startup_phase("app and middleware setup")
 
 
 # Security: Helper function for rate limiting
@@ -136,20 +218,91 @@ def validate_filename(filename: str) -> bool:
     return True
 
 
+# Build-time compressed siblings (see scripts/precompress_static.py), best first
+PRECOMPRESSED_ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+
+def get_accepted_encodings(request: Request) -> set:
+    """Parse Accept-Encoding into the set of encodings the client accepts."""
+    accepted = set()
+    for token in request.headers.get("accept-encoding", "").split(","):
+        parts = [part.strip() for part in token.split(";")]
+        if not parts[0]:
+            continue
+        if any(part.replace(" ", "") in ("q=0", "q=0.0") for part in parts[1:]):
+            continue
+        accepted.add(parts[0].lower())
+    return accepted
+
+
+def precompressed_file_response(
+    request: Request, file_path: Path, media_type: Optional[str] = None
+) -> FileResponse:
+    """Serve a .br/.gz sibling of file_path when the client accepts it.
+
+    The compressed bytes are streamed from disk as-is; because the response
+    already declares a Content-Encoding, GZipMiddleware passes it through
+    instead of compressing it again. Siblings older than the source file are
+    ignored so a stale build never serves outdated content.
+    """
+    if media_type is None:
+        media_type = mimetypes.guess_type(file_path.name)[0] or "text/plain"
+
+    accepted = get_accepted_encodings(request)
+    source_mtime = file_path.stat().st_mtime
+    for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+        if encoding not in accepted:
+            continue
+        sibling = file_path.with_name(file_path.name + suffix)
+        if sibling.is_file() and sibling.stat().st_mtime >= source_mtime:
+            return FileResponse(
+                str(sibling),
+                media_type=media_type,
+                headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+            )
+
+    # GZipMiddleware handles (and adds Vary for) the uncompressed fallback
+    return FileResponse(str(file_path), media_type=media_type)
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that prefers build-time .br/.gz siblings."""
+
+    async def get_response(self, path: str, scope):
+        response = await super().get_response(path, scope)
+        if isinstance(response, FileResponse) and response.status_code == 200:
+            return precompressed_file_response(
+                Request(scope), Path(response.path), response.media_type
+            )
+        return response
+
+
 # Startup function to verify database
 @app.on_event("startup")
 async def startup_event():
     """Verify database connectivity on startup."""
     try:
-        stats = db.get_stats()
-        if stats["total"] == 0:
+        if db.ensure_schema():
+            print("🔄 Database schema initialized")
+        record_startup_phase("schema check")
+
+        total = db.get_workflow_count()
+        record_startup_phase("workflow count")
+        if total == 0:
             print("⚠️  Warning: No workflows found in database. Run indexing first.")
         else:
-            print(f"✅ Database connected: {stats['total']} workflows indexed")
+            print(f"✅ Database connected: {total} workflows indexed")
     except Exception as e:
         print(f"❌ Database connection failed: {e}")
         raise
 
+    if STARTUP_PROFILE:
+        print("⏱️  Startup profile:")
+        for phase, elapsed_ms in startup_timings:
+            print(f"   {phase:<28} {elapsed_ms:8.1f} ms")
+        total_ms = sum(elapsed_ms for _, elapsed_ms in startup_timings)
+        print(f"   {'total':<28} {total_ms:8.1f} ms")
+
 
 # Response models
 class WorkflowSummary(BaseModel):
@@ -165,6 +318,7 @@ class WorkflowSummary(BaseModel):
     tags: List[str] = []
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
+    graph: Dict[str, int] = {}  # Structural metrics, see GRAPH_METRIC_COLUMNS
 
     class Config:
         # Allow conversion of int to bool for active field
@@ -186,6 +340,7 @@ class SearchResponse(BaseModel):
     pages: int
     query: str
     filters: Dict[str, Any]
+    corrected_query: Optional[str] = None  # Set when typos were corrected
 
 
 class StatsResponse(BaseModel):
@@ -200,7 +355,7 @@ class StatsResponse(BaseModel):
 
 
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Serve the main documentation page."""
     static_dir = Path("static")
     index_file = static_dir / "index.html"
@@ -216,7 +371,7 @@ async def root():
         </body></html>
         """
         )
-    return FileResponse(str(index_file))
+    return precompressed_file_response(request, index_file, "text/html")
 
 
 @app.get("/health")
@@ -243,18 +398,65 @@ async def search_workflows(
     active_only: bool = Query(False, description="Show only active workflows"),
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
+    node_types: str = Query(
+        "",
+        description="Comma-separated node types the workflow must all contain, "
+        "e.g. n8n-nodes-base.code,splitInBatches",
+    ),
+    min_depth: Optional[int] = Query(None, ge=0, description="Minimum graph depth"),
+    max_depth: Optional[int] = Query(None, ge=0, description="Maximum graph depth"),
+    min_fan_out: Optional[int] = Query(None, ge=0, description="Minimum fan-out"),
+    max_fan_out: Optional[int] = Query(None, ge=0, description="Maximum fan-out"),
+    min_branches: Optional[int] = Query(
+        None, ge=0, description="Minimum branching nodes"
+    ),
+    max_branches: Optional[int] = Query(
+        None, ge=0, description="Maximum branching nodes"
+    ),
+    has_cycles: Optional[bool] = Query(None, description="Workflows with loops"),
+    has_error_handling: Optional[bool] = Query(
+        None, description="Workflows with error outputs or an Error Trigger"
+    ),
+    has_disconnected: Optional[bool] = Query(
+        None, description="Workflows with unconnected nodes"
+    ),
+    sort: str = Query(
+        "relevance",
+        pattern=f"^(relevance|{'|'.join(GRAPH_METRIC_COLUMNS)})$",
+        description="relevance, or a graph metric to sort by",
+    ),
+    order: str = Query("desc", pattern="^(asc|desc)$", description="Sort order"),
 ):
     """Search and filter workflows with pagination."""
     try:
         offset = (page - 1) * per_page
 
-        workflows, total = db.search_workflows(
-            query=q,
-            trigger_filter=trigger,
-            complexity_filter=complexity,
-            active_only=active_only,
-            limit=per_page,
-            offset=offset,
+        def presence(flag: Optional[bool]) -> tuple:
+            return (None, None) if flag is None else ((1, None) if flag else (None, 0))
+
+        filters = {
+            "trigger_filter": trigger,
+            "complexity_filter": complexity,
+            "active_only": active_only,
+            "limit": per_page,
+            "offset": offset,
+            "node_types": [t.strip() for t in node_types.split(",") if t.strip()],
+            "metric_ranges": {
+                "depth": (min_depth, max_depth),
+                "fan_out": (min_fan_out, max_fan_out),
+                "branches": (min_branches, max_branches),
+                "cycles": presence(has_cycles),
+                "error_paths": presence(has_error_handling),
+                "disconnected": presence(has_disconnected),
+            },
+            "sort_by": "" if sort == "relevance" else sort,
+            "sort_desc": order == "desc",
+        }
+
+        # Identical searches arriving together (a shared link) run once
+        workflows, total, corrected_query = await request_coalescer.run(
+            ("search", normalize_query(q), repr(sorted(filters.items()))),
+            lambda: db.search_with_fallback(query=q, **filters),
         )
 
         # Convert to Pydantic models with error handling
@@ -275,6 +477,10 @@ async def search_workflows(
                     "tags": workflow.get("tags", []),
                     "created_at": workflow.get("created_at"),
                     "updated_at": workflow.get("updated_at"),
+                    "graph": {
+                        metric: workflow.get(column, 0)
+                        for metric, column in GRAPH_METRIC_COLUMNS.items()
+                    },
                 }
                 workflow_summaries.append(WorkflowSummary(**clean_workflow))
             except Exception as e:
@@ -297,14 +503,247 @@ async def search_workflows(
                 "trigger": trigger,
                 "complexity": complexity,
                 "active_only": active_only,
+                "node_types": filters["node_types"],
+                "graph": {
+                    metric: bounds
+                    for metric, bounds in filters["metric_ranges"].items()
+                    if bounds != (None, None)
+                },
+                "sort": sort,
+                "order": order,
             },
+            corrected_query=corrected_query,
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error searching workflows: {str(e)}"
         )
 
 
+@app.get("/api/node-types")
+async def get_node_types(
+    q: str = Query("", description="Only node types containing this text"),
+):
+    """Node type usage across the indexed workflows."""
+    try:
+        node_types = db.get_node_type_counts(q)
+        return {"node_types": node_types, "count": len(node_types)}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error fetching node types: {str(e)}"
+        )
+
+
+@app.get("/api/suggest")
+async def suggest(
+    q: str = Query("", description="Partial query typed so far"),
+    limit: int = Query(10, ge=1, le=TRIE_TOP_K, description="Maximum suggestions"),
+):
+    """Typeahead completions for workflow names, integrations and categories."""
+    try:
+        return {"query": q, "suggestions": suggestion_index.suggest(q, limit)}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error fetching suggestions: {str(e)}"
+        )
+
+
+@app.get("/api/cache-stats")
+async def get_cache_stats():
+    """Hit/miss counters of the in-process caches and request coalescing."""
+    return {
+        "index_generation": db.get_index_generation(),
+        "search": db.result_cache.stats(),
+        "facets": facet_cache.stats(),
+        "coalescing": request_coalescer.stats(),
+    }
+
+
+# Facet counts per normalized query, filters and index state
+FACET_CACHE_SIZE = 256
+facet_cache = ResultCache(max_size=FACET_CACHE_SIZE)
+category_lookup_cache: Dict[str, Any] = {"mtime": None, "mappings": {}}
+
+
+def get_category_lookup() -> Optional[Dict[str, str]]:
+    """Filename -> category from context/search_categories.json, reloaded on change."""
+    search_categories_file = Path("context/search_categories.json")
+    if not search_categories_file.exists():
+        return None
+
+    mtime = search_categories_file.stat().st_mtime
+    if category_lookup_cache["mtime"] != mtime:
+        with open(search_categories_file, "r", encoding="utf-8") as f:
+            search_data = json.load(f)
+        category_lookup_cache["mappings"] = {
+            item["filename"]: item.get("category") or "Uncategorized"
+            for item in search_data
+            if item.get("filename")
+        }
+        category_lookup_cache["mtime"] = mtime
+    return category_lookup_cache["mappings"]
+
+
+@app.get("/api/workflows/facets")
+async def get_workflow_facets(
+    q: str = Query("", description="Search query"),
+    trigger: str = Query("all", description="Filter by trigger type"),
+    complexity: str = Query("all", description="Filter by complexity"),
+    category: str = Query("all", description="Filter by category"),
+    active_only: bool = Query(False, description="Count only active workflows"),
+):
+    """Result counts for every filter value of the current search."""
+    try:
+        category_lookup = get_category_lookup()
+        cache_key = (
+            normalize_query(q),
+            trigger,
+            complexity,
+            category,
+            active_only,
+            category_lookup_cache["mtime"],
+        )
+
+        generation = db.current_index_generation()
+        result = facet_cache.get(cache_key, generation)
+        if result is None:
+            result = db.get_facet_counts(
+                query=q,
+                trigger_filter=trigger,
+                complexity_filter=complexity,
+                active_only=active_only,
+                category_filter=category,
+                category_lookup=category_lookup,
+            )
+            facet_cache.set(cache_key, result, generation)
+
+        return {
+            "query": q,
+            "filters": {
+                "trigger": trigger,
+                "complexity": complexity,
+                "category": category,
+                "active_only": active_only,
+            },
+            **result,
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing facets: {str(e)}")
+
+
+@app.get("/api/workflows/pattern")
+async def search_workflow_pattern(
+    path: str = Query(
+        ...,
+        description="Node types in connection order, separated by commas or '>', "
+        "e.g. webhook>openAi>slack",
+    ),
+    page: int = Query(1, ge=1, description="Page number"),
+    per_page: int = Query(20, ge=1, le=100, description="Items per page"),
+):
+    """Workflows containing a connected path of the given node types."""
+    steps = [step.strip() for step in re.split(r"[,>→]", path) if step.strip()]
+    try:
+        offset = (page - 1) * per_page
+        workflows, total = await request_coalescer.run(
+            ("pattern", tuple(steps), per_page, offset),
+            db.search_by_pattern,
+            steps,
+            per_page,
+            offset,
+        )
+
+        return {
+            "workflows": [
+                {
+                    "filename": workflow["filename"],
+                    "name": workflow["name"],
+                    "description": workflow["description"],
+                    "trigger_type": workflow["trigger_type"],
+                    "integrations": workflow["integrations"],
+                    "matched_path": workflow["matched_path"],
+                }
+                for workflow in workflows
+            ],
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "pages": (total + per_page - 1) // per_page,
+            "pattern": steps,
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error searching by pattern: {str(e)}"
+        )
+
+
+# Number of NDJSON lines sent per chunk of the streaming export
+EXPORT_CHUNK_ROWS = 200
+
+
+def iter_export_chunks(workflows, compress: bool = False):
+    """Encode workflows as NDJSON byte chunks, optionally gzip-compressed."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    lines = []
+
+    for workflow in workflows:
+        workflow.pop("rank", None)
+        lines.append(json.dumps(workflow, ensure_ascii=False))
+        if len(lines) >= EXPORT_CHUNK_ROWS:
+            chunk = ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+            if compressor:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+
+    chunk = ("\n".join(lines) + "\n").encode("utf-8") if lines else b""
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+
+
+@app.get("/api/workflows/export")
+async def export_workflows(
+    request: Request,
+    trigger: str = Query("all", description="Filter by trigger type"),
+    complexity: str = Query("all", description="Filter by complexity"),
+    active_only: bool = Query(False, description="Export only active workflows"),
+    gzip: bool = Query(False, description="Gzip-encode the NDJSON stream"),
+):
+    """Stream all workflow metadata as NDJSON (one JSON object per line)."""
+    # Security: Rate limiting
+    client_ip = request.client.host if request.client else "unknown"
+    if not check_rate_limit(client_ip):
+        raise HTTPException(
+            status_code=429, detail="Rate limit exceeded. Please try again later."
+        )
+
+    workflows = db.iter_workflows(
+        trigger_filter=trigger,
+        complexity_filter=complexity,
+        active_only=active_only,
+    )
+
+    headers = {"Content-Disposition": 'attachment; filename="workflows.ndjson"'}
+    if gzip:
+        # GZipMiddleware leaves responses that already declare an encoding alone
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(
+        iter_export_chunks(workflows, compress=gzip),
+        media_type="application/x-ndjson",
+        headers=headers,
+    )
+
+
 @app.get("/api/workflows/{filename}")
 async def get_workflow_detail(filename: str, request: Request):
     """Get detailed workflow information including raw JSON."""
@@ -432,6 +871,45 @@ async def download_workflow(filename: str, request: Request):
         )
 
 
+def build_workflow_diagram(filename: str) -> str:
+    """Locate, parse and render a workflow file as Mermaid diagram code."""
+    # Only search within the workflows directory
+    workflows_path = Path("workflows").resolve()
+
+    # Find the file safely
+    matching_file = None
+    for subdir in workflows_path.iterdir():
+        if subdir.is_dir():
+            target_file = subdir / filename
+            if target_file.exists() and target_file.is_file():
+                # Verify the file is actually within workflows directory
+                try:
+                    target_file.resolve().relative_to(workflows_path)
+                    matching_file = target_file
+                    break
+                except ValueError:
+                    print(
+                        f"Security: Blocked access to file outside workflows: {target_file}"
+                    )
+                    continue
+
+    if not matching_file:
+        print(f"Warning: File {filename} not found in workflows directory")
+        raise HTTPException(
+            status_code=404,
+            detail=f"Workflow file '{filename}' not found on filesystem",
+        )
+
+    with open(matching_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    nodes = data.get("nodes", [])
+    connections = data.get("connections", {})
+
+    # Generate Mermaid diagram
+    return generate_mermaid_diagram(nodes, connections)
+
+
 @app.get("/api/workflows/{filename}/diagram")
 async def get_workflow_diagram(filename: str, request: Request):
     """Get Mermaid diagram code for workflow visualization."""
@@ -448,41 +926,10 @@ async def get_workflow_diagram(filename: str, request: Request):
                 status_code=429, detail="Rate limit exceeded. Please try again later."
             )
 
-        # Only search within the workflows directory
-        workflows_path = Path("workflows").resolve()
-
-        # Find the file safely
-        matching_file = None
-        for subdir in workflows_path.iterdir():
-            if subdir.is_dir():
-                target_file = subdir / filename
-                if target_file.exists() and target_file.is_file():
-                    # Verify the file is actually within workflows directory
-                    try:
-                        target_file.resolve().relative_to(workflows_path)
-                        matching_file = target_file
-                        break
-                    except ValueError:
-                        print(
-                            f"Security: Blocked access to file outside workflows: {target_file}"
-                        )
-                        continue
-
-        if not matching_file:
-            print(f"Warning: File {filename} not found in workflows directory")
-            raise HTTPException(
-                status_code=404,
-                detail=f"Workflow file '{filename}' not found on filesystem",
-            )
-
-        with open(matching_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        nodes = data.get("nodes", [])
-        connections = data.get("connections", {})
-
-        # Generate Mermaid diagram
-        diagram = generate_mermaid_diagram(nodes, connections)
+        # Concurrent requests for the same diagram share one file read
+        diagram = await request_coalescer.run(
+            ("diagram", filename), build_workflow_diagram, filename
+        )
 
         return {"diagram": diagram}
     except HTTPException:
@@ -499,6 +946,25 @@ async def get_workflow_diagram(filename: str, request: Request):
         )
 
 
+@app.get("/api/workflows/{filename}/related")
+async def get_related_workflows(
+    filename: str, limit: int = Query(5, ge=1, le=20, description="Results")
+):
+    """Workflows with the most similar node types and integrations."""
+    if not validate_filename(filename):
+        raise HTTPException(status_code=400, detail="Invalid filename format")
+    try:
+        db.ensure_schema()
+        return {
+            "filename": filename,
+            "related": get_related_index().related(filename, limit),
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error finding related workflows: {str(e)}"
+        )
+
+
 def generate_mermaid_diagram(nodes: List[Dict], connections: Dict) -> str:
     """Generate Mermaid.js flowchart code from workflow nodes and connections."""
     if not nodes:
@@ -664,13 +1130,23 @@ async def get_categories():
 
 
 @app.get("/api/category-mappings")
-async def get_category_mappings():
+async def get_category_mappings(request: Request):
     """Get filename to category mappings for client-side filtering."""
     try:
         search_categories_file = Path("context/search_categories.json")
         if not search_categories_file.exists():
             return {"mappings": {}}
 
+        # Prefer the payload materialized by scripts/precompress_static.py
+        mappings_file = Path("context/category_mappings.json")
+        if (
+            mappings_file.exists()
+            and mappings_file.stat().st_mtime >= search_categories_file.stat().st_mtime
+        ):
+            return precompressed_file_response(
+                request, mappings_file, "application/json"
+            )
+
         with open(search_categories_file, "r", encoding="utf-8") as f:
             search_data = json.load(f)
 
@@ -722,6 +1198,10 @@ async def search_workflows_by_category(
                     "tags": workflow.get("tags", []),
                     "created_at": workflow.get("created_at"),
                     "updated_at": workflow.get("updated_at"),
+                    "graph": {
+                        metric: workflow.get(column, 0)
+                        for metric, column in GRAPH_METRIC_COLUMNS.items()
+                    },
                 }
                 workflow_summaries.append(WorkflowSummary(**clean_workflow))
             except Exception as e:
@@ -758,11 +1238,13 @@ async def global_exception_handler(request, exc):
 # Mount static files AFTER all routes are defined
 static_dir = Path("static")
 if static_dir.exists():
-    app.mount("/static", StaticFiles(directory="static"), name="static")
+    app.mount("/static", PrecompressedStaticFiles(directory="static"), name="static")
     print(f"✅ Static files mounted from {static_dir.absolute()}")
 else:
     print(f"❌ Warning: Static directory not found at {static_dir.absolute()}")
 
+record_startup_phase("routes and static mount")
+
 
 def create_static_directory():
     """Create static directory if it doesn't exist."""
@@ -778,22 +1260,22 @@ def run_server(host: str = "127.0.0.1", port: int = 8000, reload: bool = False):
 
     # Debug: Check database connectivity
     try:
-        stats = db.get_stats()
-        print(f"✅ Database connected: {stats['total']} workflows found")
-        if stats["total"] == 0:
+        total = db.get_workflow_count()
+        print(f"✅ Database connected: {total} workflows found")
+        if total == 0:
             print("🔄 Database is empty. Indexing workflows...")
             db.index_all_workflows()
-            stats = db.get_stats()
+            total = db.get_workflow_count()
     except Exception as e:
         print(f"❌ Database error: {e}")
         print("🔄 Attempting to create and index database...")
         try:
             db.index_all_workflows()
-            stats = db.get_stats()
-            print(f"✅ Database created: {stats['total']} workflows indexed")
+            total = db.get_workflow_count()
+            print(f"✅ Database created: {total} workflows indexed")
         except Exception as e2:
             print(f"❌ Failed to create database: {e2}")
-            stats = {"total": 0}
+            total = 0
 
     # Debug: Check static files
     static_path = Path("static")
@@ -804,10 +1286,13 @@ def run_server(host: str = "127.0.0.1", port: int = 8000, reload: bool = False):
         print(f"❌ Static directory not found at: {static_path.absolute()}")
 
     print("🚀 Starting N8N Workflow Documentation API")
-    print(f"📊 Database contains {stats['total']} workflows")
+    print(f"📊 Database contains {total} workflows")
     print(f"🌐 Server will be available at: http://{host}:{port}")
     print(f"📁 Static files at: http://{host}:{port}/static/")
 
+    # Imported here so that importing api_server does not pay for uvicorn
+    import uvicorn
+
     uvicorn.run(
         "api_server:app",
         host=host,
@@ -5,11 +5,17 @@
 
 class WorkflowSearch {
     constructor() {
-        this.searchIndex = null;
-        this.currentResults = [];
+        this.manifest = null;
+        this.attributes = null;
+        this.legacyWorkflows = null;
+        this.docs = new Map();          // doc id -> workflow object
+        this.docChunkRequests = new Map();
+        this.termShardRequests = new Map();
+        this.currentResults = [];       // doc ids
         this.displayedCount = 0;
         this.resultsPerPage = 20;
         this.isLoading = false;
+        this.searchGeneration = 0;
 
         // DOM elements
         this.searchInput = document.getElementById('search-input');
@@ -32,7 +38,7 @@ class WorkflowSearch {
             this.setupEventListeners();
             this.populateFilters();
             this.updateStats();
-            this.showFeaturedWorkflows();
+            await this.showFeaturedWorkflows();
         } catch (error) {
             console.error('Failed to initialize search:', error);
             this.showError('Failed to load workflow data. Please try again later.');
@@ -42,16 +48,102 @@ class WorkflowSearch {
     async loadSearchIndex() {
         this.showLoading(true);
         try {
-            const response = await fetch('api/search-index.json');
-            if (!response.ok) {
-                throw new Error('Failed to load search index');
+            // Compact index: a small manifest plus shards fetched on demand
+            const response = await fetch('api/search/manifest.json');
+            if (response.ok) {
+                this.manifest = await response.json();
+                this.attributes = await this.fetchJson(`api/search/${this.manifest.attributes}`);
+                return;
             }
-            this.searchIndex = await response.json();
+
+            // Fallback: single-file index from older builds
+            const legacy = await this.fetchJson('api/search-index.json');
+            this.manifest = {
+                stats: legacy.stats,
+                categories: legacy.categories,
+                doc_count: legacy.workflows.length
+            };
+            this.legacyWorkflows = legacy.workflows;
+            legacy.workflows.forEach((workflow, docId) => this.docs.set(docId, workflow));
         } finally {
             this.showLoading(false);
         }
     }
 
+    async fetchJson(url) {
+        const response = await fetch(url);
+        if (!response.ok) {
+            throw new Error(`Failed to load ${url}`);
+        }
+        return response.json();
+    }
+
+    /**
+     * Split text into terms the same way scripts/generate_search_index.py does.
+     */
+    tokenize(text) {
+        const minLength = this.manifest.min_term_length || 2;
+        return (text.toLowerCase().match(/[\p{L}\p{N}]+/gu) || [])
+            .filter(term => term.length >= minLength);
+    }
+
+    loadTermShard(prefix) {
+        const file = this.manifest.term_shards[prefix];
+        if (!file) {
+            return Promise.resolve({});
+        }
+        if (!this.termShardRequests.has(prefix)) {
+            const request = this.fetchJson(`api/search/${file}`).catch(error => {
+                // Let the next search retry a shard that failed to load
+                this.termShardRequests.delete(prefix);
+                throw error;
+            });
+            this.termShardRequests.set(prefix, request);
+        }
+        return this.termShardRequests.get(prefix);
+    }
+
+    loadDocChunk(chunkIndex) {
+        if (!this.docChunkRequests.has(chunkIndex)) {
+            const file = this.manifest.doc_chunks[chunkIndex];
+            const request = this.fetchJson(`api/search/${file}`).then(chunk => {
+                const dict = this.manifest.dictionaries;
+                chunk.name.forEach((name, offset) => {
+                    const docId = chunk.start + offset;
+                    const folder = dict.folders[chunk.folder[offset]];
+                    this.docs.set(docId, {
+                        name,
+                        description: chunk.description[offset],
+                        filename: chunk.filename[offset],
+                        active: chunk.active[offset] === 1,
+                        node_count: chunk.node_count[offset],
+                        integrations: chunk.integrations[offset].map(id => dict.integrations[id]),
+                        tags: chunk.tags[offset],
+                        trigger_type: dict.triggers[this.attributes.trigger[docId]],
+                        complexity: dict.complexities[this.attributes.complexity[docId]],
+                        category: dict.categories[this.attributes.category[docId]],
+                        download_url: `${this.manifest.download_base_url}/${folder}/${chunk.filename[offset]}`
+                    });
+                });
+            }).catch(error => {
+                this.docChunkRequests.delete(chunkIndex);
+                throw error;
+            });
+            this.docChunkRequests.set(chunkIndex, request);
+        }
+        return this.docChunkRequests.get(chunkIndex);
+    }
+
+    async ensureDocs(docIds) {
+        if (this.legacyWorkflows) {
+            return;
+        }
+        const chunks = new Set(docIds
+            .filter(docId => !this.docs.has(docId))
+            .map(docId => Math.floor(docId / this.manifest.doc_chunk_size)));
+        await Promise.all([...chunks].map(chunkIndex => this.loadDocChunk(chunkIndex)));
+    }
+
     setupEventListeners() {
         // Search input
         this.searchInput.addEventListener('input', this.debounce(this.handleSearch.bind(this), 300));
@@ -75,7 +167,7 @@ class WorkflowSearch {
 
     populateFilters() {
         // Populate category filter
-        this.searchIndex.categories.forEach(category => {
+        this.manifest.categories.forEach(category => {
             const option = document.createElement('option');
             option.value = category;
             option.textContent = category;
@@ -84,7 +176,7 @@ class WorkflowSearch {
     }
 
     updateStats() {
-        const stats = this.searchIndex.stats;
+        const stats = this.manifest.stats;
 
         document.getElementById('total-count').textContent = stats.total_workflows.toLocaleString();
         document.getElementById('workflows-count').textContent = stats.total_workflows.toLocaleString();
@@ -93,31 +185,125 @@ class WorkflowSearch {
         document.getElementById('categories-count').textContent = stats.categories.toLocaleString();
     }
 
-    handleSearch() {
+    async handleSearch() {
         const query = this.searchInput.value.trim().toLowerCase();
         const category = this.categoryFilter.value;
         const complexity = this.complexityFilter.value;
         const trigger = this.triggerFilter.value;
 
-        this.currentResults = this.searchWorkflows(query, { category, complexity, trigger });
+        // Terms shorter than the indexed minimum match nothing; wait for more input
+        const minLength = this.manifest.min_term_length || 2;
+        if (query && query.length < minLength && !this.legacyWorkflows) {
+            return;
+        }
+
+        // Ignore results of searches superseded while their shards were loading
+        const generation = ++this.searchGeneration;
+        const results = await this.searchWorkflows(query, { category, complexity, trigger });
+        if (generation !== this.searchGeneration) {
+            return;
+        }
+
+        this.currentResults = results;
         this.displayedCount = 0;
-        this.displayResults(true);
+        await this.displayResults(true);
         this.updateResultsHeader(query, { category, complexity, trigger });
     }
 
-    searchWorkflows(query, filters = {}) {
-        let results = [...this.searchIndex.workflows];
+    async searchWorkflows(query, filters = {}) {
+        if (this.legacyWorkflows) {
+            return this.searchLegacyWorkflows(query, filters);
+        }
+
+        let results;
+        const terms = this.tokenize(query);
+
+        if (query && terms.length === 0) {
+            // Only words too short to be indexed
+            results = [];
+        } else if (terms.length > 0) {
+            // Every query term must prefix-match some indexed term (AND),
+            // and workflows whose name matches rank first. Unlike the legacy
+            // substring search, a term does not match inside a word
+            // ("gram" finds "Grammarly" but not "Telegram")
+            let matches = null;
+            for (const term of terms) {
+                const termMatches = await this.matchTerm(term);
+                if (matches === null) {
+                    matches = termMatches;
+                } else {
+                    for (const docId of matches.keys()) {
+                        if (!termMatches.has(docId)) {
+                            matches.delete(docId);
+                        } else if (termMatches.get(docId)) {
+                            matches.set(docId, true);
+                        }
+                    }
+                }
+            }
+
+            results = [...matches.keys()].sort((a, b) => {
+                const nameOrder = Number(matches.get(b)) - Number(matches.get(a));
+                return nameOrder !== 0 ? nameOrder : a - b;
+            });
+        } else {
+            results = Array.from({ length: this.manifest.doc_count }, (_, docId) => docId);
+        }
+
+        // Apply filters against the preloaded attribute columns
+        const dict = this.manifest.dictionaries;
+        const attrs = this.attributes;
+
+        if (filters.category) {
+            results = results.filter(docId => dict.categories[attrs.category[docId]] === filters.category);
+        }
+
+        if (filters.complexity) {
+            results = results.filter(docId => dict.complexities[attrs.complexity[docId]] === filters.complexity);
+        }
+
+        if (filters.trigger) {
+            results = results.filter(docId => dict.triggers[attrs.trigger[docId]] === filters.trigger);
+        }
+
+        return results;
+    }
+
+    /**
+     * Map of doc id -> whether the name matched, for all terms starting with `term`.
+     */
+    async matchTerm(term) {
+        const prefixLength = this.manifest.term_prefix_length;
+        const matches = new Map();
+        const shard = await this.loadTermShard(term.slice(0, prefixLength));
+
+        for (const [indexedTerm, postings] of Object.entries(shard)) {
+            if (!indexedTerm.startsWith(term)) {
+                continue;
+            }
+            for (const posting of postings) {
+                const docId = posting >> 1;
+                matches.set(docId, matches.get(docId) || (posting & 1) === 1);
+            }
+        }
+
+        return matches;
+    }
+
+    searchLegacyWorkflows(query, filters) {
+        let results = this.legacyWorkflows.map((_, docId) => docId);
+        const workflows = this.legacyWorkflows;
 
         // Text search
         if (query) {
-            results = results.filter(workflow =>
-                workflow.searchable_text.includes(query)
+            results = results.filter(docId =>
+                workflows[docId].searchable_text.includes(query)
             );
 
             // Sort by relevance (name matches first, then description)
             results.sort((a, b) => {
-                const aNameMatch = a.name.toLowerCase().includes(query);
-                const bNameMatch = b.name.toLowerCase().includes(query);
+                const aNameMatch = workflows[a].name.toLowerCase().includes(query);
+                const bNameMatch = workflows[b].name.toLowerCase().includes(query);
 
                 if (aNameMatch && !bNameMatch) return -1;
                 if (!aNameMatch && bNameMatch) return 1;
@@ -128,34 +314,40 @@ class WorkflowSearch {
 
         // Apply filters
         if (filters.category) {
-            results = results.filter(workflow => workflow.category === filters.category);
+            results = results.filter(docId => workflows[docId].category === filters.category);
         }
 
         if (filters.complexity) {
-            results = results.filter(workflow => workflow.complexity === filters.complexity);
+            results = results.filter(docId => workflows[docId].complexity === filters.complexity);
         }
 
         if (filters.trigger) {
-            results = results.filter(workflow => workflow.trigger_type === filters.trigger);
+            results = results.filter(docId => workflows[docId].trigger_type === filters.trigger);
         }
 
         return results;
     }
 
-    showFeaturedWorkflows() {
-        // Show recent workflows or popular ones when no search
-        const featured = this.searchIndex.workflows
-            .filter(w => w.integrations.length > 0)
+    async showFeaturedWorkflows() {
+        // Show workflows from the first chunk when no search has been made
+        const firstChunk = Array.from(
+            { length: Math.min(this.manifest.doc_chunk_size || this.manifest.doc_count, this.manifest.doc_count) },
+            (_, docId) => docId
+        );
+        await this.ensureDocs(firstChunk);
+
+        const featured = firstChunk
+            .filter(docId => this.docs.get(docId).integrations.length > 0)
             .slice(0, this.resultsPerPage);
 
         this.currentResults = featured;
         this.displayedCount = 0;
-        this.displayResults(true);
+        await this.displayResults(true);
         this.resultsTitle.textContent = 'Featured Workflows';
         this.resultsCount.textContent = '';
     }
 
-    displayResults(reset = false) {
+    async displayResults(reset = false) {
         if (reset) {
             this.resultsGrid.innerHTML = '';
             this.displayedCount = 0;
@@ -172,8 +364,11 @@ class WorkflowSearch {
         const endIndex = Math.min(startIndex + this.resultsPerPage, this.currentResults.length);
         const resultsToShow = this.currentResults.slice(startIndex, endIndex);
 
-        resultsToShow.forEach(workflow => {
-            const card = this.createWorkflowCard(workflow);
+        // Only the chunks holding this page of results are downloaded
+        await this.ensureDocs(resultsToShow);
+
+        resultsToShow.forEach(docId => {
+            const card = this.createWorkflowCard(this.docs.get(docId));
             this.resultsGrid.appendChild(card);
         });
 
@@ -353,7 +548,7 @@ class WorkflowSearch {
     }
 
     loadMoreResults() {
-        this.displayResults(false);
+        return this.displayResults(false);
     }
 
     showLoading(show) {
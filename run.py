@@ -85,7 +85,12 @@ def setup_database(force_reindex: bool = False, skip_index: bool = False) -> str
     return db_path
 
 
-def start_server(host: str = "127.0.0.1", port: int = 8000, reload: bool = False):
+def start_server(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    reload: bool = False,
+    profile_startup: bool = False,
+):
     """Start the FastAPI server."""
     print(f"🌐 Starting server at http://{host}:{port}")
     print(f"📊 API Documentation: http://{host}:{port}/docs")
@@ -97,6 +102,10 @@ def start_server(host: str = "127.0.0.1", port: int = 8000, reload: bool = False
     # Configure database path
     os.environ["WORKFLOW_DB_PATH"] = "database/workflows.db"
 
+    # Print per-phase startup timings once the app is ready
+    if profile_startup:
+        os.environ["STARTUP_PROFILE"] = "1"
+
     # Start uvicorn with better configuration
     import uvicorn
 
@@ -123,6 +132,8 @@ Examples:
   python run.py --host 0.0.0.0     # Accept external connections
   python run.py --reindex          # Force database reindexing
   python run.py --dev              # Development mode with auto-reload
+  python run.py --profile-startup  # Print per-phase startup timings
+  python run.py --tokenizer cjk    # Index CJK text as bigrams (Chinese/Japanese search)
         """,
     )
 
@@ -143,9 +154,25 @@ Examples:
         action="store_true",
         help="Skip workflow indexing (useful for CI/testing)",
     )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print per-phase startup timings (same as STARTUP_PROFILE=1)",
+    )
+
+    parser.add_argument(
+        "--tokenizer",
+        choices=["unicode61", "cjk"],
+        help="Search tokenizer mode (same as SEARCH_TOKENIZER); switching "
+        "rebuilds the search index in place",
+    )
 
     args = parser.parse_args()
 
+    # Both the indexer and the server read the tokenizer mode from the environment
+    if args.tokenizer:
+        os.environ["SEARCH_TOKENIZER"] = args.tokenizer
+
     # Also check environment variable for CI mode
     ci_mode = os.environ.get("CI", "").lower() in ("true", "1", "yes")
     skip_index = args.skip_index or ci_mode
@@ -168,7 +195,12 @@ Examples:
 
     # Start server
     try:
-        start_server(host=args.host, port=args.port, reload=args.dev)
+        start_server(
+            host=args.host,
+            port=args.port,
+            reload=args.dev,
+            profile_startup=args.profile_startup,
+        )
     except KeyboardInterrupt:
         print("\n👋 Server stopped!")
     except Exception as e:
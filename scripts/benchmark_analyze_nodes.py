@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+analyze_nodes Micro-Benchmark
+Times per-workflow node analysis with the original per-call mapping scan
+against the precompiled, memoized matcher, and checks both agree.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Add the parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from workflow_db import (
+    SERVICE_MAPPINGS,
+    WorkflowDatabase,
+    service_from_node_name,
+    service_from_node_type,
+)
+
+
+def legacy_analyze_nodes(nodes: List[Dict]) -> Tuple[str, set]:
+    """The pre-matcher implementation, kept here as the benchmark baseline."""
+    trigger_type = "Manual"
+    integrations = set()
+    # The original rebuilt its mapping literal on every call
+    service_mappings = dict(SERVICE_MAPPINGS)
+
+    for node in nodes:
+        node_type = node.get("type", "")
+        node_name = node.get("name", "").lower()
+
+        if "webhook" in node_type.lower() or "webhook" in node_name:
+            trigger_type = "Webhook"
+        elif "cron" in node_type.lower() or "schedule" in node_type.lower():
+            trigger_type = "Scheduled"
+        elif "trigger" in node_type.lower() and trigger_type == "Manual":
+            if "manual" not in node_type.lower():
+                trigger_type = "Webhook"
+
+        service_name = None
+        if node_type.startswith("n8n-nodes-base."):
+            raw_service = node_type.replace("n8n-nodes-base.", "").lower()
+            raw_service = raw_service.replace("trigger", "")
+            service_name = service_mappings.get(
+                raw_service, raw_service.title() if raw_service else None
+            )
+        elif node_type.startswith("@n8n/"):
+            raw_service = (
+                node_type.split(".")[-1].lower()
+                if "." in node_type
+                else node_type.lower()
+            )
+            raw_service = raw_service.replace("trigger", "")
+            service_name = service_mappings.get(
+                raw_service, raw_service.title() if raw_service else None
+            )
+        elif "-" in node_type or "@" in node_type:
+            for part in node_type.lower().split("."):
+                if "youtube" in part:
+                    service_name = "YouTube"
+                    break
+                elif "telegram" in part:
+                    service_name = "Telegram"
+                    break
+                elif "discord" in part:
+                    service_name = "Discord"
+                    break
+                elif "calcslive" in part:
+                    service_name = "CalcsLive"
+                    break
+
+        for service_key, service_value in service_mappings.items():
+            if service_key in node_name and service_value:
+                if service_key == "cal" and any(
+                    term in node_name.lower()
+                    for term in ["calcslive", "calc", "calculation"]
+                ):
+                    continue
+                service_name = service_value
+                break
+
+        if service_name and service_name not in ["None", None]:
+            integrations.add(service_name)
+
+    if len(nodes) > 10 and len(integrations) > 3:
+        trigger_type = "Complex"
+
+    return trigger_type, integrations
+
+
+def load_corpus(workflows_dir: str) -> List[List[Dict]]:
+    """Load the node lists of every workflow file."""
+    corpus = []
+    for path in sorted(Path(workflows_dir).rglob("*.json")):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, UnicodeDecodeError, OSError):
+            continue
+        if isinstance(data, dict) and isinstance(data.get("nodes"), list):
+            corpus.append(data["nodes"])
+    return corpus
+
+
+def time_per_workflow(analyze, corpus: List[List[Dict]], rounds: int) -> List[float]:
+    """Best-of-rounds analysis time per workflow, in microseconds."""
+    best = [float("inf")] * len(corpus)
+    for _ in range(rounds):
+        for index, nodes in enumerate(corpus):
+            start = time.perf_counter()
+            analyze(nodes)
+            elapsed = (time.perf_counter() - start) * 1_000_000
+            best[index] = min(best[index], elapsed)
+    return best
+
+
+def summarize(label: str, timings: List[float]):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{label:<22} total {sum(timings) / 1000:8.1f} ms   "
+        f"mean {statistics.mean(timings):7.1f} µs   "
+        f"p95 {p95:7.1f} µs   max {timings[-1]:8.1f} µs"
+    )
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark analyze_nodes")
+    parser.add_argument("--workflows", default="workflows", help="Workflows directory")
+    parser.add_argument("--rounds", type=int, default=3, help="Timing rounds")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.workflows)
+    if not corpus:
+        print(f"No workflows found in {args.workflows}")
+        sys.exit(1)
+
+    db = WorkflowDatabase(":memory:", lazy=True)
+
+    mismatches = sum(
+        1 for nodes in corpus if legacy_analyze_nodes(nodes) != db.analyze_nodes(nodes)
+    )
+    if mismatches:
+        print(f"❌ {mismatches} workflows analyzed differently")
+        sys.exit(1)
+
+    node_count = sum(len(nodes) for nodes in corpus)
+    print(f"📊 {len(corpus)} workflows, {node_count} nodes, {args.rounds} rounds\n")
+
+    summarize(
+        "legacy scan", time_per_workflow(legacy_analyze_nodes, corpus, args.rounds)
+    )
+
+    def analyze_cold(nodes):
+        service_from_node_name.cache_clear()
+        service_from_node_type.cache_clear()
+        return db.analyze_nodes(nodes)
+
+    summarize(
+        "compiled (cold cache)", time_per_workflow(analyze_cold, corpus, args.rounds)
+    )
+    summarize(
+        "compiled (warm cache)",
+        time_per_workflow(db.analyze_nodes, corpus, args.rounds),
+    )
+
+    info = service_from_node_name.cache_info()
+    print(f"\nName cache: {info.hits} hits, {info.misses} misses, size {info.currsize}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Incremental GitHub Pages Build
+Regenerates the search index, README statistics and Pages files in one pass,
+rewriting only the artifacts whose inputs changed.
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+# Add the parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from workflow_db import WorkflowDatabase
+from static_artifacts import BuildManifest
+from generate_search_index import (
+    SEARCH_INDEX_VERSION,
+    generate_static_search_index,
+    save_search_index,
+)
+from update_readme_stats import get_current_stats, update_readme_stats
+from update_github_pages import (
+    create_github_pages_config,
+    fix_base_url_references,
+    update_api_timestamp,
+    update_html_timestamp,
+)
+
+REPO_ROOT = Path(__file__).parent.parent
+CATEGORY_FILES = ["context/search_categories.json", "context/unique_categories.json"]
+# Code the artifacts depend on: workflow analysis, the index modules it
+# imports and the generator scripts. A change here rebuilds even when the
+# corpus is unchanged.
+SOURCE_FILES = [
+    "workflow_db.py",
+    "workflow_cooccurrence.py",
+    "workflow_retrieval.py",
+    "workflow_similarity.py",
+    "scripts/build_pages.py",
+    "scripts/generate_search_index.py",
+    "scripts/static_artifacts.py",
+    "scripts/update_github_pages.py",
+    "scripts/update_readme_stats.py",
+]
+
+
+def compute_inputs_digest(db: WorkflowDatabase) -> str:
+    """Digest of everything the generated artifacts are derived from."""
+    digest = hashlib.sha256()
+    digest.update(f"search-index:{SEARCH_INDEX_VERSION}\n".encode("utf-8"))
+
+    # Per-workflow content hashes recorded by the indexer
+    digest.update(db.get_corpus_digest().encode("utf-8"))
+
+    # Category assignments produced by create_categories.py
+    for category_file in CATEGORY_FILES:
+        path = Path(category_file)
+        if path.exists():
+            digest.update(path.read_bytes())
+
+    # The analysis and generator code itself
+    for source in SOURCE_FILES:
+        path = REPO_ROOT / source
+        if path.exists():
+            digest.update(f"{source}\n".encode("utf-8"))
+            digest.update(path.read_bytes())
+
+    return digest.hexdigest()
+
+
+def build_pages(db_path: str, output_dir: str, force: bool = False) -> int:
+    """Run the full Pages pipeline. Returns the number of artifacts changed."""
+    db = WorkflowDatabase(db_path)
+    build_manifest = BuildManifest(output_dir)
+
+    inputs_digest = compute_inputs_digest(db)
+    if not force and inputs_digest == build_manifest.inputs_digest:
+        print("✅ Workflows and categories unchanged, nothing to rebuild")
+        return 0
+
+    # One stats scan shared by every step
+    stats = db.get_stats()
+
+    print("🔍 Generating search index...")
+    search_index = generate_static_search_index(db_path, output_dir, db, stats)
+    changed = save_search_index(search_index, output_dir, build_manifest)
+
+    print("\n📊 Updating README statistics...")
+    readme_stats = get_current_stats(db, stats)
+    update_readme_stats(readme_stats)
+
+    print("\n🔧 Updating GitHub Pages files...")
+    if changed:
+        update_html_timestamp("docs/index.html")
+        update_api_timestamp(output_dir, build_manifest)
+    create_github_pages_config()
+    fix_base_url_references()
+
+    build_manifest.inputs_digest = inputs_digest
+    build_manifest.save()
+
+    print(f"\n✨ Build complete: {changed} search artifacts changed")
+    return changed
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Incremental GitHub Pages build")
+    parser.add_argument(
+        "--db", default="database/workflows.db", help="Workflow database path"
+    )
+    parser.add_argument("--output", default="docs/api", help="Output directory")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild even if the inputs digest is unchanged",
+    )
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Database not found: {args.db}")
+        print("Run 'python run.py --reindex' first to create the database")
+        sys.exit(1)
+
+    try:
+        build_pages(args.db, args.output, force=args.force)
+    except Exception as e:
+        print(f"Error building GitHub Pages artifacts: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
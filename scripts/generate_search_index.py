@@ -6,27 +6,55 @@ Creates a lightweight JSON index for client-side search functionality.
 
 import json
 import os
+import re
 import sys
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
 # Add the parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
 from workflow_db import WorkflowDatabase
-
-
-def generate_static_search_index(db_path: str, output_dir: str) -> Dict[str, Any]:
-    """Generate a static search index for client-side searching."""
+from static_artifacts import (
+    BuildManifest,
+    encode_json,
+    write_if_changed,
+    write_json_if_changed,
+)
+
+# Compact index layout (docs/api/search/)
+SEARCH_INDEX_VERSION = "2.0"
+DOC_CHUNK_SIZE = 250  # workflows per docs-NNN.json chunk
+TERM_PREFIX_LENGTH = 2  # terms are sharded by their first N characters
+MIN_TERM_LENGTH = 2
+DOWNLOAD_BASE_URL = (
+    "https://raw.githubusercontent.com/Zie619/n8n-workflows/main/workflows"
+)
+
+# Letters and digits only, so filenames like 0001_Telegram_Send.json split on "_"
+TERM_PATTERN = re.compile(r"[^\W_]+")
+
+
+def generate_static_search_index(
+    db_path: str,
+    output_dir: str,
+    db: Optional[WorkflowDatabase] = None,
+    stats: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Generate a static search index for client-side searching.
+
+    Pass ``db`` and ``stats`` to reuse a handle and scan already made by
+    the caller (see scripts/build_pages.py).
+    """
 
     # Initialize database
-    db = WorkflowDatabase(db_path)
-
-    # Get all workflows
-    workflows, total = db.search_workflows(limit=10000)  # Get all workflows
+    if db is None:
+        db = WorkflowDatabase(db_path)
 
     # Get statistics
-    stats = db.get_stats()
+    if stats is None:
+        stats = db.get_stats()
 
     # Get categories from service mapping
     categories = db.get_service_categories()
@@ -34,19 +62,13 @@ def generate_static_search_index(db_path: str, output_dir: str) -> Dict[str, Any
     # Load existing categories from create_categories.py system
     existing_categories = load_existing_categories()
 
-    # Create simplified workflow data for search
+    # Create simplified workflow data for search, streaming rows from the
+    # database cursor so large corpora are neither truncated nor buffered twice
     search_workflows = []
-    for workflow in workflows:
-        # Create searchable text combining multiple fields
-        searchable_text = " ".join(
-            [
-                workflow["name"],
-                workflow["description"],
-                workflow["filename"],
-                " ".join(workflow["integrations"]),
-                " ".join(workflow["tags"]) if workflow["tags"] else "",
-            ]
-        ).lower()
+    integration_counts = {}
+    for workflow in db.iter_workflows():
+        for integration in workflow["integrations"]:
+            integration_counts[integration] = integration_counts.get(integration, 0) + 1
 
         # Use existing category from create_categories.py system, fallback to integration-based
         category = get_workflow_category(
@@ -68,14 +90,13 @@ def generate_static_search_index(db_path: str, output_dir: str) -> Dict[str, Any
             "integrations": workflow["integrations"],
             "tags": workflow["tags"],
             "category": category,
-            "searchable_text": searchable_text,
-            "download_url": f"https://raw.githubusercontent.com/Zie619/n8n-workflows/main/workflows/{extract_folder_from_filename(workflow['filename'])}/{workflow['filename']}",
+            "folder": extract_folder_from_filename(workflow["filename"]),
         }
         search_workflows.append(search_workflow)
 
     # Create comprehensive search index
     search_index = {
-        "version": "1.0",
+        "version": SEARCH_INDEX_VERSION,
         "generated_at": stats.get("last_indexed", ""),
         "stats": {
             "total_workflows": stats["total"],
@@ -88,7 +109,7 @@ def generate_static_search_index(db_path: str, output_dir: str) -> Dict[str, Any
             "complexity": stats["complexity"],
         },
         "categories": get_category_list(categories),
-        "integrations": get_popular_integrations(workflows),
+        "integrations": get_popular_integrations(integration_counts),
         "workflows": search_workflows,
     }
 
@@ -189,14 +210,10 @@ def get_category_list(categories: Dict[str, List[str]]) -> List[str]:
     return sorted(list(formatted_categories))
 
 
-def get_popular_integrations(workflows: List[Dict]) -> List[Dict[str, Any]]:
+def get_popular_integrations(
+    integration_counts: Dict[str, int],
+) -> List[Dict[str, Any]]:
     """Get list of popular integrations with counts."""
-    integration_counts = {}
-
-    for workflow in workflows:
-        for integration in workflow["integrations"]:
-            integration_counts[integration] = integration_counts.get(integration, 0) + 1
-
     # Sort by count and take top 50
     sorted_integrations = sorted(
         integration_counts.items(), key=lambda x: x[1], reverse=True
@@ -215,37 +232,222 @@ def extract_folder_from_filename(filename: str) -> str:
     return "Misc"
 
 
-def save_search_index(search_index: Dict[str, Any], output_dir: str):
-    """Save the search index to multiple formats for different uses."""
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase search terms (mirrored by docs/js/search.js)."""
+    return [
+        term
+        for term in TERM_PATTERN.findall(text.lower())
+        if len(term) >= MIN_TERM_LENGTH
+    ]
 
-    # Ensure output directory exists
-    os.makedirs(output_dir, exist_ok=True)
 
-    # Save complete index
-    with open(
-        os.path.join(output_dir, "search-index.json"), "w", encoding="utf-8"
-    ) as f:
-        json.dump(search_index, f, indent=2, ensure_ascii=False)
+class Dictionary:
+    """Assigns stable integer ids to repeated string values."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.ids: Dict[str, int] = {}
+
+    def id_for(self, value: str) -> int:
+        if value not in self.ids:
+            self.ids[value] = len(self.values)
+            self.values.append(value)
+        return self.ids[value]
+
+
+def build_compact_index(search_index: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the dictionary-encoded, prefix-sharded index for the client.
+
+    Returns a mapping of relative file name -> JSON payload. Workflows are
+    addressed by their position in the corpus (doc id). Posting lists store
+    ``doc_id * 2 + 1`` when the term appears in the workflow name and
+    ``doc_id * 2`` otherwise, so the client can rank name hits first without
+    loading any workflow documents.
+    """
+    workflows = search_index["workflows"]
+
+    integrations = Dictionary()
+    categories = Dictionary()
+    triggers = Dictionary()
+    complexities = Dictionary()
+    folders = Dictionary()
+
+    attributes = {"trigger": [], "complexity": [], "category": []}
+    postings: Dict[str, Dict[int, bool]] = {}
+    doc_chunks = []
+
+    for start in range(0, len(workflows), DOC_CHUNK_SIZE):
+        chunk = {
+            "start": start,
+            "name": [],
+            "description": [],
+            "filename": [],
+            "folder": [],
+            "active": [],
+            "node_count": [],
+            "integrations": [],
+            "tags": [],
+        }
 
-    # Save stats only (for quick loading)
-    with open(os.path.join(output_dir, "stats.json"), "w", encoding="utf-8") as f:
-        json.dump(search_index["stats"], f, indent=2, ensure_ascii=False)
+        for doc_id in range(start, min(start + DOC_CHUNK_SIZE, len(workflows))):
+            workflow = workflows[doc_id]
+
+            chunk["name"].append(workflow["name"])
+            chunk["description"].append(workflow["description"])
+            chunk["filename"].append(workflow["filename"])
+            chunk["folder"].append(folders.id_for(workflow["folder"]))
+            chunk["active"].append(1 if workflow["active"] else 0)
+            chunk["node_count"].append(workflow["node_count"])
+            chunk["integrations"].append(
+                [integrations.id_for(name) for name in workflow["integrations"]]
+            )
+            chunk["tags"].append(workflow["tags"])
+
+            attributes["trigger"].append(triggers.id_for(workflow["trigger_type"]))
+            attributes["complexity"].append(complexities.id_for(workflow["complexity"]))
+            attributes["category"].append(categories.id_for(workflow["category"]))
+
+            # Inverted index over name, description, filename, integrations and tags
+            name_terms = set(tokenize(workflow["name"]))
+            other_terms = set(
+                tokenize(
+                    " ".join(
+                        [
+                            workflow["description"],
+                            workflow["filename"],
+                            " ".join(workflow["integrations"]),
+                            " ".join(workflow["tags"]),
+                        ]
+                    )
+                )
+            )
+            for term in name_terms | other_terms:
+                postings.setdefault(term, {})[doc_id] = term in name_terms
+
+        doc_chunks.append(chunk)
+
+    # Group terms into prefix shards
+    shards: Dict[str, Dict[str, List[int]]] = {}
+    for term in sorted(postings):
+        docs = postings[term]
+        shards.setdefault(term[:TERM_PREFIX_LENGTH], {})[term] = [
+            doc_id * 2 + (1 if in_name else 0)
+            for doc_id, in_name in sorted(docs.items())
+        ]
+
+    files: Dict[str, Any] = {}
+    doc_files = []
+    for number, chunk in enumerate(doc_chunks):
+        doc_files.append(f"docs-{number:03d}.json")
+        files[doc_files[-1]] = chunk
+
+    shard_files = {}
+    for prefix in sorted(shards):
+        # Named after the prefix itself (hex-encoded for non-ASCII terms) so a
+        # new prefix does not rename, and so rewrite, every other shard
+        shard_files[prefix] = f"terms-{prefix.encode('utf-8').hex()}.json"
+        files[shard_files[prefix]] = shards[prefix]
+
+    files["attributes.json"] = attributes
+    files["manifest.json"] = {
+        "version": SEARCH_INDEX_VERSION,
+        "generated_at": search_index["generated_at"],
+        "stats": search_index["stats"],
+        "categories": search_index["categories"],
+        "doc_count": len(workflows),
+        "doc_chunk_size": DOC_CHUNK_SIZE,
+        "doc_chunks": doc_files,
+        "attributes": "attributes.json",
+        "term_prefix_length": TERM_PREFIX_LENGTH,
+        "min_term_length": MIN_TERM_LENGTH,
+        "term_shards": shard_files,
+        "dictionaries": {
+            "integrations": integrations.values,
+            "categories": categories.values,
+            "triggers": triggers.values,
+            "complexities": complexities.values,
+            "folders": folders.values,
+        },
+        "download_base_url": DOWNLOAD_BASE_URL,
+    }
 
-    # Save categories only
-    with open(os.path.join(output_dir, "categories.json"), "w", encoding="utf-8") as f:
-        json.dump(search_index["categories"], f, indent=2, ensure_ascii=False)
+    return files
+
+
+def save_search_index(
+    search_index: Dict[str, Any],
+    output_dir: str,
+    build_manifest: Optional[BuildManifest] = None,
+) -> int:
+    """Save the compact search index and its companion summary files.
+
+    Files are written atomically and only when their content changed.
+    Returns the number of files written or removed.
+    """
+    changed = 0
+
+    # Ensure output directories exist
+    search_dir = os.path.join(output_dir, "search")
+    os.makedirs(search_dir, exist_ok=True)
+
+    # Save the sharded index, dropping shards left over from a previous run
+    compact_files = build_compact_index(search_index)
+    for stale_file in Path(search_dir).glob("*.json"):
+        if stale_file.name not in compact_files:
+            stale_file.unlink()
+            if build_manifest is not None:
+                build_manifest.forget(stale_file)
+            changed += 1
+    for file_name, payload in compact_files.items():
+        if file_name == "manifest.json":
+            # generated_at moves on every build and is not compared
+            changed += write_json_if_changed(
+                os.path.join(search_dir, file_name),
+                payload,
+                build_manifest,
+                compact=True,
+            )
+            continue
+        changed += write_if_changed(
+            os.path.join(search_dir, file_name),
+            encode_json(payload, compact=True),
+            build_manifest,
+        )
 
-    # Save integrations only
-    with open(
-        os.path.join(output_dir, "integrations.json"), "w", encoding="utf-8"
-    ) as f:
-        json.dump(search_index["integrations"], f, indent=2, ensure_ascii=False)
+    # The single-file index is superseded by search/manifest.json
+    legacy_index = os.path.join(output_dir, "search-index.json")
+    if os.path.exists(legacy_index):
+        os.remove(legacy_index)
+        changed += 1
+
+    # Save stats only (for quick loading), categories only and integrations only
+    # The last_updated stamp is only written along with a real stats change
+    changed += write_json_if_changed(
+        os.path.join(output_dir, "stats.json"),
+        {**search_index["stats"], "last_updated": datetime.now().isoformat()},
+        build_manifest,
+    )
+    for file_name, key in [
+        ("categories.json", "categories"),
+        ("integrations.json", "integrations"),
+    ]:
+        changed += write_if_changed(
+            os.path.join(output_dir, file_name),
+            encode_json(search_index[key]),
+            build_manifest,
+        )
 
+    manifest = compact_files["manifest.json"]
     print("Search index generated successfully:")
     print(f"   {search_index['stats']['total_workflows']} workflows indexed")
     print(f"   {len(search_index['categories'])} categories")
     print(f"   {len(search_index['integrations'])} popular integrations")
-    print(f"   Files saved to: {output_dir}")
+    print(
+        f"   {len(manifest['doc_chunks'])} document chunks, "
+        f"{len(manifest['term_shards'])} term shards"
+    )
+    print(f"   {changed} files changed in: {output_dir}")
+    return changed
 
 
 def main():
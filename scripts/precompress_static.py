@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Precompress Static Assets
+Writes .gz and .br siblings for the API server's static pages and generated
+JSON so they are served without compressing per request. Run as part of the
+Docker build. GitHub Pages does not serve such siblings, so docs/ is not a
+target.
+"""
+
+import argparse
+import gzip
+import json
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+sys.path.append(str(Path(__file__).parent))
+
+from static_artifacts import encode_json, write_atomic, write_if_changed
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip siblings are still written
+    brotli = None
+
+COMPRESSIBLE_SUFFIXES = {".html", ".json", ".js", ".css", ".svg", ".txt", ".xml"}
+MIN_SIZE = 1000  # Same threshold as the server's GZipMiddleware
+DEFAULT_TARGETS = ["static"]
+
+
+def compress_gzip(data: bytes) -> bytes:
+    # mtime=0 keeps the output byte-identical across builds
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def compress_brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=11)
+
+
+def get_encoders() -> Dict[str, Callable[[bytes], bytes]]:
+    """Sibling suffix -> compressor for every available encoding."""
+    encoders = {".gz": compress_gzip}
+    if brotli is not None:
+        encoders[".br"] = compress_brotli
+    return encoders
+
+
+def precompress_file(path: Path, force: bool = False) -> int:
+    """Write compressed siblings for one file. Returns the number written.
+
+    Siblings newer than their source are left alone unless ``force`` is set.
+    """
+    if path.suffix not in COMPRESSIBLE_SUFFIXES or path.stat().st_size < MIN_SIZE:
+        return 0
+
+    data = None
+    written = 0
+    for suffix, compress in get_encoders().items():
+        sibling = path.with_name(path.name + suffix)
+        if (
+            not force
+            and sibling.exists()
+            and sibling.stat().st_mtime >= path.stat().st_mtime
+        ):
+            continue
+
+        if data is None:
+            data = path.read_bytes()
+        compressed = compress(data)
+
+        # Not worth serving if compression does not shrink the file
+        if len(compressed) >= len(data):
+            if sibling.exists():
+                sibling.unlink()
+            continue
+
+        write_atomic(sibling, compressed)
+        written += 1
+
+    return written
+
+
+def precompress_directory(directory: Path, force: bool = False) -> int:
+    """Precompress every eligible file below a directory."""
+    written = 0
+    for path in sorted(directory.rglob("*")):
+        if path.is_file():
+            written += precompress_file(path, force)
+
+    # Drop siblings whose source file no longer exists
+    for suffix in (".gz", ".br"):
+        for sibling in directory.rglob(f"*{suffix}"):
+            if not sibling.with_name(sibling.name[: -len(suffix)]).exists():
+                sibling.unlink()
+
+    return written
+
+
+def write_category_mappings(context_dir: str = "context") -> Optional[Path]:
+    """Materialize the /api/category-mappings payload so it can be precompressed."""
+    search_categories_file = Path(context_dir) / "search_categories.json"
+    if not search_categories_file.exists():
+        return None
+
+    with open(search_categories_file, "r", encoding="utf-8") as f:
+        search_data = json.load(f)
+
+    mappings = {}
+    for item in search_data:
+        filename = item.get("filename")
+        if filename:
+            mappings[filename] = item.get("category") or "Uncategorized"
+
+    mappings_file = Path(context_dir) / "category_mappings.json"
+    write_if_changed(mappings_file, encode_json({"mappings": mappings}, compact=True))
+    return mappings_file
+
+
+def precompress_targets(targets: List[str], force: bool = False) -> int:
+    """Precompress the category mappings plus every target directory or file."""
+    written = 0
+
+    mappings_file = write_category_mappings()
+    if mappings_file is not None:
+        written += precompress_file(mappings_file, force)
+
+    for target in targets:
+        path = Path(target)
+        if path.is_dir():
+            written += precompress_directory(path, force)
+        elif path.is_file():
+            written += precompress_file(path, force)
+        else:
+            print(f"Warning: {target} not found, skipping")
+
+    return written
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Write .gz/.br siblings")
+    parser.add_argument(
+        "targets",
+        nargs="*",
+        default=DEFAULT_TARGETS,
+        help=f"Directories or files to precompress (default: {' '.join(DEFAULT_TARGETS)})",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Recompress even up-to-date files"
+    )
+    args = parser.parse_args()
+
+    if brotli is None:
+        print("⚠️  brotli not installed, writing gzip siblings only")
+
+    written = precompress_targets(args.targets, force=args.force)
+    print(f"✅ Precompression complete: {written} compressed files written")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Static Artifact Writer
+Atomic, change-aware file writes for the generated GitHub Pages artifacts.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+BUILD_MANIFEST_NAME = "build-manifest.json"
+# Keys that change on every build without the content changing
+TIMESTAMP_KEYS = ("generated_at", "last_updated")
+
+
+def content_digest(data: bytes) -> str:
+    """SHA-256 digest used to identify artifact contents."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def encode_json(payload: Any, compact: bool = False) -> bytes:
+    """Serialize a payload the way the Pages artifacts are stored."""
+    if compact:
+        text = json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+    else:
+        text = json.dumps(payload, indent=2, ensure_ascii=False)
+    return text.encode("utf-8")
+
+
+def write_atomic(path: Union[str, Path], data: bytes):
+    """Write data to a temp file in the target directory, then rename it in place.
+
+    Readers (and the Pages upload step) never observe a half-written file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        # mkstemp creates 0600 files; artifacts are meant to be world-readable
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_if_changed(
+    path: Union[str, Path], data: Union[bytes, str], manifest: "BuildManifest" = None
+) -> bool:
+    """Atomically write data unless the file already holds identical bytes.
+
+    When a build manifest is given, its recorded digest is trusted instead of
+    reading the existing file back. Returns True if the file was written.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    path = Path(path)
+    digest = content_digest(data)
+
+    if path.exists():
+        if manifest is not None and manifest.get_digest(path) == digest:
+            return False
+        if manifest is None and content_digest(path.read_bytes()) == digest:
+            return False
+
+    write_atomic(path, data)
+    if manifest is not None:
+        manifest.set_digest(path, digest)
+    return True
+
+
+def write_json_if_changed(
+    path: Union[str, Path],
+    payload: Dict[str, Any],
+    manifest: "BuildManifest" = None,
+    compact: bool = False,
+    volatile_keys: Tuple[str, ...] = TIMESTAMP_KEYS,
+) -> bool:
+    """write_if_changed for a JSON object whose ``volatile_keys`` (timestamps)
+    do not count as a change.
+
+    The digest recorded in the manifest covers the object without those
+    keys, so a rebuild that only moves a timestamp leaves the file alone.
+    """
+    path = Path(path)
+    stable = {key: value for key, value in payload.items() if key not in volatile_keys}
+    digest = content_digest(encode_json(stable, compact))
+
+    if path.exists():
+        if manifest is not None and manifest.get_digest(path) == digest:
+            return False
+        if manifest is None:
+            try:
+                existing = json.loads(path.read_bytes())
+            except (ValueError, OSError):
+                existing = None
+            if isinstance(existing, dict) and stable == {
+                key: value
+                for key, value in existing.items()
+                if key not in volatile_keys
+            }:
+                return False
+
+    write_atomic(path, encode_json(payload, compact))
+    if manifest is not None:
+        manifest.set_digest(path, digest)
+    return True
+
+
+class BuildManifest:
+    """Records the input digest of the last build and a digest per artifact."""
+
+    def __init__(self, output_dir: Union[str, Path]):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / BUILD_MANIFEST_NAME
+        self.data: Dict[str, Any] = {"inputs_digest": None, "artifacts": {}}
+
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.data.update(json.load(f))
+            except (json.JSONDecodeError, OSError):
+                # A corrupt manifest only costs one full rewrite
+                pass
+
+    def _key(self, path: Union[str, Path]) -> str:
+        return Path(path).resolve().relative_to(self.output_dir.resolve()).as_posix()
+
+    def get_digest(self, path: Union[str, Path]) -> Optional[str]:
+        return self.data["artifacts"].get(self._key(path))
+
+    def set_digest(self, path: Union[str, Path], digest: str):
+        self.data["artifacts"][self._key(path)] = digest
+
+    def forget(self, path: Union[str, Path]):
+        self.data["artifacts"].pop(self._key(path), None)
+
+    @property
+    def inputs_digest(self) -> Optional[str]:
+        return self.data.get("inputs_digest")
+
+    @inputs_digest.setter
+    def inputs_digest(self, digest: str):
+        self.data["inputs_digest"] = digest
+
+    def save(self):
+        write_if_changed(self.path, encode_json(self.data))
@@ -6,10 +6,15 @@ Addresses Issues #115 and #129.
 """
 
 import json
+import sys
 from datetime import datetime
 from pathlib import Path
 import re
 
+sys.path.append(str(Path(__file__).parent))
+
+from static_artifacts import encode_json, write_if_changed, write_json_if_changed
+
 
 def update_html_timestamp(html_file: str):
     """Update the timestamp in the HTML file to current date."""
@@ -41,14 +46,14 @@ def update_html_timestamp(html_file: str):
         updated_content = updated_content.replace("</head>", f"{timestamp_meta}</head>")
 
     # Write back the updated content
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(updated_content)
-
-    print(f"✅ Updated timestamp in {html_file} to: {current_date}")
+    if write_if_changed(file_path, updated_content):
+        print(f"✅ Updated timestamp in {html_file} to: {current_date}")
+    else:
+        print(f"✅ Timestamp in {html_file} already current: {current_date}")
     return True
 
 
-def update_api_timestamp(api_dir: str):
+def update_api_timestamp(api_dir: str, build_manifest=None):
     """Update timestamp in API JSON files."""
     api_path = Path(api_dir)
 
@@ -64,8 +69,7 @@ def update_api_timestamp(api_dir: str):
     }
 
     metadata_file = api_path / "metadata.json"
-    with open(metadata_file, "w", encoding="utf-8") as f:
-        json.dump(metadata, f, indent=2)
+    write_if_changed(metadata_file, encode_json(metadata), build_manifest)
 
     print(f"✅ Created metadata file: {metadata_file}")
 
@@ -77,8 +81,7 @@ def update_api_timestamp(api_dir: str):
 
         stats["last_updated"] = datetime.now().isoformat()
 
-        with open(stats_file, "w", encoding="utf-8") as f:
-            json.dump(stats, f, indent=2)
+        write_json_if_changed(stats_file, stats, build_manifest)
 
         print(f"✅ Updated stats file: {stats_file}")
 
@@ -118,13 +121,12 @@ exclude:
 """
 
     config_file = Path("docs/_config.yml")
-    with open(config_file, "w", encoding="utf-8") as f:
-        f.write(config_content)
+    write_if_changed(config_file, config_content)
     print(f"✅ Created Jekyll config: {config_file}")
 
     # Create .nojekyll file to bypass Jekyll processing (for pure HTML/JS site)
     nojekyll_file = Path("docs/.nojekyll")
-    nojekyll_file.touch()
+    write_if_changed(nojekyll_file, b"")
     print(f"✅ Created .nojekyll file: {nojekyll_file}")
 
     # Create a simple 404.html page
@@ -175,8 +177,7 @@ exclude:
 </html>"""
 
     error_file = Path("docs/404.html")
-    with open(error_file, "w", encoding="utf-8") as f:
-        f.write(error_page_content)
+    write_if_changed(error_file, error_page_content)
     print(f"✅ Created 404 page: {error_file}")
 
 
@@ -188,7 +189,7 @@ def verify_github_pages_structure():
         "docs/css/styles.css",
         "docs/js/app.js",
         "docs/js/search.js",
-        "docs/api/search-index.json",
+        "docs/api/search/manifest.json",
         "docs/api/stats.json",
         "docs/api/categories.json",
         "docs/api/integrations.json",
@@ -235,9 +236,8 @@ def fix_base_url_references():
         for old, new in replacements:
             content = content.replace(old, new)
 
-        with open(index_file, "w", encoding="utf-8") as f:
-            f.write(content)
-        print("✅ Fixed URL references in index.html")
+        if write_if_changed(index_file, content):
+            print("✅ Fixed URL references in index.html")
 
     # Update JavaScript files
     js_files = ["docs/js/app.js", "docs/js/search.js"]
@@ -253,9 +253,8 @@ def fix_base_url_references():
             content = content.replace("'/api/", "'api/")
             content = content.replace('"/api/', '"api/')
 
-            with open(js_path, "w", encoding="utf-8") as f:
-                f.write(content)
-            print(f"✅ Fixed URL references in {js_file}")
+            if write_if_changed(js_path, content):
+                print(f"✅ Fixed URL references in {js_file}")
 
 
 def main():
@@ -14,18 +14,26 @@ from datetime import datetime
 sys.path.append(str(Path(__file__).parent.parent))
 
 from workflow_db import WorkflowDatabase
+from static_artifacts import write_if_changed
 
 
-def get_current_stats():
-    """Get current workflow statistics from the database."""
-    db_path = "database/workflows.db"
+def get_current_stats(db: WorkflowDatabase = None, stats: dict = None):
+    """Get current workflow statistics from the database.
 
-    if not os.path.exists(db_path):
-        print("Database not found. Run workflow indexing first.")
-        return None
+    Pass ``db`` and ``stats`` to reuse a handle and scan already made by
+    the caller (see scripts/build_pages.py).
+    """
+    if db is None:
+        db_path = "database/workflows.db"
 
-    db = WorkflowDatabase(db_path)
-    stats = db.get_stats()
+        if not os.path.exists(db_path):
+            print("Database not found. Run workflow indexing first.")
+            return None
+
+        db = WorkflowDatabase(db_path)
+
+    if stats is None:
+        stats = db.get_stats()
 
     # Get categories count
     categories = db.get_service_categories()
@@ -190,9 +198,10 @@ def update_readme_stats(stats):
         if updated_content != old_content:
             replacements_made += 1
 
-    # Write back to file
-    with open(readme_path, "w", encoding="utf-8") as f:
-        f.write(updated_content)
+    # Write back to file (atomically, and only if something changed)
+    if not write_if_changed(readme_path, updated_content):
+        print("README.md already up to date")
+        return True
 
     print("README.md updated with current statistics:")
     print(f"  - Total workflows: {stats['total_workflows']:,}")
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Typeahead Suggestions
+In-memory prefix trie over integrations and categories, combined with the
+FTS5 prefix indexes for workflow names.
+"""
+
+import heapq
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from workflow_db import QUERY_TOKEN_PATTERN, WorkflowDatabase
+
+# Completions kept per trie node; requests never ask for more than this
+TRIE_TOP_K = 20
+
+# Workflow name lookups need at least this many characters, the shortest
+# prefix length indexed by workflows_fts
+MIN_NAME_PREFIX_LENGTH = 2
+
+Entry = Tuple[int, str, str]  # (weight, label, kind)
+
+
+class TrieNode:
+    __slots__ = ("children", "entries", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "TrieNode"] = {}
+        self.entries: List[Entry] = []
+        self.top: List[Entry] = []
+
+
+class SuggestionTrie:
+    """Prefix tree whose nodes hold their highest-weighted completions.
+
+    Each label is reachable from every word start ("sheets" finds
+    "Google Sheets"). finalize() precomputes the top completions per node, so
+    a lookup costs one walk down the prefix.
+    """
+
+    def __init__(self, top_k: int = TRIE_TOP_K):
+        self.root = TrieNode()
+        self.top_k = top_k
+
+    def insert(self, label: str, kind: str, weight: int):
+        entry = (weight, label, kind)
+        lowered = label.lower()
+        for match in QUERY_TOKEN_PATTERN.finditer(lowered):
+            node = self.root
+            for char in lowered[match.start() :]:
+                node = node.children.setdefault(char, TrieNode())
+            node.entries.append(entry)
+
+    def finalize(self):
+        """Compute the top completions of every node, bottom-up."""
+        # Iterative post-order walk; labels can be long
+        stack = [(self.root, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if not children_done:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children.values())
+                continue
+
+            candidates = list(node.entries)
+            for child in node.children.values():
+                candidates.extend(child.top)
+
+            top, seen = [], set()
+            for entry in heapq.nlargest(len(candidates), candidates):
+                if (entry[1], entry[2]) in seen:
+                    continue
+                seen.add((entry[1], entry[2]))
+                top.append(entry)
+                if len(top) >= self.top_k:
+                    break
+            node.top = top
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Entry]:
+        node = self.root
+        for char in prefix.lower():
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return node.top[:limit]
+
+
+class SuggestionIndex:
+    """Builds the suggestion trie from the index and rebuilds it when the
+    index generation or the category assignments change."""
+
+    def __init__(
+        self,
+        db: WorkflowDatabase,
+        categories_file: str = "context/search_categories.json",
+    ):
+        self.db = db
+        self.categories_file = Path(categories_file)
+        self.trie: Optional[SuggestionTrie] = None
+        self.built_for: Optional[Tuple[int, float]] = None
+
+    def get_category_counts(self) -> Dict[str, int]:
+        if not self.categories_file.exists():
+            return {}
+        with open(self.categories_file, "r", encoding="utf-8") as f:
+            search_data = json.load(f)
+
+        counts: Dict[str, int] = {}
+        for item in search_data:
+            category = item.get("category") or "Uncategorized"
+            counts[category] = counts.get(category, 0) + 1
+        return counts
+
+    def build(self) -> SuggestionTrie:
+        trie = SuggestionTrie()
+        for integration, count in self.db.get_integration_counts().items():
+            trie.insert(integration, "integration", count)
+        for category, count in self.get_category_counts().items():
+            trie.insert(category, "category", count)
+        trie.finalize()
+        return trie
+
+    def get_trie(self) -> SuggestionTrie:
+        categories_mtime = (
+            self.categories_file.stat().st_mtime
+            if self.categories_file.exists()
+            else 0.0
+        )
+        version = (self.db.current_index_generation(), categories_mtime)
+        if self.trie is None or version != self.built_for:
+            self.trie = self.build()
+            self.built_for = version
+        return self.trie
+
+    def suggest(self, query: str, limit: int = 10) -> List[Dict]:
+        """Ranked completions: integrations and categories first, then names."""
+        prefix = " ".join(query.lower().split())
+        if not prefix:
+            return []
+
+        term_matches = self.get_trie().complete(prefix, limit)
+        # Leave at least half of the slots for workflow names
+        term_slots = max(limit // 2, 1)
+        suggestions = [
+            {"text": label, "type": kind, "count": weight}
+            for weight, label, kind in term_matches[:term_slots]
+        ]
+
+        if len(prefix) >= MIN_NAME_PREFIX_LENGTH:
+            # Generated names repeat, so over-fetch and keep distinct ones
+            seen_names = set()
+            for workflow in self.db.suggest_workflow_names(prefix, limit * 2):
+                if len(suggestions) >= limit:
+                    break
+                if workflow["name"] in seen_names:
+                    continue
+                seen_names.add(workflow["name"])
+                suggestions.append(
+                    {
+                        "text": workflow["name"],
+                        "type": "workflow",
+                        "filename": workflow["filename"],
+                    }
+                )
+
+        # Fill any remaining slots with further term completions
+        for weight, label, kind in term_matches[term_slots:]:
+            if len(suggestions) >= limit:
+                break
+            suggestions.append({"text": label, "type": kind, "count": weight})
+
+        return suggestions
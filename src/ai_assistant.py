@@ -8,13 +8,34 @@ from fastapi import FastAPI, HTTPException
 from fastapi.responses import HTMLResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional
+from pathlib import Path
 import json
+import secrets
 import sqlite3
+import sys
+
+# The retrieval index is shared with the indexer in the repository root
+sys.path.append(str(Path(__file__).parent.parent))
+
+from workflow_retrieval import VectorSearchIndex
+from session_store import create_session_store
+
+# Trigger types each detected intent narrows results to
+INTENT_TRIGGER_TYPES = {
+    "automation": ["Scheduled", "Complex"],
+    "integration": ["Webhook"],
+    "manual": ["Manual"],
+}
+
+# Session ids are issued by the server and unguessable, so knowing one is
+# what entitles a caller to its history
+SESSION_ID_BYTES = 24
 
 
 class ChatMessage(BaseModel):
     message: str
     user_id: Optional[str] = None
+    session_id: Optional[str] = None  # as returned by a previous /chat reply
 
 
 class AIResponse(BaseModel):
@@ -22,64 +43,64 @@ class AIResponse(BaseModel):
     workflows: List[Dict] = []
     suggestions: List[str] = []
     confidence: float = 0.0
+    session_id: Optional[str] = None
 
 
 class WorkflowAssistant:
     def __init__(self, db_path: str = "workflows.db"):
         self.db_path = db_path
-        self.conversation_history = {}
+        # Bounded per-session turns; memory or SQLite, see session_store.py
+        self.conversation_history = create_session_store(db_path)
+        self.vector_index = VectorSearchIndex(db_path)
 
     def get_db_connection(self):
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         return conn
 
-    def search_workflows_intelligent(self, query: str, limit: int = 5) -> List[Dict]:
-        """Intelligent workflow search based on natural language query."""
-        conn = self.get_db_connection()
+    def resume_session(self, session_id: Optional[str]) -> str:
+        """The session to record a turn in.
 
-        # Extract keywords and intent from query
-        keywords = self.extract_keywords(query)
-        intent = self.detect_intent(query)
-
-        # Build search query
-        search_terms = []
-        for keyword in keywords:
-            search_terms.append(
-                f"name LIKE '%{keyword}%' OR description LIKE '%{keyword}%'"
-            )
+        ``session_id`` if it is a live session issued by this server,
+        otherwise a new one; ids chosen by the client are never adopted.
+        """
+        if session_id and self.conversation_history.get(session_id):
+            return session_id
+        return secrets.token_urlsafe(SESSION_ID_BYTES)
 
-        where_clause = " OR ".join(search_terms) if search_terms else "1=1"
+    def search_workflows_intelligent(self, query: str, limit: int = 5) -> List[Dict]:
+        """Intelligent workflow search based on natural language query.
 
-        # Add intent-based filtering
-        if intent == "automation":
-            where_clause += (
-                " AND (trigger_type = 'Scheduled' OR trigger_type = 'Complex')"
-            )
-        elif intent == "integration":
-            where_clause += " AND trigger_type = ?"
-            params.append('Webhook')
-        elif intent == "manual":
-            where_clause += " AND trigger_type = 'Manual'"
-
-        query_sql = f"""
-            SELECT * FROM workflows 
-            WHERE {where_clause}
-            ORDER BY 
-                CASE WHEN active = 1 THEN 1 ELSE 2 END,
-                node_count DESC
-            LIMIT ?
+        Ranks every workflow by TF-IDF cosine similarity to the query. The
+        detected intent narrows the trigger types when that still leaves
+        matches.
         """
+        intent_triggers = INTENT_TRIGGER_TYPES.get(self.detect_intent(query))
+        matches = self.vector_index.search(query, limit, intent_triggers)
+        if not matches and intent_triggers:
+            matches = self.vector_index.search(query, limit)
+        if not matches:
+            return []
 
-        cursor = conn.execute(query_sql)
+        conn = self.get_db_connection()
+        placeholders = ", ".join("?" * len(matches))
+        rows = conn.execute(
+            f"SELECT * FROM workflows WHERE id IN ({placeholders})",
+            [workflow_id for workflow_id, _ in matches],
+        ).fetchall()
+        conn.close()
+
+        rows_by_id = {row["id"]: row for row in rows}
         workflows = []
-        for row in cursor.fetchall():
-            workflow = dict(row)
+        for workflow_id, score in matches:
+            if workflow_id not in rows_by_id:
+                continue
+            workflow = dict(rows_by_id[workflow_id])
             workflow["integrations"] = json.loads(workflow["integrations"] or "[]")
             workflow["tags"] = json.loads(workflow["tags"] or "[]")
+            workflow["score"] = score
             workflows.append(workflow)
 
-        conn.close()
         return workflows
 
     def extract_keywords(self, query: str) -> List[str]:
@@ -269,17 +290,38 @@ async def chat_with_assistant(message: ChatMessage):
         # Calculate confidence
         confidence = assistant.calculate_confidence(message.message, workflows)
 
+        session_id = assistant.resume_session(message.session_id)
+        assistant.conversation_history.append(session_id, "user", message.message)
+        assistant.conversation_history.append(session_id, "assistant", response_text)
+
         return AIResponse(
             response=response_text,
             workflows=workflows,
             suggestions=suggestions,
             confidence=confidence,
+            session_id=session_id,
         )
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Assistant error: {str(e)}")
 
 
+@ai_app.get("/chat/sessions/{session_id}")
+async def get_chat_session(session_id: str):
+    """Recent turns of a conversation, by the session id /chat returned."""
+    turns = assistant.conversation_history.get(session_id)
+    if not turns:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    return {"session_id": session_id, "turns": turns}
+
+
+@ai_app.delete("/chat/sessions/{session_id}")
+async def clear_chat_session(session_id: str):
+    """Forget a conversation."""
+    assistant.conversation_history.clear(session_id)
+    return {"session_id": session_id, "cleared": True}
+
+
 @ai_app.get("/chat/interface")
 async def chat_interface():
     """Get the chat interface HTML."""
@@ -468,6 +510,9 @@ async def chat_interface():
         </div>
         
         <script>
+            // Issued by the server on the first reply; kept for this tab only
+            let sessionId = sessionStorage.getItem('assistantSession');
+
             async function sendMessage(message = null) {
                 const input = document.getElementById('messageInput');
                 const messageText = message || input.value.trim();
@@ -487,10 +532,14 @@ async def chat_interface():
                         headers: {
                             'Content-Type': 'application/json',
                         },
-                        body: JSON.stringify({ message: messageText })
+                        body: JSON.stringify({ message: messageText, session_id: sessionId })
                     });
                     
                     const data = await response.json();
+                    if (data.session_id) {
+                        sessionId = data.session_id;
+                        sessionStorage.setItem('assistantSession', sessionId);
+                    }
                     
                     // Remove typing indicator
                     document.getElementById(typingId).remove();
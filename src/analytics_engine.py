@@ -7,12 +7,20 @@ Provides insights, patterns, and usage analytics.
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.responses import HTMLResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any
-import sqlite3
+from typing import List, Dict, Any, Optional
 import json
-from datetime import datetime
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
 from collections import Counter, defaultdict
 
+# Co-occurrence counts are maintained by the indexer in the repository root
+sys.path.append(str(Path(__file__).parent.parent))
+
+from workflow_db import GenerationCheck, read_index_generation
+
 
 class AnalyticsResponse(BaseModel):
     overview: Dict[str, Any]
@@ -22,9 +30,145 @@ class AnalyticsResponse(BaseModel):
     generated_at: str
 
 
+class AnalyticsSnapshots:
+    """Analytics figures computed once per index generation.
+
+    Snapshots are stored in analytics_snapshots keyed by generation, so every
+    worker on the database shares them. After a reindex the previous snapshot
+    keeps being served while a background thread computes the new one; only
+    a database without any snapshot is computed inline.
+    """
+
+    RETAINED_SNAPSHOTS = 3
+
+    def __init__(self, analytics: "WorkflowAnalytics"):
+        self.analytics = analytics
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.generation_check = GenerationCheck()
+        self.lock = threading.Lock()
+        self.refreshing = False
+
+    def ensure_table(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS analytics_snapshots (
+                generation INTEGER PRIMARY KEY,
+                computed_at TEXT NOT NULL,
+                data TEXT NOT NULL
+            )
+        """)
+
+    def load(self, conn, generation: Optional[int] = None) -> Optional[Dict]:
+        """The snapshot for ``generation``, or the newest one when None."""
+        self.ensure_table(conn)
+        if generation is None:
+            row = conn.execute(
+                "SELECT generation, computed_at, data FROM analytics_snapshots ORDER BY generation DESC LIMIT 1"
+            ).fetchone()
+        else:
+            row = conn.execute(
+                "SELECT generation, computed_at, data FROM analytics_snapshots WHERE generation = ?",
+                (generation,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "generation": row["generation"],
+            "computed_at": row["computed_at"],
+            **json.loads(row["data"]),
+        }
+
+    def compute(self) -> Dict[str, Any]:
+        """Compute and store the snapshot for the current generation."""
+        conn = self.analytics.get_db_connection()
+        try:
+            generation = read_index_generation(conn)
+            data = {
+                "analytics": self.analytics.compute_workflow_analytics(conn),
+                "insights": self.analytics.compute_usage_insights(conn),
+            }
+            computed_at = datetime.now().isoformat()
+            self.ensure_table(conn)
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO analytics_snapshots (generation, computed_at, data) VALUES (?, ?, ?)",
+                    (generation, computed_at, json.dumps(data, default=str)),
+                )
+                conn.execute(
+                    """
+                    DELETE FROM analytics_snapshots WHERE generation NOT IN (
+                        SELECT generation FROM analytics_snapshots
+                        ORDER BY generation DESC LIMIT ?
+                    )
+                """,
+                    (self.RETAINED_SNAPSHOTS,),
+                )
+        finally:
+            conn.close()
+        # Round-trip through JSON so fresh and stored snapshots look the same
+        return {
+            "generation": generation,
+            "computed_at": computed_at,
+            **json.loads(json.dumps(data, default=str)),
+        }
+
+    def refresh_in_background(self):
+        with self.lock:
+            if self.refreshing:
+                return
+            self.refreshing = True
+
+        def run():
+            try:
+                self.snapshot = self.compute()
+            except Exception as e:
+                print(f"Analytics snapshot failed: {e}")
+            finally:
+                self.refreshing = False
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def get(self) -> Dict[str, Any]:
+        """The current snapshot, possibly one generation behind."""
+        if not self.generation_check.due() and self.snapshot:
+            return self.snapshot
+
+        conn = self.analytics.get_db_connection()
+        try:
+            generation = read_index_generation(conn)
+            if self.snapshot and self.snapshot["generation"] == generation:
+                return self.snapshot
+            # Another worker may already have computed it
+            snapshot = self.load(conn, generation)
+            if snapshot is None:
+                snapshot = self.snapshot or self.load(conn)
+                if snapshot is not None:
+                    self.refresh_in_background()
+        finally:
+            conn.close()
+
+        if snapshot is None:
+            with self.lock:
+                if self.snapshot is None:
+                    self.snapshot = self.compute()
+                return self.snapshot
+        self.snapshot = snapshot
+        return snapshot
+
+
 class WorkflowAnalytics:
     def __init__(self, db_path: str = "workflows.db"):
         self.db_path = db_path
+        self._cooccurrence = None
+        self.snapshots = AnalyticsSnapshots(self)
+
+    @property
+    def cooccurrence(self):
+        """Integration pair counts as arrays, loaded on first use (numpy)."""
+        if self._cooccurrence is None:
+            from workflow_cooccurrence import CooccurrenceMatrix
+
+            self._cooccurrence = CooccurrenceMatrix(self.db_path)
+        return self._cooccurrence
 
     def get_db_connection(self):
         conn = sqlite3.connect(self.db_path)
@@ -32,9 +176,11 @@ class WorkflowAnalytics:
         return conn
 
     def get_workflow_analytics(self) -> Dict[str, Any]:
-        """Get comprehensive workflow analytics."""
-        conn = self.get_db_connection()
+        """Get comprehensive workflow analytics from the current snapshot."""
+        return self.snapshots.get()["analytics"]
 
+    def compute_workflow_analytics(self, conn) -> Dict[str, Any]:
+        """Run the overview, distribution and pattern queries."""
         # Basic statistics
         cursor = conn.execute("SELECT COUNT(*) as total FROM workflows")
         total_workflows = cursor.fetchone()["total"]
@@ -78,15 +224,7 @@ class WorkflowAnalytics:
         node_stats = dict(cursor.fetchone())
 
         # Integration analysis
-        cursor = conn.execute(
-            "SELECT integrations FROM workflows WHERE integrations IS NOT NULL"
-        )
-        all_integrations = []
-        for row in cursor.fetchall():
-            integrations = json.loads(row["integrations"] or "[]")
-            all_integrations.extend(integrations)
-
-        integration_counts = Counter(all_integrations)
+        integration_counts = Counter(self.cooccurrence.integration_counts())
         top_integrations = dict(integration_counts.most_common(10))
 
         # Workflow patterns
@@ -101,8 +239,6 @@ class WorkflowAnalytics:
             top_integrations,
         )
 
-        conn.close()
-
         return {
             "overview": {
                 "total_workflows": total_workflows,
@@ -126,32 +262,15 @@ class WorkflowAnalytics:
 
     def analyze_workflow_patterns(self, conn) -> Dict[str, Any]:
         """Analyze common workflow patterns and relationships."""
-        # Integration co-occurrence analysis
-        cursor = conn.execute("""
-            SELECT name, integrations, trigger_type, complexity, node_count
-            FROM workflows 
-            WHERE integrations IS NOT NULL
-        """)
-
-        integration_pairs = defaultdict(int)
         service_categories = defaultdict(int)
+        for integration, count in self.cooccurrence.integration_counts().items():
+            service_categories[self.categorize_service(integration)] += count
 
-        for row in cursor.fetchall():
-            integrations = json.loads(row["integrations"] or "[]")
-
-            # Count service categories
-            for integration in integrations:
-                category = self.categorize_service(integration)
-                service_categories[category] += 1
-
-            # Find integration pairs
-            for i in range(len(integrations)):
-                for j in range(i + 1, len(integrations)):
-                    pair = tuple(sorted([integrations[i], integrations[j]]))
-                    integration_pairs[pair] += 1
-
-        # Most common integration pairs
-        top_pairs = dict(Counter(integration_pairs).most_common(5))
+        # Most common integration pairs, keyed "A,B" as in earlier responses
+        top_pairs = {
+            ",".join(pair["integrations"]): pair["workflows"]
+            for pair in self.cooccurrence.top_pairs(5)
+        }
 
         # Workflow complexity patterns
         cursor = conn.execute("""
@@ -178,6 +297,7 @@ class WorkflowAnalytics:
 
         return {
             "integration_pairs": top_pairs,
+            "integration_associations": self.cooccurrence.top_pairs(5, rank_by="lift"),
             "service_categories": dict(service_categories),
             "complexity_patterns": complexity_patterns[:10],
         }
@@ -271,30 +391,129 @@ class WorkflowAnalytics:
         return recommendations
 
     def get_trend_analysis(self, days: int = 30) -> Dict[str, Any]:
-        """Analyze trends over time (simulated for demo)."""
-        # In a real implementation, this would analyze historical data
+        """Corpus and integration changes over the last ``days`` days.
+
+        Read from the daily rollups the indexer keeps (index_daily_changes,
+        integration_daily_deltas), so the cost depends on the window only.
+        """
+        since = (
+            datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+        ).isoformat()
+        conn = self.get_db_connection()
+        daily = [
+            dict(row)
+            for row in conn.execute(
+                """
+                SELECT day, runs, added, updated, removed, workflows, nodes
+                FROM index_daily_changes WHERE day >= ? ORDER BY day
+            """,
+                (since,),
+            )
+        ]
+        baseline = conn.execute(
+            "SELECT workflows, nodes FROM index_daily_changes WHERE day < ? ORDER BY day DESC LIMIT 1",
+            (since,),
+        ).fetchone()
+        current_workflows, current_nodes = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(node_count), 0) FROM workflows"
+        ).fetchone()
+        deltas = {
+            row["integration"]: row["change"]
+            for row in conn.execute(
+                """
+                SELECT integration, SUM(delta) AS change
+                FROM integration_daily_deltas WHERE day >= ?
+                GROUP BY integration HAVING SUM(delta) != 0
+            """,
+                (since,),
+            )
+        }
+        conn.close()
+
+        added = sum(day["added"] for day in daily)
+        removed = sum(day["removed"] for day in daily)
+        net_change = added - removed
+        if baseline:
+            starting_size = baseline["workflows"]
+        elif daily:
+            first = daily[0]
+            starting_size = first["workflows"] - first["added"] + first["removed"]
+        else:
+            starting_size = 0
+
+        # Average nodes per workflow now and at the start of the window (the
+        # rollups only know node totals per day since schema 14)
+        average_nodes = current_nodes / current_workflows if current_workflows else 0
+        starting_average = (
+            baseline["nodes"] / baseline["workflows"]
+            if baseline and baseline["nodes"] is not None and baseline["workflows"]
+            else None
+        )
+
+        counts = self.cooccurrence.integration_counts()
+        rising = sorted(deltas.items(), key=lambda item: (-item[1], item[0]))
+        falling = sorted(deltas.items(), key=lambda item: (item[1], item[0]))
+
+        category_trends: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"usage": 0, "change": 0}
+        )
+        for integration, count in counts.items():
+            category_trends[self.categorize_service(integration)]["usage"] += count
+        for integration, change in deltas.items():
+            category_trends[self.categorize_service(integration)]["change"] += change
+
         return {
+            "period_days": days,
             "workflow_growth": {
-                "daily_average": 2.3,
-                "growth_rate": 15.2,
-                "trend": "increasing",
+                "added": added,
+                "updated": sum(day["updated"] for day in daily),
+                "removed": removed,
+                "net_change": net_change,
+                "daily_average": round(net_change / days, 2),
+                "growth_rate": round(net_change / starting_size * 100, 2)
+                if starting_size
+                else 0,
+                "trend": "increasing"
+                if net_change > 0
+                else "decreasing"
+                if net_change < 0
+                else "stable",
             },
             "popular_integrations": {
-                "trending_up": ["OpenAI", "Slack", "Google Sheets"],
-                "trending_down": ["Twitter", "Facebook"],
-                "stable": ["Telegram", "Airtable"],
+                "trending_up": [name for name, change in rising if change > 0][:5],
+                "trending_down": [name for name, change in falling if change < 0][:5],
+                "stable": [
+                    name
+                    for name, _ in Counter(counts).most_common()
+                    if name not in deltas
+                ][:5],
+                "largest_changes": {**dict(rising[:10]), **dict(falling[:10])},
             },
             "complexity_trends": {
-                "average_nodes": 12.5,
-                "complexity_increase": 8.3,
-                "automation_maturity": "intermediate",
+                "average_nodes": round(average_nodes, 2),
+                "complexity_increase": round(
+                    (average_nodes - starting_average) / starting_average * 100, 2
+                )
+                if starting_average
+                else 0,
+                # Same thresholds as the low/medium/high complexity levels
+                "automation_maturity": "beginner"
+                if average_nodes <= 5
+                else "intermediate"
+                if average_nodes <= 15
+                else "advanced",
             },
+            # Usage = workflow/integration pairs per service category
+            "category_trends": dict(category_trends),
+            "daily": daily,
         }
 
     def get_usage_insights(self) -> Dict[str, Any]:
-        """Get usage insights and patterns."""
-        conn = self.get_db_connection()
+        """Get usage insights and patterns from the current snapshot."""
+        return self.snapshots.get()["insights"]
 
+    def compute_usage_insights(self, conn) -> Dict[str, Any]:
+        """Run the activation-rate queries behind the usage insights."""
         # Active vs inactive analysis
         cursor = conn.execute("""
             SELECT 
@@ -326,8 +545,6 @@ class WorkflowAnalytics:
             usage_patterns, key=lambda x: x["activation_rate"], reverse=True
         )[:5]
 
-        conn.close()
-
         return {
             "usage_patterns": usage_patterns,
             "most_effective_patterns": effective_patterns,
@@ -375,6 +592,29 @@ async def get_trend_analysis(days: int = Query(30, ge=1, le=365)):
         raise HTTPException(status_code=500, detail=f"Trend analysis error: {str(e)}")
 
 
+@analytics_app.get("/analytics/integration-pairs")
+async def get_integration_pairs(
+    rank_by: str = Query("count", pattern="^(count|lift|pmi)$"),
+    integration: str = Query("", description="Only pairs involving this integration"),
+    min_count: Optional[int] = Query(
+        None, ge=1, description="Fewest shared workflows for lift/PMI (default 3)"
+    ),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Integration pairs ranked by shared workflows, lift or PMI."""
+    try:
+        return {
+            "rank_by": rank_by,
+            "pairs": analytics_engine.cooccurrence.top_pairs(
+                limit, rank_by, min_count, integration
+            ),
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Integration pairs error: {str(e)}"
+        )
+
+
 @analytics_app.get("/analytics/insights")
 async def get_usage_insights():
     """Get usage insights and patterns."""
@@ -4,12 +4,123 @@ Community Features Module for n8n Workflows Repository
 Implements rating, review, and social features
 """
 
+import atexit
+import math
+import os
 import sqlite3
 import json
+import threading
+import time
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
+from fastapi import HTTPException
+
+# View/download counters are buffered in memory and written in one
+# transaction this often (seconds); 0 writes every event immediately
+DEFAULT_COUNTER_FLUSH_INTERVAL = 5.0
+# Buffered events that trigger a flush before the interval is up
+COUNTER_FLUSH_THRESHOLD = 1000
+MAX_EVENT_BATCH = 1000
+COUNTER_EVENT_TYPES = ("view", "download")
+
+# Trending scores halve every TRENDING_HALF_LIFE_HOURS. They are stored as
+# log2(sum of events * 2 ** (hour / half-life)): decay then affects every
+# workflow alike, so the stored value orders workflows without ever being
+# rewritten, and the log keeps it finite
+TRENDING_HALF_LIFE_HOURS = 24
+# Decayed events below which a workflow no longer counts as trending
+TRENDING_MIN_SCORE = 0.5
+
+
+def current_hour() -> int:
+    """Hours since the Unix epoch, the key of the event buckets"""
+    return int(time.time() // 3600)
+
+
+def trending_term(hour: int, events: int) -> float:
+    """Stored-score contribution of ``events`` events during ``hour``"""
+    return math.log2(events) + hour / TRENDING_HALF_LIFE_HOURS
+
+
+def log2_add(score: Optional[float], term: float) -> float:
+    """log2(2 ** score + 2 ** term) without overflow; None is an empty score"""
+    if score is None:
+        return term
+    high, low = max(score, term), min(score, term)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def decayed_score(score: float, hour: Optional[int] = None) -> float:
+    """A stored trending score as decayed events at ``hour`` (default now)"""
+    hour = current_hour() if hour is None else hour
+    return 2 ** (score - hour / TRENDING_HALF_LIFE_HOURS)
+
+
+def write_counter_batch(
+    conn: sqlite3.Connection, batch: Dict[Tuple[str, int], List[int]]
+):
+    """Apply buffered {(workflow_id, hour): [views, downloads]} increments.
+
+    Updates the totals and popularity score, appends to the hourly event
+    buckets and folds the events into each workflow's trending score.
+    """
+    totals: Dict[str, List[int]] = {}
+    for (workflow_id, _), (views, downloads) in batch.items():
+        counts = totals.setdefault(workflow_id, [0, 0])
+        counts[0] += views
+        counts[1] += downloads
+
+    conn.executemany(
+        """
+        INSERT INTO workflow_stats
+        (workflow_id, total_views, total_downloads, popularity_score, last_updated)
+        VALUES (?1, ?2, ?3, ?2 + ?3, CURRENT_TIMESTAMP)
+        ON CONFLICT(workflow_id) DO UPDATE SET
+            total_views = total_views + excluded.total_views,
+            total_downloads = total_downloads + excluded.total_downloads,
+            popularity_score = popularity_score + excluded.popularity_score,
+            last_updated = CURRENT_TIMESTAMP
+    """,
+        [
+            (workflow_id, views, downloads)
+            for workflow_id, (views, downloads) in totals.items()
+        ],
+    )
+    conn.executemany(
+        """
+        INSERT INTO workflow_event_buckets (workflow_id, hour, views, downloads)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(workflow_id, hour) DO UPDATE SET
+            views = views + excluded.views,
+            downloads = downloads + excluded.downloads
+    """,
+        [
+            (workflow_id, hour, views, downloads)
+            for (workflow_id, hour), (views, downloads) in batch.items()
+        ],
+    )
+
+    scores: Dict[str, Optional[float]] = {}
+    for workflow_id, score in conn.execute(
+        f"""
+        SELECT workflow_id, trending_score FROM workflow_stats
+        WHERE workflow_id IN ({", ".join("?" * len(totals))})
+    """,
+        list(totals),
+    ):
+        scores[workflow_id] = score
+    for (workflow_id, hour), (views, downloads) in batch.items():
+        if views + downloads:
+            scores[workflow_id] = log2_add(
+                scores.get(workflow_id), trending_term(hour, views + downloads)
+            )
+    conn.executemany(
+        "UPDATE workflow_stats SET trending_score = ? WHERE workflow_id = ?",
+        [(score, workflow_id) for workflow_id, score in scores.items()],
+    )
+
 
 @dataclass
 class WorkflowRating:
@@ -37,6 +148,145 @@ class WorkflowStats:
     last_updated: datetime
 
 
+class CounterBuffer:
+    """Write-behind buffer for view and download counters.
+
+    Increments are summed per workflow in memory and written by a background
+    thread in a single transaction, so page views no longer take the SQLite
+    write lock one by one. A failed flush is merged back and retried; the
+    buffer is flushed on interpreter exit and app shutdown.
+    """
+
+    def __init__(
+        self, db_path: str, flush_interval: float = DEFAULT_COUNTER_FLUSH_INTERVAL
+    ):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        # (workflow_id, hour) -> [views, downloads]
+        self.pending: Dict[Tuple[str, int], List[int]] = {}
+        self.pending_events = 0
+        self.oldest_pending: Optional[float] = None
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.flushes = 0
+        self.flushed_events = 0
+        self.failed_flushes = 0
+        self.last_flush_at: Optional[float] = None
+        self.last_flush_seconds = 0.0
+        atexit.register(self.close)
+
+    def add(self, workflow_id: str, views: int = 0, downloads: int = 0):
+        hour = current_hour()
+        with self.lock:
+            counts = self.pending.setdefault((workflow_id, hour), [0, 0])
+            counts[0] += views
+            counts[1] += downloads
+            self.pending_events += views + downloads
+            if self.oldest_pending is None:
+                self.oldest_pending = time.time()
+            over_threshold = self.pending_events >= COUNTER_FLUSH_THRESHOLD
+
+        if self.flush_interval <= 0:
+            self.flush()
+            return
+        if self.thread is None:
+            self.start()
+        if over_threshold:
+            self.wake.set()
+
+    def get_pending(self, workflow_id: str) -> Tuple[int, int]:
+        """Unflushed (views, downloads) of one workflow."""
+        views = downloads = 0
+        with self.lock:
+            for (pending_id, _), counts in self.pending.items():
+                if pending_id == workflow_id:
+                    views += counts[0]
+                    downloads += counts[1]
+        return views, downloads
+
+    def start(self):
+        with self.lock:
+            if self.thread is not None or self.stopped.is_set():
+                return
+            self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Write every buffered increment in one transaction; returns the events written."""
+        with self.flush_lock:
+            with self.lock:
+                batch, self.pending = self.pending, {}
+                events, self.pending_events = self.pending_events, 0
+                oldest, self.oldest_pending = self.oldest_pending, None
+            if not batch:
+                return 0
+
+            started = time.time()
+            try:
+                conn = sqlite3.connect(self.db_path, timeout=10)
+                try:
+                    with conn:
+                        write_counter_batch(conn, batch)
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                print(f"Error flushing workflow counters: {e}")
+                self.failed_flushes += 1
+                # Put the batch back so the next flush retries it
+                with self.lock:
+                    for key, (views, downloads) in batch.items():
+                        counts = self.pending.setdefault(key, [0, 0])
+                        counts[0] += views
+                        counts[1] += downloads
+                    self.pending_events += events
+                    if self.oldest_pending is None or oldest < self.oldest_pending:
+                        self.oldest_pending = oldest
+                return 0
+
+            self.flushes += 1
+            self.flushed_events += events
+            self.last_flush_at = time.time()
+            self.last_flush_seconds = self.last_flush_at - started
+            return events
+
+    def close(self):
+        """Stop the flush thread and write whatever is still buffered."""
+        self.stopped.set()
+        self.wake.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=10)
+        self.flush()
+
+    def stats(self) -> Dict:
+        with self.lock:
+            pending_workflows = len({workflow_id for workflow_id, _ in self.pending})
+            pending_events = self.pending_events
+            oldest = self.oldest_pending
+        return {
+            "flush_interval": self.flush_interval,
+            "pending_workflows": pending_workflows,
+            "pending_events": pending_events,
+            # Age of the oldest event not yet in the database
+            "flush_lag_seconds": round(time.time() - oldest, 3) if oldest else 0.0,
+            "flushes": self.flushes,
+            "flushed_events": self.flushed_events,
+            "failed_flushes": self.failed_flushes,
+            "last_flush_seconds": round(self.last_flush_seconds, 4),
+            "last_flush_at": datetime.fromtimestamp(self.last_flush_at).isoformat()
+            if self.last_flush_at
+            else None,
+        }
+
+
 class CommunityFeatures:
     """Community features manager for workflow repository"""
 
@@ -44,6 +294,14 @@ class CommunityFeatures:
         """Initialize community features with database connection"""
         self.db_path = db_path
         self.init_community_tables()
+        self.counters = CounterBuffer(
+            db_path,
+            float(
+                os.environ.get(
+                    "COMMUNITY_COUNTER_FLUSH_INTERVAL", DEFAULT_COUNTER_FLUSH_INTERVAL
+                )
+            ),
+        )
 
     def init_community_tables(self):
         """Initialize community feature database tables"""
@@ -78,6 +336,50 @@ class CommunityFeatures:
             )
         """)
 
+        # Running sum behind average_rating, so rating writes can apply a
+        # delta instead of re-aggregating every rating of the workflow
+        stats_columns = {
+            row[1] for row in cursor.execute("PRAGMA table_info(workflow_stats)")
+        }
+        if "rating_sum" not in stats_columns:
+            cursor.execute(
+                "ALTER TABLE workflow_stats ADD COLUMN rating_sum INTEGER DEFAULT 0"
+            )
+            self.recompute_rating_stats(conn)
+
+        # Indexed popularity (views + downloads) and trending scores, kept up
+        # to date by counter flushes so rankings are index range scans
+        if "popularity_score" not in stats_columns:
+            cursor.execute(
+                "ALTER TABLE workflow_stats ADD COLUMN popularity_score INTEGER NOT NULL DEFAULT 0"
+            )
+            cursor.execute("""
+                UPDATE workflow_stats
+                SET popularity_score = COALESCE(total_views, 0) + COALESCE(total_downloads, 0)
+            """)
+        if "trending_score" not in stats_columns:
+            cursor.execute("ALTER TABLE workflow_stats ADD COLUMN trending_score REAL")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_workflow_stats_popularity
+            ON workflow_stats(popularity_score DESC, workflow_id)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_workflow_stats_trending
+            ON workflow_stats(trending_score DESC, workflow_id)
+        """)
+
+        # Hourly view/download buckets written by counter flushes; trending
+        # scores can be rebuilt from them
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS workflow_event_buckets (
+                workflow_id TEXT NOT NULL,
+                hour INTEGER NOT NULL, -- hours since the Unix epoch
+                views INTEGER NOT NULL DEFAULT 0,
+                downloads INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (workflow_id, hour)
+            ) WITHOUT ROWID
+        """)
+
         # User profiles
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS user_profiles (
@@ -132,27 +434,46 @@ class CommunityFeatures:
         if not (1 <= rating <= 5):
             raise ValueError("Rating must be between 1 and 5")
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        conn = sqlite3.connect(self.db_path, timeout=10)
 
         try:
+            # Write lock first, so the previous rating read below cannot
+            # change before the delta is applied
+            conn.execute("BEGIN IMMEDIATE")
+            previous = conn.execute(
+                "SELECT rating, review FROM workflow_ratings WHERE workflow_id = ? AND user_id = ?",
+                (workflow_id, user_id),
+            ).fetchone()
+
             # Insert or update rating
-            cursor.execute(
+            conn.execute(
                 """
-                INSERT OR REPLACE INTO workflow_ratings 
-                (workflow_id, user_id, rating, review, updated_at)
+                INSERT INTO workflow_ratings (workflow_id, user_id, rating, review, updated_at)
                 VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(workflow_id, user_id) DO UPDATE SET
+                    rating = excluded.rating,
+                    review = excluded.review,
+                    updated_at = CURRENT_TIMESTAMP
             """,
                 (workflow_id, user_id, rating, review),
             )
 
-            # Update workflow statistics
-            self._update_workflow_stats(workflow_id)
+            # Apply the change to the running totals
+            previous_rating, previous_review = previous or (0, None)
+            self._apply_rating_delta(
+                conn,
+                workflow_id,
+                ratings=0 if previous else 1,
+                rating_sum=rating - previous_rating,
+                reviews=(review is not None)
+                - (previous is not None and previous_review is not None),
+            )
 
             conn.commit()
             return True
 
         except Exception as e:
+            conn.rollback()
             print(f"Error adding rating: {e}")
             return False
         finally:
@@ -211,67 +532,83 @@ class CommunityFeatures:
         row = cursor.fetchone()
         conn.close()
 
+        # Include increments that are still buffered
+        pending_views, pending_downloads = self.counters.get_pending(workflow_id)
         if row:
             return WorkflowStats(
                 workflow_id=row[0],
                 total_ratings=row[1],
                 average_rating=row[2],
                 total_reviews=row[3],
-                total_views=row[4],
-                total_downloads=row[5],
+                total_views=row[4] + pending_views,
+                total_downloads=row[5] + pending_downloads,
                 last_updated=datetime.fromisoformat(row[6]) if row[6] else None,
             )
+        if pending_views or pending_downloads:
+            return WorkflowStats(
+                workflow_id=workflow_id,
+                total_ratings=0,
+                average_rating=0.0,
+                total_reviews=0,
+                total_views=pending_views,
+                total_downloads=pending_downloads,
+                last_updated=None,
+            )
         return None
 
     def increment_view(self, workflow_id: str):
-        """Increment view count for a workflow"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            INSERT OR IGNORE INTO workflow_stats (workflow_id, total_views)
-            VALUES (?, 1)
-        """,
-            (workflow_id,),
-        )
-
-        cursor.execute(
-            """
-            UPDATE workflow_stats 
-            SET total_views = total_views + 1, last_updated = CURRENT_TIMESTAMP
-            WHERE workflow_id = ?
-        """,
-            (workflow_id,),
-        )
-
-        conn.commit()
-        conn.close()
+        """Increment view count for a workflow (buffered)"""
+        self.counters.add(workflow_id, views=1)
 
     def increment_download(self, workflow_id: str):
-        """Increment download count for a workflow"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            INSERT OR IGNORE INTO workflow_stats (workflow_id, total_downloads)
-            VALUES (?, 1)
-        """,
-            (workflow_id,),
-        )
-
-        cursor.execute(
-            """
-            UPDATE workflow_stats 
-            SET total_downloads = total_downloads + 1, last_updated = CURRENT_TIMESTAMP
-            WHERE workflow_id = ?
-        """,
-            (workflow_id,),
-        )
+        """Increment download count for a workflow (buffered)"""
+        self.counters.add(workflow_id, downloads=1)
+
+    def record_events(self, events: List[Dict]) -> int:
+        """Buffer a batch of {"workflow_id", "type", "count"} events
+
+        A batch may carry at most MAX_EVENT_BATCH events in total, counting
+        each event's ``count``.
+        """
+        if not isinstance(events, list):
+            raise ValueError("events must be a list")
+        if len(events) > MAX_EVENT_BATCH:
+            raise ValueError(f"At most {MAX_EVENT_BATCH} events per batch")
+
+        increments = []
+        for event in events:
+            if not isinstance(event, dict):
+                raise ValueError("Each event must be an object")
+            workflow_id = event.get("workflow_id")
+            event_type = event.get("type")
+            count = event.get("count", 1)
+            if not isinstance(workflow_id, str) or not workflow_id:
+                raise ValueError("Each event needs a workflow_id")
+            if event_type not in COUNTER_EVENT_TYPES:
+                raise ValueError(
+                    f"Event type must be one of: {', '.join(COUNTER_EVENT_TYPES)}"
+                )
+            # bool is an int subclass; true/false are not counts
+            if (
+                not isinstance(count, int)
+                or isinstance(count, bool)
+                or not 1 <= count <= MAX_EVENT_BATCH
+            ):
+                raise ValueError(f"Event count must be between 1 and {MAX_EVENT_BATCH}")
+            increments.append((workflow_id, event_type, count))
+
+        if sum(count for _, _, count in increments) > MAX_EVENT_BATCH:
+            raise ValueError(
+                f"At most {MAX_EVENT_BATCH} events per batch, counting each event's count"
+            )
 
-        conn.commit()
-        conn.close()
+        # Validate everything first so a bad event rejects the whole batch
+        for workflow_id, event_type, count in increments:
+            if event_type == "view":
+                self.counters.add(workflow_id, views=count)
+            else:
+                self.counters.add(workflow_id, downloads=count)
+        return len(increments)
 
     def get_top_rated_workflows(self, limit: int = 10) -> List[Dict]:
         """Get top-rated workflows"""
@@ -310,16 +647,73 @@ class CommunityFeatures:
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
+        # CROSS JOIN keeps workflow_stats as the outer loop, so rows come off
+        # the popularity index in order and the scan stops at the limit
         cursor.execute(
             """
-            SELECT w.filename, w.name, w.description, ws.total_views, ws.total_downloads
-            FROM workflows w
-            LEFT JOIN workflow_stats ws ON w.filename = ws.workflow_id
-            ORDER BY (ws.total_views + ws.total_downloads) DESC
+            SELECT w.filename, w.name, w.description, ws.total_views, ws.total_downloads,
+                   ws.popularity_score
+            FROM workflow_stats ws
+            CROSS JOIN workflows w ON w.filename = ws.workflow_id
+            ORDER BY ws.popularity_score DESC, ws.workflow_id
             LIMIT ?
         """,
             (limit,),
         )
+        rows = cursor.fetchall()
+
+        # Workflows that were never viewed or rated fill the rest, by filename
+        if len(rows) < limit:
+            cursor.execute(
+                """
+                SELECT w.filename, w.name, w.description, 0, 0, 0
+                FROM workflows w
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM workflow_stats ws WHERE ws.workflow_id = w.filename
+                )
+                ORDER BY w.filename
+                LIMIT ?
+            """,
+                (limit - len(rows),),
+            )
+            rows += cursor.fetchall()
+
+        results = []
+        for row in rows:
+            results.append(
+                {
+                    "filename": row[0],
+                    "name": row[1],
+                    "description": row[2],
+                    "total_views": row[3] or 0,
+                    "total_downloads": row[4] or 0,
+                    "popularity_score": row[5],
+                }
+            )
+
+        conn.close()
+        return results
+
+    def get_trending_workflows(self, limit: int = 10) -> List[Dict]:
+        """Get workflows with the most recent views and downloads (time-decayed)"""
+        hour = current_hour()
+        # Stored score equivalent to TRENDING_MIN_SCORE decayed events now
+        floor = trending_term(hour, 1) + math.log2(TRENDING_MIN_SCORE)
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT w.filename, w.name, w.description, ws.total_views, ws.total_downloads,
+                   ws.trending_score
+            FROM workflow_stats ws
+            CROSS JOIN workflows w ON w.filename = ws.workflow_id
+            WHERE ws.trending_score > ?
+            ORDER BY ws.trending_score DESC, ws.workflow_id
+            LIMIT ?
+        """,
+            (floor, limit),
+        )
 
         results = []
         for row in cursor.fetchall():
@@ -330,6 +724,7 @@ class CommunityFeatures:
                     "description": row[2],
                     "total_views": row[3] or 0,
                     "total_downloads": row[4] or 0,
+                    "trending_score": round(decayed_score(row[5], hour), 3),
                 }
             )
 
@@ -404,35 +799,117 @@ class CommunityFeatures:
         conn.close()
         return collections
 
-    def _update_workflow_stats(self, workflow_id: str):
-        """Update workflow statistics after rating changes"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Calculate new statistics
-        cursor.execute(
+    def _apply_rating_delta(
+        self,
+        conn: sqlite3.Connection,
+        workflow_id: str,
+        ratings: int,
+        rating_sum: int,
+        reviews: int,
+    ):
+        """Add a rating change to workflow_stats inside the caller's transaction"""
+        conn.execute(
             """
-            SELECT COUNT(*), AVG(rating), COUNT(CASE WHEN review IS NOT NULL THEN 1 END)
-            FROM workflow_ratings 
-            WHERE workflow_id = ?
+            INSERT INTO workflow_stats
+            (workflow_id, total_ratings, rating_sum, average_rating, total_reviews, last_updated)
+            VALUES (?1, ?2, ?3, CAST(?3 AS REAL) / MAX(?2, 1), ?4, CURRENT_TIMESTAMP)
+            ON CONFLICT(workflow_id) DO UPDATE SET
+                total_ratings = total_ratings + excluded.total_ratings,
+                rating_sum = rating_sum + excluded.rating_sum,
+                average_rating = CAST(rating_sum + excluded.rating_sum AS REAL)
+                    / MAX(total_ratings + excluded.total_ratings, 1),
+                total_reviews = total_reviews + excluded.total_reviews,
+                last_updated = CURRENT_TIMESTAMP
         """,
-            (workflow_id,),
+            (workflow_id, ratings, rating_sum, reviews),
         )
 
-        total_ratings, avg_rating, total_reviews = cursor.fetchone()
+    def recompute_rating_stats(
+        self,
+        conn: Optional[sqlite3.Connection] = None,
+        workflow_ids: Optional[List[str]] = None,
+    ) -> int:
+        """Rebuild rating totals from workflow_ratings (repair tool).
+
+        Covers every workflow, or only ``workflow_ids``; view and download
+        counts are left alone. Returns the number of workflows updated.
+        """
+        own_connection = conn is None
+        if own_connection:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+
+        scope, params = "", []
+        if workflow_ids is not None:
+            scope = f"WHERE workflow_id IN ({', '.join('?' * len(workflow_ids))})"
+            params = list(workflow_ids)
 
-        # Update or insert statistics
-        cursor.execute(
-            """
-            INSERT OR REPLACE INTO workflow_stats 
-            (workflow_id, total_ratings, average_rating, total_reviews, last_updated)
-            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-        """,
-            (workflow_id, total_ratings or 0, avg_rating or 0.0, total_reviews or 0),
-        )
+        try:
+            # Stats rows whose ratings are all gone are reset to zero
+            conn.execute(
+                f"""
+                UPDATE workflow_stats
+                SET total_ratings = 0, rating_sum = 0, average_rating = 0.0, total_reviews = 0
+                {scope or "WHERE 1"} AND workflow_id NOT IN (SELECT workflow_id FROM workflow_ratings)
+            """,
+                params,
+            )
+            cursor = conn.execute(
+                f"""
+                INSERT INTO workflow_stats
+                (workflow_id, total_ratings, rating_sum, average_rating, total_reviews, last_updated)
+                SELECT workflow_id, COUNT(*), SUM(rating), AVG(rating),
+                       COUNT(CASE WHEN review IS NOT NULL THEN 1 END), CURRENT_TIMESTAMP
+                FROM workflow_ratings
+                {scope}
+                GROUP BY workflow_id
+                ON CONFLICT(workflow_id) DO UPDATE SET
+                    total_ratings = excluded.total_ratings,
+                    rating_sum = excluded.rating_sum,
+                    average_rating = excluded.average_rating,
+                    total_reviews = excluded.total_reviews,
+                    last_updated = CURRENT_TIMESTAMP
+            """,
+                params,
+            )
+            updated = cursor.rowcount
+            if own_connection:
+                conn.commit()
+            return updated
+        finally:
+            if own_connection:
+                conn.close()
 
-        conn.commit()
-        conn.close()
+    def recompute_activity_scores(self) -> int:
+        """Rebuild popularity and trending scores (repair tool).
+
+        Popularity comes from the view/download totals, trending scores from
+        the hourly event buckets. Returns the number of workflows scored.
+        """
+        self.counters.flush()
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            scores: Dict[str, float] = {}
+            for workflow_id, hour, events in conn.execute("""
+                SELECT workflow_id, hour, views + downloads FROM workflow_event_buckets
+                WHERE views + downloads > 0
+            """):
+                scores[workflow_id] = log2_add(
+                    scores.get(workflow_id), trending_term(hour, events)
+                )
+
+            with conn:
+                conn.execute("""
+                    UPDATE workflow_stats
+                    SET popularity_score = COALESCE(total_views, 0) + COALESCE(total_downloads, 0),
+                        trending_score = NULL
+                """)
+                conn.executemany(
+                    "UPDATE workflow_stats SET trending_score = ? WHERE workflow_id = ?",
+                    [(score, workflow_id) for workflow_id, score in scores.items()],
+                )
+            return conn.execute("SELECT COUNT(*) FROM workflow_stats").fetchone()[0]
+        finally:
+            conn.close()
 
 
 # Example usage and API endpoints
@@ -490,12 +967,55 @@ def create_community_api_endpoints(app):
         community.increment_download(workflow_id)
         return {"success": True}
 
+    @app.post("/api/workflows/events")
+    async def track_workflow_events(batch: dict):
+        """Track a batch of views and downloads"""
+        try:
+            accepted = community.record_events(batch.get("events", []))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"success": True, "accepted": accepted}
+
+    @app.get("/api/community/counters")
+    async def get_counter_stats():
+        """Counter buffer metrics, including flush lag"""
+        return community.counters.stats()
+
+    @app.on_event("shutdown")
+    async def flush_counters():
+        """Write buffered counters before the process exits"""
+        community.counters.close()
+
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="N8N Community Features")
+    parser.add_argument("--db", default="workflows.db", help="Database path")
+    parser.add_argument(
+        "--recompute-scores",
+        action="store_true",
+        help="Rebuild popularity and trending scores from counters and event buckets",
+    )
+    parser.add_argument(
+        "--recompute-ratings",
+        action="store_true",
+        help="Rebuild rating totals from the individual ratings",
+    )
+    args = parser.parse_args()
+
     # Initialize community features
-    community = CommunityFeatures()
+    community = CommunityFeatures(args.db)
     print("✅ Community features initialized successfully!")
 
+    if args.recompute_ratings:
+        updated = community.recompute_rating_stats()
+        print(f"🔧 Recomputed rating stats for {updated} workflows")
+
+    if args.recompute_scores:
+        updated = community.recompute_activity_scores()
+        print(f"🔧 Recomputed activity scores for {updated} workflows")
+
     # Example: Add a rating
     # community.add_rating("example-workflow.json", "user123", 5, "Great workflow!")
 
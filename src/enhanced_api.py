@@ -5,8 +5,10 @@ Advanced features, analytics, and performance optimizations
 """
 
 import sqlite3
+import sys
 import time
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, List, Optional
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
@@ -14,8 +16,12 @@ from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
 import uvicorn
 
+# Index modules (similarity, co-occurrence) live in the repository root
+sys.path.append(str(Path(__file__).parent.parent))
+
 # Import community features
 from community_features import CommunityFeatures, create_community_api_endpoints
+from analytics_engine import WorkflowAnalytics
 
 
 class WorkflowSearchRequest(BaseModel):
@@ -54,6 +60,8 @@ class EnhancedAPI:
         """Initialize enhanced API"""
         self.db_path = db_path
         self.community = CommunityFeatures(db_path)
+        self.related_index = None  # created on first use; it loads numpy
+        self.analytics = WorkflowAnalytics(db_path)
         self.app = FastAPI(
             title="N8N Workflows Enhanced API",
             description="Advanced API for n8n workflows repository with community features",
@@ -420,37 +428,20 @@ class EnhancedAPI:
 
     def _get_trending_workflows(self, limit: int) -> List[Dict]:
         """Get trending workflows based on recent activity"""
-        return self.community.get_most_popular_workflows(limit)
+        return self.community.get_trending_workflows(limit)
 
     def _get_analytics_overview(self) -> Dict:
-        """Get analytics overview"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Total workflows
-        cursor.execute("SELECT COUNT(*) FROM workflows")
-        total_workflows = cursor.fetchone()[0]
-
-        # Active workflows
-        cursor.execute("SELECT COUNT(*) FROM workflows WHERE active = 1")
-        active_workflows = cursor.fetchone()[0]
-
-        # Categories
-        cursor.execute("SELECT category, COUNT(*) FROM workflows GROUP BY category")
-        categories = dict(cursor.fetchall())
-
-        # Integrations
-        cursor.execute("SELECT COUNT(DISTINCT integrations) FROM workflows")
-        unique_integrations = cursor.fetchone()[0]
-
-        conn.close()
+        """Get analytics overview from the shared analytics snapshot"""
+        snapshot = self.analytics.snapshots.get()
+        overview = snapshot["analytics"]["overview"]
 
         return {
-            "total_workflows": total_workflows,
-            "active_workflows": active_workflows,
-            "categories": categories,
-            "unique_integrations": unique_integrations,
-            "timestamp": datetime.now().isoformat(),
+            "total_workflows": overview["total_workflows"],
+            "active_workflows": overview["active_workflows"],
+            "categories": snapshot["analytics"]["patterns"]["service_categories"],
+            "unique_integrations": overview["unique_integrations"],
+            "snapshot_generation": snapshot["generation"],
+            "timestamp": snapshot["computed_at"],
         }
 
     def _get_custom_analytics(self, request: AnalyticsRequest) -> Dict:
@@ -496,41 +487,12 @@ class EnhancedAPI:
         }
 
     def _get_related_workflows(self, workflow_id: str, limit: int = 5) -> List[Dict]:
-        """Get related workflows based on similar integrations or categories"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Get related workflows by MinHash similarity of node types and integrations"""
+        if self.related_index is None:
+            from workflow_similarity import RelatedWorkflowsIndex
 
-        # Get current workflow details
-        cursor.execute(
-            "SELECT integrations, category FROM workflows WHERE filename = ?",
-            (workflow_id,),
-        )
-        current_workflow = cursor.fetchone()
-
-        if not current_workflow:
-            conn.close()
-            return []
-
-        current_integrations = current_workflow[0] or ""
-        current_category = current_workflow[1] or ""
-
-        # Find related workflows
-        cursor.execute(
-            """
-            SELECT filename, name, description FROM workflows 
-            WHERE filename != ? 
-            AND (integrations LIKE ? OR category = ?)
-            LIMIT ?
-        """,
-            (workflow_id, f"%{current_integrations[:50]}%", current_category, limit),
-        )
-
-        related = []
-        for row in cursor.fetchall():
-            related.append({"filename": row[0], "name": row[1], "description": row[2]})
-
-        conn.close()
-        return related
+            self.related_index = RelatedWorkflowsIndex(self.db_path)
+        return self.related_index.related(workflow_id, limit)
 
     def run(self, host: str = "127.0.0.1", port: int = 8000, debug: bool = False):
         """Run the enhanced API server"""
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Assistant Session Store
+Bounded conversation history: a cap on turns per session, idle sessions
+expire, and the in-memory store stays within a total size budget. The SQLite
+backend lets several workers share sessions.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List
+
+DEFAULT_MAX_TURNS = 20
+DEFAULT_SESSION_TTL = 1800  # seconds of inactivity
+DEFAULT_MEMORY_BUDGET = 16 * 1024 * 1024  # bytes across all sessions
+
+
+def turn_size(turn: Dict[str, Any]) -> int:
+    """Approximate memory cost of a turn: its JSON encoding."""
+    return len(json.dumps(turn))
+
+
+class MemorySessionStore:
+    """Per-process store; sessions are kept in least-recently-used order."""
+
+    def __init__(
+        self,
+        max_turns: int = DEFAULT_MAX_TURNS,
+        ttl: float = DEFAULT_SESSION_TTL,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    ):
+        self.max_turns = max_turns
+        self.ttl = ttl
+        self.memory_budget = memory_budget
+        self.sessions: "OrderedDict[str, Deque[Dict[str, Any]]]" = OrderedDict()
+        self.last_access: Dict[str, float] = {}
+        self.session_sizes: Dict[str, int] = {}
+        self.total_size = 0
+        self.evicted_sessions = 0
+        self.lock = threading.Lock()
+
+    def drop(self, session_id: str):
+        self.sessions.pop(session_id, None)
+        self.last_access.pop(session_id, None)
+        self.total_size -= self.session_sizes.pop(session_id, 0)
+
+    def evict(self, now: float):
+        """Drop expired sessions, then the least recently used over budget."""
+        while self.sessions:
+            oldest = next(iter(self.sessions))
+            expired = now - self.last_access[oldest] > self.ttl
+            if not expired and self.total_size <= self.memory_budget:
+                break
+            self.drop(oldest)
+            self.evicted_sessions += 1
+
+    def append(self, session_id: str, role: str, content: str):
+        now = time.time()
+        turn = {"role": role, "content": content, "timestamp": now}
+        with self.lock:
+            turns = self.sessions.get(session_id)
+            if turns is None:
+                turns = self.sessions[session_id] = deque()
+                self.session_sizes[session_id] = 0
+
+            turns.append(turn)
+            size = turn_size(turn)
+            if len(turns) > self.max_turns:
+                size -= turn_size(turns.popleft())
+            self.session_sizes[session_id] += size
+            self.total_size += size
+
+            self.sessions.move_to_end(session_id)
+            self.last_access[session_id] = now
+            self.evict(now)
+
+    def get(self, session_id: str) -> List[Dict[str, Any]]:
+        now = time.time()
+        with self.lock:
+            self.evict(now)
+            turns = self.sessions.get(session_id)
+            if turns is None:
+                return []
+            self.sessions.move_to_end(session_id)
+            self.last_access[session_id] = now
+            return list(turns)
+
+    def clear(self, session_id: str):
+        with self.lock:
+            self.drop(session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "backend": "memory",
+                "sessions": len(self.sessions),
+                "bytes": self.total_size,
+                "memory_budget": self.memory_budget,
+                "evicted_sessions": self.evicted_sessions,
+            }
+
+
+class SQLiteSessionStore:
+    """Sessions in a SQLite table, shared by every worker using the file.
+
+    Turn caps are enforced on write; expired sessions are purged at most once
+    a minute.
+    """
+
+    PURGE_INTERVAL = 60  # seconds
+
+    def __init__(
+        self,
+        db_path: str,
+        max_turns: int = DEFAULT_MAX_TURNS,
+        ttl: float = DEFAULT_SESSION_TTL,
+    ):
+        self.db_path = db_path
+        self.max_turns = max_turns
+        self.ttl = ttl
+        self.purged_at = 0.0
+
+        conn = self.get_connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS assistant_turns (
+                session_id TEXT NOT NULL,
+                turn INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                timestamp REAL NOT NULL,
+                PRIMARY KEY (session_id, turn)
+            ) WITHOUT ROWID
+        """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_assistant_turns_timestamp ON assistant_turns(timestamp)"
+        )
+        conn.commit()
+        conn.close()
+
+    def get_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def purge_expired(self, conn: sqlite3.Connection, now: float):
+        """Delete every session whose latest turn is older than the TTL."""
+        if now - self.purged_at < self.PURGE_INTERVAL:
+            return
+        self.purged_at = now
+        conn.execute(
+            """
+            DELETE FROM assistant_turns WHERE session_id IN (
+                SELECT session_id FROM assistant_turns
+                GROUP BY session_id HAVING MAX(timestamp) < ?
+            )
+        """,
+            (now - self.ttl,),
+        )
+
+    def append(self, session_id: str, role: str, content: str):
+        now = time.time()
+        conn = self.get_connection()
+        try:
+            # Take the write lock before reading the next turn number, so
+            # concurrent workers cannot pick the same one
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT COALESCE(MAX(turn), 0) FROM assistant_turns WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            turn = row[0] + 1
+            conn.execute(
+                "INSERT INTO assistant_turns (session_id, turn, role, content, timestamp) VALUES (?, ?, ?, ?, ?)",
+                (session_id, turn, role, content, now),
+            )
+            conn.execute(
+                "DELETE FROM assistant_turns WHERE session_id = ? AND turn <= ?",
+                (session_id, turn - self.max_turns),
+            )
+            self.purge_expired(conn, now)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get(self, session_id: str) -> List[Dict[str, Any]]:
+        conn = self.get_connection()
+        rows = conn.execute(
+            """
+            SELECT role, content, timestamp FROM assistant_turns
+            WHERE session_id = ?
+              AND ? - (SELECT MAX(timestamp) FROM assistant_turns WHERE session_id = ?) <= ?
+            ORDER BY turn
+        """,
+            (session_id, time.time(), session_id, self.ttl),
+        ).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+
+    def clear(self, session_id: str):
+        conn = self.get_connection()
+        with conn:
+            conn.execute(
+                "DELETE FROM assistant_turns WHERE session_id = ?", (session_id,)
+            )
+        conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self.get_connection()
+        row = conn.execute(
+            "SELECT COUNT(DISTINCT session_id), COUNT(*) FROM assistant_turns"
+        ).fetchone()
+        conn.close()
+        return {"backend": "sqlite", "sessions": row[0], "turns": row[1]}
+
+
+def create_session_store(db_path: str):
+    """Session store configured from the ASSISTANT_SESSION_* environment."""
+    max_turns = int(os.environ.get("ASSISTANT_MAX_TURNS", DEFAULT_MAX_TURNS))
+    ttl = float(os.environ.get("ASSISTANT_SESSION_TTL", DEFAULT_SESSION_TTL))
+    if os.environ.get("ASSISTANT_SESSION_BACKEND", "memory").lower() == "sqlite":
+        return SQLiteSessionStore(
+            os.environ.get("ASSISTANT_SESSION_DB", db_path), max_turns, ttl
+        )
+
+    budget_mb = float(
+        os.environ.get(
+            "ASSISTANT_MEMORY_BUDGET_MB", DEFAULT_MEMORY_BUDGET / (1024 * 1024)
+        )
+    )
+    return MemorySessionStore(max_turns, ttl, int(budget_mb * 1024 * 1024))
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Test Community Features
+Buffered view/download counters, popularity and trending rankings, and
+running rating totals.
+"""
+
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from community_features import (  # noqa: E402
+    MAX_EVENT_BATCH,
+    CommunityFeatures,
+    CounterBuffer,
+    current_hour,
+    write_counter_batch,
+)
+
+
+@pytest.fixture
+def community(tmp_path):
+    features = CommunityFeatures(str(tmp_path / "community.db"))
+    # Flush only when a test asks for it
+    features.counters.flush_interval = 3600
+    yield features
+    features.counters.close()
+
+
+def stored_counts(db_path, workflow_id):
+    conn = sqlite3.connect(db_path)
+    row = conn.execute(
+        "SELECT total_views, total_downloads, popularity_score FROM workflow_stats WHERE workflow_id = ?",
+        (workflow_id,),
+    ).fetchone()
+    conn.close()
+    return row
+
+
+def test_concurrent_increments_are_all_flushed(community):
+    def record():
+        for _ in range(500):
+            community.increment_view("a.json")
+            community.increment_download("b.json")
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Crossing COUNTER_FLUSH_THRESHOLD may already have woken the flush thread;
+    # flush() waits for it before writing the rest
+    community.counters.flush()
+    assert community.counters.stats()["flushed_events"] == 4000
+    assert community.get_workflow_stats("a.json").total_views == 2000
+    assert stored_counts(community.db_path, "a.json") == (2000, 0, 2000)
+    assert stored_counts(community.db_path, "b.json") == (0, 2000, 2000)
+    assert community.counters.stats()["pending_events"] == 0
+
+
+def test_failed_flush_keeps_events_for_retry(tmp_path):
+    db_path = str(tmp_path / "community.db")
+    CommunityFeatures(db_path).counters.close()
+    counters = CounterBuffer(str(tmp_path), flush_interval=3600)  # a directory
+    counters.add("a.json", views=3)
+    counters.add("a.json", downloads=1)
+
+    assert counters.flush() == 0
+    assert counters.stats()["failed_flushes"] == 1
+    assert counters.get_pending("a.json") == (3, 1)
+
+    counters.db_path = db_path
+    counters.add("a.json", views=1)
+    assert counters.flush() == 5
+    assert stored_counts(db_path, "a.json") == (4, 1, 5)
+    counters.close()
+
+
+def test_event_batches_are_capped_by_total_count(community):
+    with pytest.raises(ValueError):
+        community.record_events(
+            [{"workflow_id": "a.json", "type": "view", "count": MAX_EVENT_BATCH}] * 2
+        )
+    with pytest.raises(ValueError):
+        community.record_events(
+            [{"workflow_id": "a.json", "type": "view", "count": True}]
+        )
+    assert community.counters.get_pending("a.json") == (0, 0)
+
+    accepted = community.record_events(
+        [
+            {"workflow_id": "a.json", "type": "view", "count": MAX_EVENT_BATCH - 1},
+            {"workflow_id": "a.json", "type": "download"},
+        ]
+    )
+    assert accepted == 2
+    assert community.counters.get_pending("a.json") == (MAX_EVENT_BATCH - 1, 1)
+
+
+def test_trending_decays_where_popularity_does_not(community):
+    conn = sqlite3.connect(community.db_path)
+    conn.execute("CREATE TABLE workflows (filename TEXT, name TEXT, description TEXT)")
+    conn.executemany(
+        "INSERT INTO workflows VALUES (?, ?, '')",
+        [("old.json", "Old"), ("new.json", "New"), ("stale.json", "Stale")],
+    )
+    hour = current_hour()
+    with conn:
+        # Two half-lives ago, 10 events count as 2.5 now; 1 event as 0.25
+        write_counter_batch(
+            conn,
+            {
+                ("old.json", hour - 48): [10, 0],
+                ("stale.json", hour - 48): [0, 1],
+                ("new.json", hour): [2, 1],
+            },
+        )
+    conn.close()
+
+    popular = community.get_most_popular_workflows(limit=3)
+    assert [w["filename"] for w in popular] == ["old.json", "new.json", "stale.json"]
+
+    trending = community.get_trending_workflows()
+    assert [w["filename"] for w in trending] == ["new.json", "old.json"]
+    assert trending[1]["trending_score"] == pytest.approx(2.5, abs=0.1)
+
+    # The repair tool rebuilds the same scores from the hourly buckets
+    community.recompute_activity_scores()
+    rebuilt = community.get_trending_workflows()
+    assert [w["filename"] for w in rebuilt] == ["new.json", "old.json"]
+    assert [w["trending_score"] for w in rebuilt] == pytest.approx(
+        [w["trending_score"] for w in trending], rel=0.05
+    )
+
+
+def rating_totals(db_path, workflow_id):
+    conn = sqlite3.connect(db_path)
+    row = conn.execute(
+        "SELECT total_ratings, rating_sum, average_rating, total_reviews FROM workflow_stats WHERE workflow_id = ?",
+        (workflow_id,),
+    ).fetchone()
+    conn.close()
+    return row
+
+
+def test_rating_deltas_match_recompute(community):
+    community.add_rating("a.json", "alice", 5, "Great")
+    community.add_rating("a.json", "bob", 2)
+    community.add_rating("a.json", "carol", 4, "Fine")
+    # Updates replace the user's previous rating and review
+    community.add_rating("a.json", "bob", 3, "Better now")
+    community.add_rating("a.json", "alice", 4)
+
+    incremental = rating_totals(community.db_path, "a.json")
+    assert incremental == (3, 11, pytest.approx(11 / 3), 2)
+
+    conn = sqlite3.connect(community.db_path)
+    conn.execute(
+        "UPDATE workflow_stats SET total_ratings = 9, rating_sum = 1, average_rating = 0, total_reviews = 0"
+    )
+    conn.commit()
+    conn.close()
+    assert community.recompute_rating_stats(workflow_ids=["a.json"]) == 1
+    assert rating_totals(community.db_path, "a.json") == incremental
+
+
+def test_invalid_rating_leaves_totals_untouched(community):
+    community.add_rating("a.json", "alice", 4)
+    with pytest.raises(ValueError):
+        community.add_rating("a.json", "bob", 6)
+    assert rating_totals(community.db_path, "a.json") == (1, 4, 4.0, 0)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test Search Index
+The prefix-sharded static search index and its incremental writes.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent / "scripts"))
+
+from generate_search_index import (  # noqa: E402
+    build_compact_index,
+    save_search_index,
+    tokenize,
+)
+
+
+def workflow(filename, name, integrations, trigger_type="Manual"):
+    return {
+        "filename": filename,
+        "name": name,
+        "description": f"Uses {', '.join(integrations)}",
+        "folder": "Misc",
+        "active": False,
+        "node_count": len(integrations) + 1,
+        "integrations": integrations,
+        "tags": [],
+        "trigger_type": trigger_type,
+        "complexity": "low",
+        "category": "Communication",
+    }
+
+
+def search_index(*workflows, generated_at="2024-01-01T00:00:00"):
+    return {
+        "workflows": list(workflows),
+        "stats": {"total_workflows": len(workflows)},
+        "categories": ["Communication"],
+        "integrations": [],
+        "generated_at": generated_at,
+    }
+
+
+def term_postings(files, term):
+    manifest = files["manifest.json"]
+    shard = manifest["term_shards"].get(term[: manifest["term_prefix_length"]])
+    return files[shard].get(term, []) if shard else []
+
+
+def test_tokenize_splits_filenames():
+    assert tokenize("0001_Telegram_Send.json") == ["0001", "telegram", "send", "json"]
+
+
+def test_postings_mark_name_hits():
+    files = build_compact_index(
+        search_index(
+            workflow("0001_Slack.json", "Slack alerts", ["Slack"]),
+            workflow("0002_Mail.json", "Mail digest", ["Gmail", "Slack"]),
+        )
+    )
+
+    # doc_id * 2 + 1 when the term is in the name
+    assert term_postings(files, "slack") == [1, 2]
+    assert term_postings(files, "digest") == [3]
+    assert files["manifest.json"]["term_shards"]["sl"] == "terms-736c.json"
+    assert files["manifest.json"]["dictionaries"]["integrations"] == ["Slack", "Gmail"]
+
+
+def test_new_prefix_leaves_other_shards_unchanged(tmp_path):
+    first = search_index(workflow("0001_Slack.json", "Slack alerts", ["Slack"]))
+    assert save_search_index(first, str(tmp_path)) > 0
+    search_dir = tmp_path / "search"
+    slack_shard = (search_dir / "terms-736c.json").read_bytes()
+
+    # An unchanged corpus rebuilt later writes nothing
+    assert (
+        save_search_index(
+            search_index(first["workflows"][0], generated_at="2024-02-01T00:00:00"),
+            str(tmp_path),
+        )
+        == 0
+    )
+
+    second = search_index(
+        first["workflows"][0],
+        workflow("0002_Zoom.json", "Zoom recap", ["Zoom"]),
+    )
+    save_search_index(second, str(tmp_path))
+    assert (search_dir / "terms-736c.json").read_bytes() == slack_shard
+    assert (search_dir / "terms-7a6f.json").exists()
+
+    # Shards of terms that disappear are removed
+    save_search_index(search_index(second["workflows"][1]), str(tmp_path))
+    assert not (search_dir / "terms-736c.json").exists()
+    manifest = json.loads((search_dir / "manifest.json").read_text())
+    assert manifest["doc_count"] == 1
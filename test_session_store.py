@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test Session Store
+Turn caps, idle expiry and the memory budget of the assistant session stores.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent / "src"))
+
+import session_store  # noqa: E402
+from session_store import MemorySessionStore, SQLiteSessionStore  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(session_store.time, "time", fake)
+    return fake
+
+
+def contents(turns):
+    return [turn["content"] for turn in turns]
+
+
+def test_memory_store_keeps_last_turns(clock):
+    store = MemorySessionStore(max_turns=3)
+    for i in range(5):
+        store.append("s", "user", f"message {i}")
+
+    assert contents(store.get("s")) == ["message 2", "message 3", "message 4"]
+    assert store.stats()["bytes"] == sum(
+        session_store.turn_size(turn) for turn in store.get("s")
+    )
+
+
+def test_memory_store_expires_idle_sessions(clock):
+    store = MemorySessionStore(ttl=60)
+    store.append("idle", "user", "hello")
+    clock.now += 30
+    store.append("active", "user", "hello")
+    clock.now += 45
+
+    assert store.get("idle") == []
+    assert contents(store.get("active")) == ["hello"]
+    assert store.stats()["evicted_sessions"] == 1
+
+
+def test_memory_store_evicts_least_recently_used_over_budget(clock):
+    turn_bytes = session_store.turn_size(
+        {"role": "user", "content": "x" * 100, "timestamp": clock.now}
+    )
+    store = MemorySessionStore(memory_budget=turn_bytes * 2)
+    store.append("a", "user", "x" * 100)
+    store.append("b", "user", "x" * 100)
+    store.get("a")  # "b" is now the least recently used
+    store.append("c", "user", "x" * 100)
+
+    assert store.get("b") == []
+    assert contents(store.get("a")) == ["x" * 100]
+    assert store.stats()["bytes"] <= store.memory_budget
+
+
+def test_sqlite_store_is_shared_and_capped(tmp_path):
+    db_path = str(tmp_path / "sessions.db")
+    first = SQLiteSessionStore(db_path, max_turns=2)
+    second = SQLiteSessionStore(db_path, max_turns=2)
+
+    first.append("s", "user", "question")
+    second.append("s", "assistant", "answer")
+    first.append("s", "user", "follow-up")
+
+    assert contents(second.get("s")) == ["answer", "follow-up"]
+    assert second.stats() == {"backend": "sqlite", "sessions": 1, "turns": 2}
+
+    second.clear("s")
+    assert first.get("s") == []
+
+
+def test_sqlite_store_expires_idle_sessions(tmp_path, clock):
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"), ttl=60)
+    store.append("idle", "user", "hello")
+    clock.now += 120
+    assert store.get("idle") == []
+
+    clock.now += store.PURGE_INTERVAL
+    store.append("active", "user", "hello")
+    assert store.stats()["sessions"] == 1
+
+
+def test_chat_issues_and_resumes_server_side_sessions(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import ai_assistant
+
+    assistant = ai_assistant.assistant
+    monkeypatch.setattr(assistant, "conversation_history", MemorySessionStore())
+    monkeypatch.setattr(
+        assistant, "search_workflows_intelligent", lambda query, limit=5: []
+    )
+    client = TestClient(ai_assistant.ai_app)
+
+    first = client.post("/chat", json={"message": "slack alerts"}).json()
+    session_id = first["session_id"]
+    second = client.post(
+        "/chat", json={"message": "and email?", "session_id": session_id}
+    ).json()
+    assert second["session_id"] == session_id
+
+    turns = client.get(f"/chat/sessions/{session_id}").json()["turns"]
+    assert contents(turns)[::2] == ["slack alerts", "and email?"]
+
+    # An id the server never issued is not adopted
+    chosen = client.post("/chat", json={"message": "hi", "session_id": "alice"})
+    assert chosen.json()["session_id"] != "alice"
+    assert client.get("/chat/sessions/alice").status_code == 404
+
+    client.delete(f"/chat/sessions/{session_id}")
+    assert client.get(f"/chat/sessions/{session_id}").status_code == 404
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Test Workflow Index
+Incremental indexing, change history, search and facets against a small
+generated corpus.
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+import workflow_similarity
+from workflow_db import WorkflowDatabase, read_index_generation
+from workflow_similarity import RelatedWorkflowsIndex
+
+
+def workflow_json(name, node_types):
+    """A minimal n8n workflow whose nodes are connected in a chain."""
+    nodes = [
+        {"name": f"Step {i}", "type": f"n8n-nodes-base.{node_type}", "parameters": {}}
+        for i, node_type in enumerate(node_types)
+    ]
+    connections = {
+        nodes[i]["name"]: {"main": [[{"node": nodes[i + 1]["name"], "index": 0}]]}
+        for i in range(len(nodes) - 1)
+    }
+    return {"name": name, "nodes": nodes, "connections": connections}
+
+
+CORPUS = {
+    "0001_Slack_Alerts.json": ("Slack alerts", ["webhook", "set", "slack"]),
+    "0002_Slack_Digest.json": ("Slack digest", ["webhook", "set", "slack", "noOp"]),
+    "0003_Sheets_Backup.json": ("Sheets backup", ["cron", "googleSheets", "gmail"]),
+    "0004_Telegram_Bot.json": ("Telegram bot", ["cron", "telegram"]),
+}
+
+
+def write_workflow(directory, filename, name, node_types):
+    (directory / filename).write_text(json.dumps(workflow_json(name, node_types)))
+
+
+@pytest.fixture
+def indexed_db(tmp_path):
+    """A database indexed from CORPUS, plus its workflows directory."""
+    workflows_dir = tmp_path / "workflows"
+    workflows_dir.mkdir()
+    for filename, (name, node_types) in CORPUS.items():
+        write_workflow(workflows_dir, filename, name, node_types)
+
+    db = WorkflowDatabase(str(tmp_path / "workflows.db"))
+    db.workflows_dir = str(workflows_dir)
+    db.index_all_workflows()
+    return db, workflows_dir
+
+
+def latest_change(db):
+    conn = sqlite3.connect(db.db_path)
+    row = conn.execute(
+        "SELECT added, updated, removed, integration_deltas FROM index_changes ORDER BY id DESC LIMIT 1"
+    ).fetchone()
+    count = conn.execute("SELECT COUNT(*) FROM index_changes").fetchone()[0]
+    conn.close()
+    return row, count
+
+
+def cooccurrence_matches_rebuild(db):
+    conn = sqlite3.connect(db.db_path)
+    stored = dict(conn.execute("SELECT integration, workflows FROM integration_counts"))
+    expected = dict(
+        conn.execute("""
+            SELECT j.value, COUNT(DISTINCT w.id)
+            FROM workflows w, json_each(w.integrations) j GROUP BY j.value
+        """)
+    )
+    conn.close()
+    return stored == expected
+
+
+def test_change_history_records_added_updated_removed(indexed_db):
+    db, workflows_dir = indexed_db
+    (added, updated, removed, _), _ = latest_change(db)
+    assert (added, updated, removed) == (len(CORPUS), 0, 0)
+
+    write_workflow(
+        workflows_dir, "0004_Telegram_Bot.json", "Telegram bot", ["cron", "slack"]
+    )
+    (workflows_dir / "0003_Sheets_Backup.json").unlink()
+    stats = db.index_all_workflows()
+    assert stats["processed"] == 1 and stats["removed"] == 1
+
+    (added, updated, removed, deltas), _ = latest_change(db)
+    assert (added, updated, removed) == (0, 1, 1)
+    deltas = json.loads(deltas)
+    assert deltas["Slack"] == 1 and deltas["Telegram"] == -1
+    assert cooccurrence_matches_rebuild(db)
+
+
+def test_forced_and_migration_reindex_record_nothing(indexed_db):
+    db, _ = indexed_db
+    _, runs = latest_change(db)
+
+    db.index_all_workflows(force_reindex=True)
+    conn = sqlite3.connect(db.db_path)
+    # A migration can also change what the analyzer extracts
+    conn.execute("""UPDATE workflows SET integrations = '["Legacy"]'""")
+    conn.execute("UPDATE workflows SET file_hash = NULL")
+    conn.commit()
+    conn.close()
+    stats = db.index_all_workflows()
+
+    assert stats["processed"] == len(CORPUS)
+    assert latest_change(db)[1] == runs
+
+
+def test_failed_file_is_rolled_back(indexed_db, monkeypatch):
+    db, workflows_dir = indexed_db
+    write_workflow(
+        workflows_dir, "0001_Slack_Alerts.json", "Slack alerts", ["webhook", "gmail"]
+    )
+
+    def fail(*args):
+        raise RuntimeError("signature failed")
+
+    monkeypatch.setattr(workflow_similarity, "minhash_signature", fail)
+    stats = db.index_all_workflows()
+    assert stats["errors"] == 1
+
+    conn = sqlite3.connect(db.db_path)
+    integrations = conn.execute(
+        "SELECT integrations FROM workflows WHERE filename = '0001_Slack_Alerts.json'"
+    ).fetchone()[0]
+    conn.close()
+    assert "Gmail" not in json.loads(integrations)
+    assert cooccurrence_matches_rebuild(db)
+
+    monkeypatch.undo()
+    assert db.index_all_workflows()["processed"] == 1
+    assert cooccurrence_matches_rebuild(db)
+
+
+def test_missing_directory_contents_are_not_removed(indexed_db):
+    db, workflows_dir = indexed_db
+    _, runs = latest_change(db)
+    for filename in list(CORPUS)[1:]:
+        (workflows_dir / filename).unlink()
+
+    assert db.index_all_workflows()["removed"] == 0
+    assert db.get_workflow_count() == len(CORPUS)
+    assert latest_change(db)[1] == runs
+
+    # An intended mass deletion goes through with force_reindex
+    assert db.index_all_workflows(force_reindex=True)["removed"] == len(CORPUS) - 1
+    assert db.get_workflow_count() == 1
+    assert cooccurrence_matches_rebuild(db)
+
+
+def test_facet_counts_exclude_own_filter(indexed_db):
+    db, _ = indexed_db
+    result = db.get_facet_counts(trigger_filter="Webhook")
+    assert result["total"] == 2
+    assert sum(result["facets"]["trigger"].values()) == len(CORPUS)
+    assert result["facets"]["integration"]["Slack"] == 2
+
+
+@pytest.mark.parametrize("query", ["c++", '"foo', "AND"])
+def test_malformed_fts_query_is_a_client_error(indexed_db, monkeypatch, query):
+    db, _ = indexed_db
+    with pytest.raises(ValueError):
+        db.search_workflows(query)
+    with pytest.raises(ValueError):
+        db.get_facet_counts(query)
+
+    from fastapi.testclient import TestClient
+
+    import api_server
+
+    monkeypatch.setattr(api_server, "db", db)
+    client = TestClient(api_server.app)
+    assert client.get("/api/workflows", params={"q": query}).status_code == 400
+    assert client.get("/api/workflows/facets", params={"q": query}).status_code == 400
+
+
+def test_search_cache_returns_copies_and_follows_reindex(indexed_db):
+    db, workflows_dir = indexed_db
+    results, total = db.search_workflows("slack")
+    assert total == 2
+
+    results[0]["integrations"].append("Mutated")
+    cached, _ = db.search_workflows("slack")
+    assert "Mutated" not in cached[0]["integrations"]
+    assert db.result_cache.hits == 1
+
+    write_workflow(
+        workflows_dir, "0005_Slack_Report.json", "Slack report", ["cron", "slack"]
+    )
+    db.index_all_workflows()
+    assert db.search_workflows("slack")[1] == 3
+
+
+def test_pattern_steps_match_trigger_and_legacy_nodes(indexed_db, monkeypatch):
+    db, workflows_dir = indexed_db
+    write_workflow(
+        workflows_dir,
+        "0005_Sheets_Sync.json",
+        "Sheets sync",
+        ["scheduleTrigger", "httpRequest", "googleSheets"],
+    )
+    db.index_all_workflows()
+
+    from fastapi.testclient import TestClient
+
+    import api_server
+
+    monkeypatch.setattr(api_server, "db", db)
+    response = TestClient(api_server.app).get(
+        "/api/workflows/pattern",
+        params={"path": "Schedule → HTTP Request → Google Sheets"},
+    )
+    assert response.status_code == 200
+    assert [w["filename"] for w in response.json()["workflows"]] == [
+        "0005_Sheets_Sync.json"
+    ]
+
+    # The Cron node is the Schedule Trigger's predecessor
+    results, _ = db.search_by_pattern(["Schedule", "Google Sheets"])
+    assert [w["filename"] for w in results] == ["0003_Sheets_Backup.json"]
+
+
+def test_related_workflows_prefers_shared_nodes(indexed_db):
+    db, _ = indexed_db
+    related = RelatedWorkflowsIndex(db.db_path).related("0001_Slack_Alerts.json")
+    assert related[0]["filename"] == "0002_Slack_Digest.json"
+    assert set(related[0]) == {"filename", "name", "description", "similarity"}
+    assert "0001_Slack_Alerts.json" not in [r["filename"] for r in related]
+
+
+def test_related_index_follows_reindex(indexed_db):
+    db, workflows_dir = indexed_db
+    index = RelatedWorkflowsIndex(db.db_path)
+    assert index.related("0005_Slack_Copy.json") == []
+
+    write_workflow(
+        workflows_dir, "0005_Slack_Copy.json", "Slack copy", ["webhook", "set", "slack"]
+    )
+    db.index_all_workflows()
+    index.generation_check.reset()
+    assert index.related("0005_Slack_Copy.json")[0]["similarity"] == 1.0
+
+
+def test_generation_of_database_without_schema_info(tmp_path):
+    conn = sqlite3.connect(tmp_path / "old.db")
+    assert read_index_generation(conn) == 0
+    conn.close()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Integration Co-occurrence
+Per-integration and per-pair workflow counts, kept up to date by the indexer
+as workflows change, so pair, lift and PMI rankings are array operations
+instead of a pass over every workflow.
+"""
+
+import sqlite3
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from workflow_db import IndexGenerationView
+
+# Pairs seen in fewer workflows are left out of lift/PMI rankings, where a
+# single shared workflow between two rare integrations would otherwise win
+DEFAULT_MIN_PAIR_COUNT = 3
+
+PAIR_RANKINGS = ("count", "lift", "pmi")
+
+
+def integration_pairs(integrations: Iterable[str]) -> List[Tuple[str, str]]:
+    """Unordered pairs of distinct integrations, each as (smaller, larger)."""
+    return list(combinations(sorted(set(integrations)), 2))
+
+
+def apply_cooccurrence_delta(
+    conn: sqlite3.Connection, integrations: Iterable[str], delta: int
+):
+    """Add (delta=1) or remove (delta=-1) one workflow's integrations.
+
+    Runs in the caller's transaction; rows that drop to zero are deleted.
+    """
+    integrations = sorted(set(integrations))
+    if not integrations:
+        return
+    conn.executemany(
+        """
+        INSERT INTO integration_counts (integration, workflows) VALUES (?, ?)
+        ON CONFLICT(integration) DO UPDATE SET workflows = workflows + excluded.workflows
+    """,
+        [(integration, delta) for integration in integrations],
+    )
+    conn.executemany(
+        """
+        INSERT INTO integration_pairs (a, b, workflows) VALUES (?, ?, ?)
+        ON CONFLICT(a, b) DO UPDATE SET workflows = workflows + excluded.workflows
+    """,
+        [(a, b, delta) for a, b in integration_pairs(integrations)],
+    )
+    if delta < 0:
+        conn.execute("DELETE FROM integration_counts WHERE workflows <= 0")
+        conn.execute("DELETE FROM integration_pairs WHERE workflows <= 0")
+
+
+def rebuild_cooccurrence(conn: sqlite3.Connection):
+    """Recompute both tables from workflows.integrations (repair/migration)."""
+    conn.execute("DELETE FROM integration_counts")
+    conn.execute("DELETE FROM integration_pairs")
+    conn.execute("""
+        INSERT INTO integration_counts (integration, workflows)
+        SELECT j.value, COUNT(DISTINCT w.id)
+        FROM workflows w, json_each(w.integrations) j
+        GROUP BY j.value
+    """)
+    conn.execute("""
+        INSERT INTO integration_pairs (a, b, workflows)
+        SELECT x.value, y.value, COUNT(DISTINCT w.id)
+        FROM workflows w, json_each(w.integrations) x, json_each(w.integrations) y
+        WHERE x.value < y.value
+        GROUP BY x.value, y.value
+    """)
+
+
+class CooccurrenceMatrix(IndexGenerationView):
+    """Vocabulary, per-integration counts and sparse pair counts as arrays.
+
+    Reloaded when the index generation changes (checked at most every
+    GENERATION_CHECK_INTERVAL seconds). Pairs are stored once, as COO
+    coordinates into the vocabulary with row < column.
+    """
+
+    def __init__(self, db_path: str):
+        super().__init__(db_path)
+        self.vocabulary: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.rows = np.zeros(0, dtype=np.int64)
+        self.columns = np.zeros(0, dtype=np.int64)
+        self.pair_counts = np.zeros(0, dtype=np.int64)
+        self.total_workflows = 0
+
+    def load(self, conn: sqlite3.Connection):
+        integrations = conn.execute(
+            "SELECT integration, workflows FROM integration_counts ORDER BY integration"
+        ).fetchall()
+        vocabulary = [row[0] for row in integrations]
+        positions = {integration: i for i, integration in enumerate(vocabulary)}
+        pairs = conn.execute("SELECT a, b, workflows FROM integration_pairs").fetchall()
+
+        self.vocabulary = vocabulary
+        self.positions = positions
+        self.counts = np.array([row[1] for row in integrations], dtype=np.int64)
+        self.rows = np.array([positions[a] for a, _, _ in pairs], dtype=np.int64)
+        self.columns = np.array([positions[b] for _, b, _ in pairs], dtype=np.int64)
+        self.pair_counts = np.array([count for _, _, count in pairs], dtype=np.int64)
+        self.total_workflows = conn.execute(
+            "SELECT COUNT(*) FROM workflows"
+        ).fetchone()[0]
+
+    def integration_counts(self) -> Dict[str, int]:
+        self.refresh()
+        return dict(zip(self.vocabulary, self.counts.tolist()))
+
+    def association_scores(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Lift and PMI (log2 lift) of every stored pair."""
+        expected = (
+            self.counts[self.rows] * self.counts[self.columns] / self.total_workflows
+            if self.total_workflows
+            else np.ones(len(self.pair_counts))
+        )
+        lift = self.pair_counts / expected
+        return lift, np.log2(lift)
+
+    def top_pairs(
+        self,
+        limit: int = 5,
+        rank_by: str = "count",
+        min_count: Optional[int] = None,
+        integration: str = "",
+    ) -> List[Dict]:
+        """Highest-ranked pairs, optionally only those involving ``integration``.
+
+        Lift and PMI rankings skip pairs shared by fewer than ``min_count``
+        workflows (default DEFAULT_MIN_PAIR_COUNT).
+        """
+        if min_count is None:
+            min_count = DEFAULT_MIN_PAIR_COUNT
+        if rank_by not in PAIR_RANKINGS:
+            raise ValueError(
+                f"Unknown ranking '{rank_by}'; expected one of {', '.join(PAIR_RANKINGS)}"
+            )
+        self.refresh()
+        if not len(self.pair_counts):
+            return []
+
+        lift, pmi = self.association_scores()
+        mask = np.ones(len(self.pair_counts), dtype=bool)
+        if rank_by != "count":
+            mask &= self.pair_counts >= min_count
+        if integration:
+            position = self.positions.get(integration)
+            if position is None:
+                return []
+            mask &= (self.rows == position) | (self.columns == position)
+
+        candidates = np.flatnonzero(mask)
+        score = {"count": self.pair_counts, "lift": lift, "pmi": pmi}[rank_by]
+        # Best score first, then most shared workflows, then vocabulary order
+        order = np.lexsort(
+            (
+                self.columns[candidates],
+                self.rows[candidates],
+                -self.pair_counts[candidates],
+                -score[candidates],
+            )
+        )[:limit]
+        return [
+            {
+                "integrations": [
+                    self.vocabulary[self.rows[i]],
+                    self.vocabulary[self.columns[i]],
+                ],
+                "workflows": int(self.pair_counts[i]),
+                "lift": round(float(lift[i]), 3),
+                "pmi": round(float(pmi[i]), 3),
+            }
+            for i in candidates[order]
+        ]
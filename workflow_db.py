@@ -6,23 +6,896 @@ SQLite-based workflow indexer and search engine for instant performance.
 
 import sqlite3
 import json
+import threading
+import time
 import os
 import datetime
 import hashlib
-from typing import Dict, List, Any, Optional, Tuple
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Any, Iterator, Optional, Tuple
 from pathlib import Path
 
 
+# Bump whenever init_database() changes so existing databases get migrated
+SCHEMA_VERSION = 15
+
+# Per-workflow rows keyed by workflows.id, dropped whenever the row is
+# replaced or removed
+WORKFLOW_SIDE_TABLES = (
+    "workflow_nodes",
+    "workflow_integrations",
+    "workflow_edge_grams",
+    "workflow_graphs",
+    "workflow_minhash",
+    "workflow_lsh_buckets",
+    "workflow_vectors",
+)
+
+# A reindex that would remove more than this share of the index is assumed to
+# be looking at an incomplete workflows directory and removes nothing
+MAX_REMOVED_FRACTION = 0.5
+
+# FTS5 options for workflows_fts; the prefix indexes make "term*" lookups
+# (typeahead) cheap. A table created with different options is rebuilt.
+FTS_OPTIONS = "prefix='2 3 4'"
+
+# workflows_fts reads its text through this view, which flattens the JSON
+# integrations and tags columns into plain words (no brackets, quotes or
+# tag-object keys in the index)
+FTS_CONTENT = "content=workflows_search_content, content_rowid=id"
+INTEGRATIONS_TEXT_SQL = (
+    "(SELECT group_concat(value, ' ') FROM json_each({row}.integrations))"
+)
+TAGS_TEXT_SQL = (
+    "(SELECT group_concat(CASE WHEN type = 'object' "
+    "THEN json_extract(value, '$.name') ELSE value END, ' ') "
+    "FROM json_each({row}.tags))"
+)
+
+# FTS columns in table order, with their default bm25() weights. Override
+# with SEARCH_BM25_WEIGHTS, e.g. "name=10,integrations=5,description=1".
+FTS_COLUMNS = ("filename", "name", "description", "integrations", "tags")
+DEFAULT_BM25_WEIGHTS = {
+    "filename": 2.0,
+    "name": 10.0,
+    "description": 1.0,
+    "integrations": 5.0,
+    "tags": 3.0,
+}
+
+# How strongly popularity (0..1) lifts search results; 0 ranks by text
+# relevance only. Override with SEARCH_POPULARITY_WEIGHT.
+DEFAULT_POPULARITY_WEIGHT = 0.0
+
+# Popularity is read at query time from the running views + downloads total
+# in workflow_stats.popularity_score, mapped to 0..1 as score / (score + this),
+# so a workflow with this many views and downloads gets half the lift
+POPULARITY_SATURATION = 50
+
+# Tokens as the FTS5 unicode61 tokenizer sees them (letters and digits)
+QUERY_TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+
+def execute_match(conn: sqlite3.Connection, sql: str, params: list) -> sqlite3.Cursor:
+    """Run a statement whose MATCH expression came from a user's query.
+
+    FTS5 rejects malformed queries ("c++", an unbalanced quote, a bare AND)
+    with OperationalError; that is raised as ValueError, after closing the
+    connection, so the API can answer 400 rather than 500.
+    """
+    try:
+        return conn.execute(sql, params)
+    except sqlite3.OperationalError as e:
+        conn.close()
+        raise ValueError(f"Invalid search query: {e}") from e
+
+
+# Search tokenizer modes. "unicode61" indexes a CJK run as one token, so
+# substring queries miss; "cjk" additionally indexes CJK text as overlapping
+# bigrams in workflows_cjk_fts. Set with SEARCH_TOKENIZER; switching the mode
+# of an existing database rebuilds the side index without a reindex.
+TOKENIZER_MODES = ("unicode61", "cjk")
+DEFAULT_TOKENIZER_MODE = "unicode61"
+
+# Han, kana and Hangul runs
+CJK_PATTERN = re.compile(
+    "[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af]+"
+)
+
+
+# Node types given without a package prefix ("httpRequest") are core nodes
+CORE_NODE_PREFIX = "n8n-nodes-base."
+
+
+def utc_day(moment: Optional[datetime.datetime] = None) -> str:
+    """ISO date of ``moment`` (default now) in UTC, the key of daily rollups."""
+    moment = moment or datetime.datetime.now(datetime.timezone.utc)
+    return moment.astimezone(datetime.timezone.utc).date().isoformat()
+
+
+def normalize_node_type(node_type: str) -> str:
+    """Expand a bare core node name to its full type string."""
+    node_type = node_type.strip()
+    return node_type if "." in node_type else CORE_NODE_PREFIX + node_type
+
+
+# In-process result cache for search_workflows/search_by_category. Entries
+# expire after the TTL and are dropped as soon as the index generation moves.
+DEFAULT_RESULT_CACHE_SIZE = 512
+DEFAULT_RESULT_CACHE_TTL = 300  # seconds
+
+# Seconds between index generation checks; checking costs a connection,
+# several times the lookup itself
+GENERATION_CHECK_INTERVAL = 1.0
+
+
+def read_index_generation(conn: sqlite3.Connection) -> int:
+    """The index generation stored in schema_info.
+
+    0 before the first indexing run, and on a database that predates
+    schema_info.
+    """
+    try:
+        row = conn.execute(
+            "SELECT value FROM schema_info WHERE key = 'index_generation'"
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return int(row[0]) if row else 0
+
+
+class GenerationCheck:
+    """Allows one index generation read per GENERATION_CHECK_INTERVAL."""
+
+    def __init__(self):
+        self.checked_at = float("-inf")
+
+    def due(self) -> bool:
+        """Whether the generation may be read again; restarts the interval if so."""
+        now = time.monotonic()
+        if now - self.checked_at < GENERATION_CHECK_INTERVAL:
+            return False
+        self.checked_at = now
+        return True
+
+    def reset(self):
+        """Make the next due() true, e.g. after this process reindexed."""
+        self.checked_at = float("-inf")
+
+
+class IndexGenerationView:
+    """Base for in-memory structures derived from the index.
+
+    ``refresh()`` calls ``load(conn)`` when the index generation moved since
+    the last load, reading it at most every GENERATION_CHECK_INTERVAL seconds.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.generation: Optional[int] = None
+        self.generation_check = GenerationCheck()
+
+    def load(self, conn: sqlite3.Connection):
+        raise NotImplementedError
+
+    def refresh(self):
+        """Reload from the database if it was reindexed since the last load."""
+        if not self.generation_check.due():
+            return
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            generation = read_index_generation(conn)
+            if generation != self.generation:
+                self.load(conn)
+                self.generation = generation
+        finally:
+            conn.close()
+
+
+# FTS5 operators are case-sensitive, so queries using them keep their case
+FTS_OPERATOR_PATTERN = re.compile(r"\b(AND|OR|NOT|NEAR)\b")
+
+
+def normalize_query(query: str) -> str:
+    """Cache key form of a search query: trimmed, single-spaced, lowercased."""
+    query = " ".join(query.split())
+    return query if FTS_OPERATOR_PATTERN.search(query) else query.lower()
+
+
+def copy_result(value: Any) -> Any:
+    """Deep copy of a JSON-shaped value (dicts, lists, scalars).
+
+    Much cheaper than copy.deepcopy for cached search results, which hold
+    nothing else.
+    """
+    if isinstance(value, dict):
+        return {key: copy_result(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_result(item) for item in value]
+    return value
+
+
+class ResultCache:
+    """Thread-safe LRU cache with a TTL, emptied when the index generation changes."""
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_RESULT_CACHE_SIZE,
+        ttl: float = DEFAULT_RESULT_CACHE_TTL,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self.generation: Optional[int] = None
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Any, generation: int) -> Optional[Any]:
+        """Return the cached value, or None on a miss."""
+        with self.lock:
+            if generation != self.generation:
+                if self.entries:
+                    self.invalidations += 1
+                self.entries.clear()
+                self.generation = generation
+
+            entry = self.entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Any, value: Any, generation: int):
+        if self.max_size <= 0:
+            return
+        with self.lock:
+            # A reindex finished while this value was computed; don't keep it
+            if generation != self.generation:
+                return
+            self.entries[key] = (time.monotonic(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "generation": self.generation,
+            }
+
+
+def parse_bm25_weights(spec: Optional[str]) -> Tuple[float, ...]:
+    """Turn "name=10,tags=2" into bm25() arguments in FTS column order."""
+    weights = dict(DEFAULT_BM25_WEIGHTS)
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        column, _, value = item.partition("=")
+        column = column.strip()
+        if column not in weights:
+            raise ValueError(
+                f"Unknown search column '{column}', expected one of {', '.join(FTS_COLUMNS)}"
+            )
+        weights[column] = float(value)
+    return tuple(weights[column] for column in FTS_COLUMNS)
+
+
+def cjk_bigrams(run: str) -> List[str]:
+    """Overlapping bigrams of a CJK run (a single character stays as is)."""
+    if len(run) == 1:
+        return [run]
+    return [run[i : i + 2] for i in range(len(run) - 1)]
+
+
+def segment_cjk(text: str) -> str:
+    """Rewrite every CJK run in text as its bigrams followed by its characters.
+
+    The bigrams stay adjacent so multi-character queries can match them as a
+    phrase; the single characters make one-character queries work anywhere in
+    the run.
+    """
+
+    def expand(match) -> str:
+        run = match.group(0)
+        tokens = cjk_bigrams(run) + (list(run) if len(run) > 1 else [])
+        return " " + " ".join(tokens) + " "
+
+    return CJK_PATTERN.sub(expand, text)
+
+
+def build_cjk_match_query(query: str, prefix_last: bool = False) -> str:
+    """FTS5 query for workflows_cjk_fts: CJK runs become bigram phrases."""
+    terms = []
+    for token in QUERY_TOKEN_PATTERN.findall(query.lower()):
+        position = 0
+        for run in CJK_PATTERN.finditer(token):
+            if run.start() > position:
+                terms.append(f'"{token[position : run.start()]}"')
+            terms.append(f'"{" ".join(cjk_bigrams(run.group(0)))}"')
+            position = run.end()
+        if position < len(token):
+            terms.append(f'"{token[position:]}"')
+
+    if prefix_last and terms and not terms[-1].endswith("*"):
+        terms[-1] += "*"
+    return " AND ".join(terms)
+
+
+# Typo fallback: FTS columns whose terms can be suggested as corrections
+TYPO_SOURCE_COLUMNS = ("name", "integrations", "tags")
+# Cost budget for correcting a zero-result query
+TYPO_MIN_TOKEN_LENGTH = 4  # shorter tokens share too few trigrams to correct
+TYPO_MAX_TOKENS = 4  # longer queries are not corrected at all
+TYPO_MAX_CANDIDATES = 20  # vocabulary terms scored per misspelled token
+TYPO_MIN_SIMILARITY = 0.3  # trigram Jaccard similarity, as in pg_trgm
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance counting adjacent transpositions as one edit."""
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(
+                previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[len(b)]
+
+
+def term_trigrams(term: str) -> set:
+    """Padded trigrams of a term ("  t", " te", "tel", ..., "am ")."""
+    padded = f"  {term} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+# Enhanced service mapping for better recognition
+SERVICE_MAPPINGS = {
+    # Messaging & Communication
+    "telegram": "Telegram",
+    "telegramTrigger": "Telegram",
+    "discord": "Discord",
+    "slack": "Slack",
+    "whatsapp": "WhatsApp",
+    "mattermost": "Mattermost",
+    "teams": "Microsoft Teams",
+    "rocketchat": "Rocket.Chat",
+    # Email
+    "gmail": "Gmail",
+    "mailjet": "Mailjet",
+    "emailreadimap": "Email (IMAP)",
+    "emailsendsmt": "Email (SMTP)",
+    "outlook": "Outlook",
+    # Cloud Storage
+    "googledrive": "Google Drive",
+    "googledocs": "Google Docs",
+    "googlesheets": "Google Sheets",
+    "dropbox": "Dropbox",
+    "onedrive": "OneDrive",
+    "box": "Box",
+    # Databases
+    "postgres": "PostgreSQL",
+    "mysql": "MySQL",
+    "mongodb": "MongoDB",
+    "redis": "Redis",
+    "airtable": "Airtable",
+    "notion": "Notion",
+    # Project Management
+    "jira": "Jira",
+    "github": "GitHub",
+    "gitlab": "GitLab",
+    "trello": "Trello",
+    "asana": "Asana",
+    "mondaycom": "Monday.com",
+    # AI/ML Services
+    "openai": "OpenAI",
+    "anthropic": "Anthropic",
+    "huggingface": "Hugging Face",
+    # Social Media
+    "linkedin": "LinkedIn",
+    "twitter": "Twitter/X",
+    "facebook": "Facebook",
+    "instagram": "Instagram",
+    # E-commerce
+    "shopify": "Shopify",
+    "stripe": "Stripe",
+    "paypal": "PayPal",
+    # Analytics
+    "googleanalytics": "Google Analytics",
+    "mixpanel": "Mixpanel",
+    # Calendar & Tasks
+    "googlecalendar": "Google Calendar",
+    "googletasks": "Google Tasks",
+    "cal": "Cal.com",
+    "calendly": "Calendly",
+    # Forms & Surveys
+    "typeform": "Typeform",
+    "googleforms": "Google Forms",
+    "form": "Form Trigger",
+    # Development Tools
+    "webhook": "Webhook",
+    "httpRequest": "HTTP Request",
+    "graphql": "GraphQL",
+    "sse": "Server-Sent Events",
+    # Utility nodes (exclude from integrations)
+    "set": None,
+    "function": None,
+    "code": None,
+    "if": None,
+    "switch": None,
+    "merge": None,
+    "split": None,
+    "stickynote": None,
+    "stickyNote": None,
+    "wait": None,
+    "schedule": None,
+    "cron": None,
+    "manual": None,
+    "stopanderror": None,
+    "noop": None,
+    "noOp": None,
+    "error": None,
+    "limit": None,
+    "aggregate": None,
+    "summarize": None,
+    "filter": None,
+    "sort": None,
+    "removeDuplicates": None,
+    "dateTime": None,
+    "extractFromFile": None,
+    "convertToFile": None,
+    "readBinaryFile": None,
+    "readBinaryFiles": None,
+    "executionData": None,
+    "executeWorkflow": None,
+    "executeCommand": None,
+    "respondToWebhook": None,
+}
+
+# Keys that can occur in a lowercased node name, in priority (dict) order
+NAME_SERVICE_KEYS = [
+    key for key, value in SERVICE_MAPPINGS.items() if value and key == key.lower()
+]
+NAME_SERVICE_PRIORITY = {key: index for index, key in enumerate(NAME_SERVICE_KEYS)}
+
+# Custom community nodes recognised by a keyword in their type
+CUSTOM_NODE_SERVICES = [
+    ("youtube", "YouTube"),
+    ("telegram", "Telegram"),
+    ("discord", "Discord"),
+    ("calcslive", "CalcsLive"),
+]
+
+
+def compile_service_matcher(keys: List[str]) -> "re.Pattern":
+    """Compile keys into one alternation that reports every match position.
+
+    The lookahead makes matches zero-width so overlapping keys are all found;
+    at a given position the alternation order picks the highest-priority key.
+    """
+    return re.compile("(?=(" + "|".join(re.escape(key) for key in keys) + "))")
+
+
+NAME_SERVICE_MATCHER = compile_service_matcher(NAME_SERVICE_KEYS)
+# "cal" is skipped for calculator-style names so it cannot map to Cal.com
+NAME_SERVICE_MATCHER_NO_CAL = compile_service_matcher(
+    [key for key in NAME_SERVICE_KEYS if key != "cal"]
+)
+
+
+@lru_cache(maxsize=32768)
+def service_from_node_name(node_name: str) -> Optional[str]:
+    """Service hinted at by a lowercased node name (first mapping key wins)."""
+    matcher = (
+        NAME_SERVICE_MATCHER_NO_CAL if "calc" in node_name else NAME_SERVICE_MATCHER
+    )
+    best_key = None
+    for match in matcher.finditer(node_name):
+        key = match.group(1)
+        if (
+            best_key is None
+            or NAME_SERVICE_PRIORITY[key] < NAME_SERVICE_PRIORITY[best_key]
+        ):
+            best_key = key
+    return SERVICE_MAPPINGS[best_key] if best_key else None
+
+
+@lru_cache(maxsize=None)
+def service_from_node_type(node_type: str) -> Optional[str]:
+    """Service implied by an n8n node type, memoized across the corpus."""
+    # Handle n8n-nodes-base nodes
+    if node_type.startswith("n8n-nodes-base."):
+        raw_service = node_type.replace("n8n-nodes-base.", "").lower()
+        raw_service = raw_service.replace("trigger", "")
+        return SERVICE_MAPPINGS.get(
+            raw_service, raw_service.title() if raw_service else None
+        )
+
+    # Handle @n8n/ namespaced nodes
+    if node_type.startswith("@n8n/"):
+        raw_service = (
+            node_type.split(".")[-1].lower() if "." in node_type else node_type.lower()
+        )
+        raw_service = raw_service.replace("trigger", "")
+        return SERVICE_MAPPINGS.get(
+            raw_service, raw_service.title() if raw_service else None
+        )
+
+    # Handle custom nodes like "n8n-nodes-youtube-transcription-kasha.youtubeTranscripter"
+    if "-" in node_type or "@" in node_type:
+        for part in node_type.lower().split("."):
+            for keyword, service in CUSTOM_NODE_SERVICES:
+                if keyword in part:
+                    return service
+
+    return None
+
+
+# Structural metrics computed from the connections graph at index time:
+# API name -> workflows column
+GRAPH_METRIC_COLUMNS = {
+    "depth": "graph_depth",
+    "fan_out": "max_fan_out",
+    "branches": "branch_count",
+    "disconnected": "disconnected_nodes",
+    "cycles": "cycle_count",
+    "error_paths": "error_paths",
+}
+
+# Canvas annotations, never connected to anything
+NON_EXECUTING_NODE_TYPES = {"n8n-nodes-base.stickyNote"}
+
+
+def node_aliases(nodes: List[Dict]) -> Dict[str, str]:
+    """Map node names and ids to node names, skipping non-executing nodes.
+
+    Connections refer to nodes by name in n8n exports, but by id in some
+    files in this collection.
+    """
+    aliases = {}
+    for node in nodes:
+        name = node.get("name")
+        if not name or node.get("type") in NON_EXECUTING_NODE_TYPES:
+            continue
+        aliases[name] = name
+        if node.get("id"):
+            aliases.setdefault(node["id"], name)
+    return aliases
+
+
+def build_node_graph(nodes: List[Dict], connections: Dict) -> Dict[str, List[str]]:
+    """Adjacency lists (node name -> distinct target names, in order) of a workflow.
+
+    Every connection type (main, ai_*) counts as an edge. Sticky notes and
+    connections to nodes that do not exist are left out.
+    """
+    aliases = node_aliases(nodes)
+    graph = {name: [] for name in aliases.values()}
+
+    for source, outputs_by_type in (connections or {}).items():
+        source = aliases.get(source)
+        if source is None or not isinstance(outputs_by_type, dict):
+            continue
+        targets = graph[source]
+        for outputs in outputs_by_type.values():
+            for output in outputs or []:
+                for link in output or []:
+                    target = (
+                        aliases.get(link.get("node"))
+                        if isinstance(link, dict)
+                        else None
+                    )
+                    if target is not None and target not in targets:
+                        targets.append(target)
+    return graph
+
+
+def find_back_edges(graph: Dict[str, List[str]]) -> set:
+    """Edges closing a cycle, found by an iterative depth-first search.
+
+    Roots (nodes nothing points to) are visited first so that loops are cut
+    where they return upstream rather than at their entry.
+    """
+    indegree = {name: 0 for name in graph}
+    for targets in graph.values():
+        for target in targets:
+            indegree[target] += 1
+    order = [n for n in graph if indegree[n] == 0] + [
+        n for n in graph if indegree[n] > 0
+    ]
+
+    back_edges = set()
+    state = {}  # name -> 1 while on the DFS stack, 2 once finished
+    for start in order:
+        if start in state:
+            continue
+        state[start] = 1
+        stack = [(start, iter(graph[start]))]
+        while stack:
+            name, targets = stack[-1]
+            target = next(targets, None)
+            if target is None:
+                state[name] = 2
+                stack.pop()
+            elif state.get(target) == 1:
+                back_edges.add((name, target))
+            elif target not in state:
+                state[target] = 1
+                stack.append((target, iter(graph[target])))
+    return back_edges
+
+
+def compute_graph_metrics(
+    nodes: List[Dict],
+    connections: Dict,
+    graph: Optional[Dict[str, List[str]]] = None,
+) -> Dict[str, int]:
+    """Depth, fan-out, branching, isolated nodes, cycles and error paths.
+
+    - depth: nodes on the longest path, with cycle-closing edges ignored
+    - fan_out: most distinct targets of a single node
+    - branches: nodes that send data to more than one target
+    - disconnected: nodes without any connection (only counted when the
+      workflow has more than one node)
+    - cycles: edges that loop back upstream, e.g. Split In Batches loops
+    - error_paths: connected error outputs plus Error Trigger nodes
+    """
+    if graph is None:
+        graph = build_node_graph(nodes, connections)
+    back_edges = find_back_edges(graph)
+
+    # Longest path over the remaining DAG (Kahn's algorithm)
+    forward = {
+        name: [t for t in targets if (name, t) not in back_edges]
+        for name, targets in graph.items()
+    }
+    indegree = {name: 0 for name in forward}
+    for targets in forward.values():
+        for target in targets:
+            indegree[target] += 1
+    levels = {name: 1 for name in forward}
+    ready = [name for name, degree in indegree.items() if degree == 0]
+    while ready:
+        name = ready.pop()
+        for target in forward[name]:
+            levels[target] = max(levels[target], levels[name] + 1)
+            indegree[target] -= 1
+            if indegree[target] == 0:
+                ready.append(target)
+
+    connected = set()
+    for name, targets in graph.items():
+        if targets:
+            connected.add(name)
+            connected.update(targets)
+
+    aliases = node_aliases(nodes)
+    error_paths = 0
+    for node in nodes:
+        node_type = node.get("type", "")
+        if node_type == "n8n-nodes-base.errorTrigger":
+            error_paths += 1
+        elif node.get("onError") == "continueErrorOutput":
+            # The error output is the node's last main output
+            node_connections = (connections or {}).get(node.get("name")) or (
+                connections or {}
+            ).get(node.get("id"), {})
+            outputs = node_connections.get("main") or []
+            if len(outputs) > 1 and any(
+                isinstance(link, dict) and link.get("node") in aliases
+                for link in outputs[-1] or []
+            ):
+                error_paths += 1
+
+    return {
+        "depth": max(levels.values(), default=0),
+        "fan_out": max((len(targets) for targets in graph.values()), default=0),
+        "branches": sum(1 for targets in graph.values() if len(targets) > 1),
+        "disconnected": len(graph) - len(connected) if len(graph) > 1 else 0,
+        "cycles": len(back_edges),
+        "error_paths": error_paths,
+    }
+
+
+# Paths of this many nodes are indexed for pattern search; longer patterns
+# are looked up as overlapping windows of the longest length
+MIN_PATTERN_LENGTH = 2
+MAX_INDEXED_PATH_LENGTH = 4
+MAX_PATTERN_LENGTH = 8
+PATTERN_STEP_SEPARATOR = ">"
+# Nodes superseded by the Schedule Trigger
+PATTERN_STEP_ALIASES = {"cron": "schedule", "interval": "schedule"}
+
+
+def pattern_step_key(step: str) -> str:
+    """Index key of a node type or pattern step.
+
+    The last segment of a type, lowercased and without punctuation, so
+    "n8n-nodes-base.httpRequest", "httpRequest" and "HTTP Request" all become
+    "httprequest". A trailing "trigger" is dropped and legacy nodes are
+    aliased, so "n8n-nodes-base.scheduleTrigger", "n8n-nodes-base.cron" and
+    "Schedule" all become "schedule".
+    """
+    key = re.sub(r"[^0-9a-z]", "", step.rsplit(".", 1)[-1].lower())
+    if key.endswith("trigger") and key != "trigger":
+        key = key[: -len("trigger")]
+    return PATTERN_STEP_ALIASES.get(key, key)
+
+
+def iter_graph_paths(
+    graph: Dict[str, List[str]], max_length: int
+) -> Iterator[List[str]]:
+    """Every simple path of 2..max_length nodes, as lists of node names."""
+    stack = [[name] for name in graph]
+    while stack:
+        path = stack.pop()
+        if len(path) >= MIN_PATTERN_LENGTH:
+            yield path
+        if len(path) < max_length:
+            for target in graph[path[-1]]:
+                if target not in path:
+                    stack.append(path + [target])
+
+
+def extract_edge_grams(node_types: Dict[str, str], graph: Dict[str, List[str]]) -> set:
+    """Distinct node-type paths of 2..4 nodes, as pattern search index keys."""
+    return {
+        PATTERN_STEP_SEPARATOR.join(pattern_step_key(node_types[name]) for name in path)
+        for path in iter_graph_paths(graph, MAX_INDEXED_PATH_LENGTH)
+    }
+
+
+def find_pattern_path(
+    stored_graph: Dict[str, Any], steps: List[str]
+) -> Optional[List[str]]:
+    """Node names of the first path whose node types follow ``steps``.
+
+    Steps given as full node types ("n8n-nodes-base.slack") must match the
+    type exactly; other steps match on pattern_step_key().
+    """
+    node_types = stored_graph["types"]
+    edges = stored_graph["edges"]
+
+    def step_matches(name: str, step: str) -> bool:
+        if "." in step:
+            return node_types[name] == step
+        return pattern_step_key(node_types[name]) == pattern_step_key(step)
+
+    stack = [[name] for name in node_types if step_matches(name, steps[0])]
+    while stack:
+        path = stack.pop()
+        if len(path) == len(steps):
+            return path
+        step = steps[len(path)]
+        for target in edges.get(path[-1], []):
+            if target not in path and step_matches(target, step):
+                stack.append(path + [target])
+    return None
+
+
 class WorkflowDatabase:
     """High-performance SQLite database for workflow metadata and search."""
 
-    def __init__(self, db_path: str = None):
+    def __init__(
+        self, db_path: str = None, lazy: bool = False, tokenizer_mode: str = None
+    ):
         # Use environment variable if no path provided
         if db_path is None:
             db_path = os.environ.get("WORKFLOW_DB_PATH", "workflows.db")
         self.db_path = db_path
         self.workflows_dir = "workflows"
-        self.init_database()
+        self._schema_ready = False
+
+        # Ranking: per-column bm25() weights and an optional popularity blend
+        self.bm25_weights = parse_bm25_weights(os.environ.get("SEARCH_BM25_WEIGHTS"))
+        self.popularity_weight = float(
+            os.environ.get("SEARCH_POPULARITY_WEIGHT", DEFAULT_POPULARITY_WEIGHT)
+        )
+
+        # Last index generation read by current_index_generation()
+        self._generation = 0
+        self._generation_check = GenerationCheck()
+        self._generation_lock = threading.Lock()
+
+        # Search results are cached per process; SEARCH_CACHE_SIZE=0 disables
+        self.result_cache = ResultCache(
+            max_size=int(
+                os.environ.get("SEARCH_CACHE_SIZE", DEFAULT_RESULT_CACHE_SIZE)
+            ),
+            ttl=float(os.environ.get("SEARCH_CACHE_TTL", DEFAULT_RESULT_CACHE_TTL)),
+        )
+
+        # None keeps whatever mode the database was built with
+        self.tokenizer_mode = tokenizer_mode or os.environ.get("SEARCH_TOKENIZER")
+        if self.tokenizer_mode and self.tokenizer_mode not in TOKENIZER_MODES:
+            raise ValueError(
+                f"Unknown tokenizer mode '{self.tokenizer_mode}', "
+                f"expected one of {', '.join(TOKENIZER_MODES)}"
+            )
+
+        # Lazy handles defer the schema check until the first query
+        if not lazy:
+            self.ensure_schema()
+
+    def get_schema_setting(self, key: str) -> Optional[str]:
+        """Read a value from schema_info (None if unset)."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute(
+                "SELECT value FROM schema_info WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.OperationalError:
+            # Fresh database or one created before schema_info existed
+            row = None
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    def get_schema_version(self) -> int:
+        """Return the schema version recorded in the database (0 if none)."""
+        version = self.get_schema_setting("schema_version")
+        return int(version) if version else 0
+
+    def ensure_schema(self) -> bool:
+        """Run init_database() only if the stored schema version is outdated.
+
+        Returns True when the schema was (re)initialized.
+        """
+        if self._schema_ready:
+            return False
+
+        migrated = False
+        stored_mode = self.get_schema_setting("tokenizer_mode")
+        if self.get_schema_version() < SCHEMA_VERSION:
+            self.init_database()
+            migrated = True
+        elif self.tokenizer_mode and self.tokenizer_mode != stored_mode:
+            conn = sqlite3.connect(self.db_path)
+            self.apply_tokenizer_mode(conn)
+            conn.commit()
+            conn.close()
+            migrated = True
+
+        if not self.tokenizer_mode:
+            self.tokenizer_mode = stored_mode or DEFAULT_TOKENIZER_MODE
+
+        self._schema_ready = True
+        return migrated
+
+    def get_db_connection(self) -> sqlite3.Connection:
+        """Open a connection, making sure the schema is up to date first."""
+        self.ensure_schema()
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
 
     def init_database(self):
         """Initialize SQLite database with optimized schema and indexes."""
@@ -50,20 +923,42 @@ class WorkflowDatabase:
                 updated_at TEXT,
                 file_hash TEXT,
                 file_size INTEGER,
-                analyzed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                analyzed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                graph_depth INTEGER NOT NULL DEFAULT 0,
+                max_fan_out INTEGER NOT NULL DEFAULT 0,
+                branch_count INTEGER NOT NULL DEFAULT 0,
+                disconnected_nodes INTEGER NOT NULL DEFAULT 0,
+                cycle_count INTEGER NOT NULL DEFAULT 0,
+                error_paths INTEGER NOT NULL DEFAULT 0
             )
         """)
 
-        # Create FTS5 table for full-text search
-        conn.execute("""
+        # Create FTS5 table for full-text search, rebuilding it when an older
+        # database was created with different options
+        row = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'workflows_fts'"
+        ).fetchone()
+        rebuild_fts = (
+            row is None or FTS_OPTIONS not in row[0] or FTS_CONTENT not in row[0]
+        )
+        if rebuild_fts:
+            conn.execute("DROP TABLE IF EXISTS workflows_fts")
+        conn.execute(f"""
+            CREATE VIEW IF NOT EXISTS workflows_search_content AS
+            SELECT id, filename, name, description,
+                {INTEGRATIONS_TEXT_SQL.format(row="workflows")} AS integrations,
+                {TAGS_TEXT_SQL.format(row="workflows")} AS tags
+            FROM workflows
+        """)
+        conn.execute(f"""
             CREATE VIRTUAL TABLE IF NOT EXISTS workflows_fts USING fts5(
                 filename,
                 name,
                 description,
                 integrations,
                 tags,
-                content=workflows,
-                content_rowid=id
+                {FTS_CONTENT},
+                {FTS_OPTIONS}
             )
         """)
 
@@ -80,33 +975,450 @@ class WorkflowDatabase:
         )
         conn.execute("CREATE INDEX IF NOT EXISTS idx_filename ON workflows(filename)")
 
-        # Create triggers to keep FTS table in sync
-        conn.execute("""
-            CREATE TRIGGER IF NOT EXISTS workflows_ai AFTER INSERT ON workflows BEGIN
+        # Create triggers to keep FTS table in sync; they index the same
+        # flattened text as workflows_search_content
+        new_values = (
+            "new.id, new.filename, new.name, new.description, "
+            f"{INTEGRATIONS_TEXT_SQL.format(row='new')}, {TAGS_TEXT_SQL.format(row='new')}"
+        )
+        old_values = (
+            "old.id, old.filename, old.name, old.description, "
+            f"{INTEGRATIONS_TEXT_SQL.format(row='old')}, {TAGS_TEXT_SQL.format(row='old')}"
+        )
+        for trigger in ("workflows_ai", "workflows_ad", "workflows_au"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+
+        conn.execute(f"""
+            CREATE TRIGGER workflows_ai AFTER INSERT ON workflows BEGIN
                 INSERT INTO workflows_fts(rowid, filename, name, description, integrations, tags)
-                VALUES (new.id, new.filename, new.name, new.description, new.integrations, new.tags);
+                VALUES ({new_values});
             END
         """)
 
-        conn.execute("""
-            CREATE TRIGGER IF NOT EXISTS workflows_ad AFTER DELETE ON workflows BEGIN
+        conn.execute(f"""
+            CREATE TRIGGER workflows_ad AFTER DELETE ON workflows BEGIN
                 INSERT INTO workflows_fts(workflows_fts, rowid, filename, name, description, integrations, tags)
-                VALUES ('delete', old.id, old.filename, old.name, old.description, old.integrations, old.tags);
+                VALUES ('delete', {old_values});
             END
         """)
 
-        conn.execute("""
-            CREATE TRIGGER IF NOT EXISTS workflows_au AFTER UPDATE ON workflows BEGIN
+        # Only searchable columns re-index; counters and scores update freely
+        conn.execute(f"""
+            CREATE TRIGGER workflows_au
+            AFTER UPDATE OF filename, name, description, integrations, tags ON workflows
+            BEGIN
                 INSERT INTO workflows_fts(workflows_fts, rowid, filename, name, description, integrations, tags)
-                VALUES ('delete', old.id, old.filename, old.name, old.description, old.integrations, old.tags);
+                VALUES ('delete', {old_values});
                 INSERT INTO workflows_fts(rowid, filename, name, description, integrations, tags)
-                VALUES (new.id, new.filename, new.name, new.description, new.integrations, new.tags);
+                VALUES ({new_values});
             END
         """)
 
+        if rebuild_fts:
+            # FTS5 'rebuild' cannot read a view that uses json_each(), so the
+            # freshly created table is filled directly
+            conn.execute("""
+                INSERT INTO workflows_fts(rowid, filename, name, description, integrations, tags)
+                SELECT id, filename, name, description, integrations, tags
+                FROM workflows_search_content
+            """)
+
+        # Graph metrics columns; rows indexed before they existed are
+        # re-analyzed on the next index run
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(workflows)")]
+        missing_metrics = [
+            column for column in GRAPH_METRIC_COLUMNS.values() if column not in columns
+        ]
+        for column in missing_metrics:
+            conn.execute(
+                f"ALTER TABLE workflows ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"
+            )
+        if missing_metrics:
+            conn.execute("UPDATE workflows SET file_hash = NULL")
+        for column in GRAPH_METRIC_COLUMNS.values():
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{column} ON workflows({column})"
+            )
+
+        # Inverted index from node type to the workflows using it. Existing
+        # rows predate it, so their hashes are cleared to make the next index
+        # run re-read every file
+        has_node_index = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'workflow_nodes'"
+        ).fetchone()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS workflow_nodes (
+                workflow_id INTEGER NOT NULL,
+                node_type TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (node_type, workflow_id)
+            ) WITHOUT ROWID
+        """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_workflow_nodes_workflow ON workflow_nodes(workflow_id)"
+        )
+        if not has_node_index:
+            conn.execute("UPDATE workflows SET file_hash = NULL")
+
+        # Inverted index from integration to the workflows using it, so facet
+        # counts group rows instead of parsing workflows.integrations
+        has_integration_index = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'workflow_integrations'"
+        ).fetchone()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS workflow_integrations (
+                integration TEXT NOT NULL,
+                workflow_id INTEGER NOT NULL,
+                PRIMARY KEY (integration, workflow_id)
+            ) WITHOUT ROWID
+        """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_workflow_integrations_workflow ON workflow_integrations(workflow_id)"
+        )
+        if not has_integration_index:
+            conn.execute("""
+                INSERT OR IGNORE INTO workflow_integrations (integration, workflow_id)
+                SELECT j.value, w.id FROM workflows w, json_each(w.integrations) j
+            """)
+
+        # Pattern search: node-type paths of 2-4 nodes (keys from
+        # pattern_step_key, joined by ">") and the graph used to verify hits
+        has_pattern_index = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'workflow_edge_grams'"
+        ).fetchone()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS workflow_edge_grams (
+                gram TEXT NOT NULL,
+                workflow_id INTEGER NOT NULL,
+                PRIMARY KEY (gram, workflow_id)
+            ) WITHOUT ROWID
+        """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_workflow_edge_grams_workflow ON workflow_edge_grams(workflow_id)"
+        )
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS workflow_graphs (
+                workflow_id INTEGER PRIMARY KEY,
+                graph TEXT NOT NULL  -- JSON {"types": {name: type}, "edges": {name: [names]}}
+            )
+        """)
+        # Before schema 15 trigger and legacy schedule nodes kept their own keys
+        if not has_pattern_index or self.get_schema_version() < 15:
+            conn.execute("UPDATE workflows SET file_hash = NULL")
+
+        # Related workflows: MinHash signature over node types and
+        # integrations, plus one LSH bucket per band (workflow_similarity.py)
+        has_similarity_index = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'workflow_minhash'"
+        ).fetchone()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS workflow_minhash (
+                workflow_id INTEGER PRIMARY KEY,
+                signature BLOB NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS workflow_lsh_buckets (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                workflow_id INTEGER NOT NULL,
+                PRIMARY KEY (band, bucket, workflow_id)
+            ) WITHOUT ROWID
+        """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_workflow_lsh_buckets_workflow ON workflow_lsh_buckets(workflow_id)"
+        )
+        if not has_similarity_index:
+            conn.execute("UPDATE workflows SET file_hash = NULL")
+
+        # Sparse hashed term vectors for offline retrieval (workflow_retrieval.py)
+        has_vectors = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'workflow_vectors'"
+        ).fetchone()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS workflow_vectors (
+                workflow_id INTEGER PRIMARY KEY,
+                columns BLOB NOT NULL,  -- uint32 column indices
+                weights BLOB NOT NULL   -- float32 sublinear term frequencies
+            )
+        """)
+        # Before schema 13 node type terms kept their plurals; re-vectorize
+        if not has_vectors or self.get_schema_version() < 13:
+            conn.execute("UPDATE workflows SET file_hash = NULL")
+
+        # Workflows per integration and per integration pair, adjusted by the
+        # indexer as workflows change (workflow_cooccurrence.py)
+        has_cooccurrence = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'integration_pairs'"
+        ).fetchone()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS integration_counts (
+                integration TEXT PRIMARY KEY,
+                workflows INTEGER NOT NULL
+            ) WITHOUT ROWID
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS integration_pairs (
+                a TEXT NOT NULL,
+                b TEXT NOT NULL,
+                workflows INTEGER NOT NULL,
+                PRIMARY KEY (a, b)
+            ) WITHOUT ROWID
+        """)
+        if not has_cooccurrence:
+            from workflow_cooccurrence import rebuild_cooccurrence
+
+            rebuild_cooccurrence(conn)
+
+        # Append-only log of what each indexing run changed, rolled up per
+        # (UTC) day so trend queries never rescan the log
+        has_change_history = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'index_daily_changes'"
+        ).fetchone()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS index_changes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                generation INTEGER NOT NULL,
+                indexed_at TEXT NOT NULL,
+                added INTEGER NOT NULL,
+                updated INTEGER NOT NULL,
+                removed INTEGER NOT NULL,
+                integration_deltas TEXT NOT NULL  -- JSON {integration: change}
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS index_daily_changes (
+                day TEXT PRIMARY KEY,
+                runs INTEGER NOT NULL,
+                added INTEGER NOT NULL,
+                updated INTEGER NOT NULL,
+                removed INTEGER NOT NULL,
+                workflows INTEGER NOT NULL,  -- corpus size after the day's last run
+                nodes INTEGER               -- total node count, likewise
+            ) WITHOUT ROWID
+        """)
+        daily_columns = [
+            row[1] for row in conn.execute("PRAGMA table_info(index_daily_changes)")
+        ]
+        if "nodes" not in daily_columns:
+            # Days rolled up before schema 14 keep NULL
+            conn.execute("ALTER TABLE index_daily_changes ADD COLUMN nodes INTEGER")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS integration_daily_deltas (
+                day TEXT NOT NULL,
+                integration TEXT NOT NULL,
+                delta INTEGER NOT NULL,
+                PRIMARY KEY (day, integration)
+            ) WITHOUT ROWID
+        """)
+        if not has_change_history:
+            # Baseline so growth rates have a starting corpus size
+            conn.execute(
+                """
+                INSERT INTO index_daily_changes (day, runs, added, updated, removed, workflows, nodes)
+                SELECT ?, 0, 0, 0, 0, COUNT(*), SUM(node_count) FROM workflows
+                HAVING COUNT(*) > 0
+            """,
+                (utc_day(),),
+            )
+
+        # Trigram index over the search vocabulary, used to correct typos in
+        # queries that match nothing
+        conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS workflows_fts_vocab USING fts5vocab(workflows_fts, 'col')"
+        )
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS search_terms (
+                term TEXT PRIMARY KEY,
+                doc_count INTEGER NOT NULL
+            ) WITHOUT ROWID
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS search_term_trigrams (
+                trigram TEXT NOT NULL,
+                term TEXT NOT NULL,
+                PRIMARY KEY (trigram, term)
+            ) WITHOUT ROWID
+        """)
+        self.rebuild_search_terms(conn)
+
+        # Record the schema version so later startups can skip the DDL above
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_info (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+        conn.execute(
+            "INSERT OR REPLACE INTO schema_info (key, value) VALUES ('schema_version', ?)",
+            (str(SCHEMA_VERSION),),
+        )
+        self.apply_tokenizer_mode(conn)
+
         conn.commit()
         conn.close()
 
+    def apply_tokenizer_mode(self, conn: sqlite3.Connection):
+        """Create or drop the CJK bigram index to match the tokenizer mode."""
+        if not self.tokenizer_mode:
+            row = conn.execute(
+                "SELECT value FROM schema_info WHERE key = 'tokenizer_mode'"
+            ).fetchone()
+            self.tokenizer_mode = row[0] if row else DEFAULT_TOKENIZER_MODE
+
+        if self.tokenizer_mode == "cjk":
+            print("🈶 Building CJK bigram search index...")
+            conn.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS workflows_cjk_fts USING fts5(
+                    filename,
+                    name,
+                    description,
+                    integrations,
+                    tags,
+                    {FTS_OPTIONS}
+                )
+            """)
+            self.rebuild_cjk_index(conn)
+        else:
+            conn.execute("DROP TABLE IF EXISTS workflows_cjk_fts")
+
+        conn.execute(
+            "INSERT OR REPLACE INTO schema_info (key, value) VALUES ('tokenizer_mode', ?)",
+            (self.tokenizer_mode,),
+        )
+
+    def rebuild_cjk_index(self, conn: sqlite3.Connection):
+        """Re-segment every workflow containing CJK text into workflows_cjk_fts.
+
+        Workflows without CJK text can never match a CJK query, so they are
+        left out and the side index stays small.
+        """
+        conn.execute("DELETE FROM workflows_cjk_fts")
+        cursor = conn.execute(
+            "SELECT id, filename, name, description, integrations, tags FROM workflows"
+        )
+        columns = [column[0] for column in cursor.description]
+        for values in cursor.fetchall():
+            workflow = self.row_to_workflow(dict(zip(columns, values)))
+            fields = [
+                workflow["filename"],
+                workflow["name"],
+                workflow["description"] or "",
+                " ".join(workflow["integrations"]),
+                " ".join(workflow["tags"]),
+            ]
+            if not any(CJK_PATTERN.search(field) for field in fields):
+                continue
+            conn.execute(
+                """
+                INSERT INTO workflows_cjk_fts(rowid, filename, name, description, integrations, tags)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """,
+                (workflow["id"], *(segment_cjk(field) for field in fields)),
+            )
+
+    def get_fts_source(self, query: str, prefix_last: bool = False) -> Tuple[str, str]:
+        """FTS table and MATCH expression to use for a query.
+
+        CJK queries go to the bigram index when the cjk tokenizer mode is on;
+        everything else is passed to workflows_fts unchanged.
+        """
+        self.ensure_schema()
+        if self.tokenizer_mode == "cjk" and CJK_PATTERN.search(query):
+            return "workflows_cjk_fts", build_cjk_match_query(query, prefix_last)
+        return "workflows_fts", query
+
+    def rebuild_search_terms(self, conn: sqlite3.Connection):
+        """Refresh the typo-correction vocabulary and its trigram index.
+
+        The vocabulary is read from the FTS index itself, so it is cheap to
+        rebuild after every indexing run.
+        """
+        placeholders = ",".join("?" for _ in TYPO_SOURCE_COLUMNS)
+        rows = conn.execute(
+            f"""
+            SELECT term, MAX(doc) FROM workflows_fts_vocab
+            WHERE col IN ({placeholders}) AND length(term) >= ?
+            GROUP BY term
+        """,
+            (*TYPO_SOURCE_COLUMNS, TYPO_MIN_TOKEN_LENGTH),
+        ).fetchall()
+        terms = [(term, doc_count) for term, doc_count in rows if not term.isdigit()]
+
+        conn.execute("DELETE FROM search_terms")
+        conn.execute("DELETE FROM search_term_trigrams")
+        conn.executemany("INSERT INTO search_terms VALUES (?, ?)", terms)
+        conn.executemany(
+            "INSERT INTO search_term_trigrams VALUES (?, ?)",
+            ((trigram, term) for term, _ in terms for trigram in term_trigrams(term)),
+        )
+
+    def correct_query(self, query: str) -> Optional[str]:
+        """Replace misspelled query words with the closest indexed terms.
+
+        Returns None when nothing could be corrected. Only short queries are
+        considered and each word scores a bounded number of candidates, so a
+        zero-result search costs at most a few indexed lookups more.
+        """
+        tokens = QUERY_TOKEN_PATTERN.findall(query.lower())
+        if not tokens or len(tokens) > TYPO_MAX_TOKENS:
+            return None
+
+        conn = self.get_db_connection()
+        corrected = []
+        changed = False
+        try:
+            for token in tokens:
+                # CJK words are not in the trigram vocabulary
+                if CJK_PATTERN.search(token):
+                    corrected.append(token)
+                    continue
+                if (
+                    len(token) < TYPO_MIN_TOKEN_LENGTH
+                    or conn.execute(
+                        "SELECT 1 FROM search_terms WHERE term = ?", (token,)
+                    ).fetchone()
+                ):
+                    corrected.append(token)
+                    continue
+
+                trigrams = term_trigrams(token)
+                placeholders = ",".join("?" for _ in trigrams)
+                candidates = conn.execute(
+                    f"""
+                    SELECT t.term, COUNT(*) AS shared, s.doc_count
+                    FROM search_term_trigrams t
+                    JOIN search_terms s ON s.term = t.term
+                    WHERE t.trigram IN ({placeholders})
+                    GROUP BY t.term
+                    ORDER BY shared DESC, s.doc_count DESC
+                    LIMIT ?
+                """,
+                    (*trigrams, TYPO_MAX_CANDIDATES),
+                ).fetchall()
+
+                # Trigram overlap gates the candidates; the fewest edits wins
+                best_term, best_key = None, None
+                for row in candidates:
+                    # Padded terms have len(term) + 1 trigrams
+                    union = len(trigrams) + len(row["term"]) + 1 - row["shared"]
+                    score = row["shared"] / union
+                    if score < TYPO_MIN_SIMILARITY:
+                        continue
+                    key = (edit_distance(token, row["term"]), -score, -row["doc_count"])
+                    if best_key is None or key < best_key:
+                        best_term, best_key = row["term"], key
+
+                if best_term:
+                    corrected.append(best_term)
+                    changed = True
+                else:
+                    corrected.append(token)
+        finally:
+            conn.close()
+
+        return " ".join(corrected) if changed else None
+
     def get_file_hash(self, file_path: str) -> str:
         """Get MD5 hash of file for change detection."""
         hash_md5 = hashlib.md5()
@@ -204,6 +1516,26 @@ class WorkflowDatabase:
             complexity = "high"
         workflow["complexity"] = complexity
 
+        # Count node types for the workflow_nodes index
+        node_types: Dict[str, int] = {}
+        for node in workflow["nodes"]:
+            node_type = node.get("type")
+            if node_type:
+                node_types[node_type] = node_types.get(node_type, 0) + 1
+        workflow["node_types"] = node_types
+
+        graph = build_node_graph(workflow["nodes"], workflow["connections"])
+        workflow["graph_metrics"] = compute_graph_metrics(
+            workflow["nodes"], workflow["connections"], graph
+        )
+        node_types_by_name = {
+            node["name"]: node.get("type", "")
+            for node in workflow["nodes"]
+            if node.get("name") in graph
+        }
+        workflow["graph"] = {"types": node_types_by_name, "edges": graph}
+        workflow["edge_grams"] = extract_edge_grams(node_types_by_name, graph)
+
         # Find trigger type and integrations
         trigger_type, integrations = self.analyze_nodes(workflow["nodes"])
         workflow["trigger_type"] = trigger_type
@@ -225,174 +1557,25 @@ class WorkflowDatabase:
         trigger_type = "Manual"
         integrations = set()
 
-        # Enhanced service mapping for better recognition
-        service_mappings = {
-            # Messaging & Communication
-            "telegram": "Telegram",
-            "telegramTrigger": "Telegram",
-            "discord": "Discord",
-            "slack": "Slack",
-            "whatsapp": "WhatsApp",
-            "mattermost": "Mattermost",
-            "teams": "Microsoft Teams",
-            "rocketchat": "Rocket.Chat",
-            # Email
-            "gmail": "Gmail",
-            "mailjet": "Mailjet",
-            "emailreadimap": "Email (IMAP)",
-            "emailsendsmt": "Email (SMTP)",
-            "outlook": "Outlook",
-            # Cloud Storage
-            "googledrive": "Google Drive",
-            "googledocs": "Google Docs",
-            "googlesheets": "Google Sheets",
-            "dropbox": "Dropbox",
-            "onedrive": "OneDrive",
-            "box": "Box",
-            # Databases
-            "postgres": "PostgreSQL",
-            "mysql": "MySQL",
-            "mongodb": "MongoDB",
-            "redis": "Redis",
-            "airtable": "Airtable",
-            "notion": "Notion",
-            # Project Management
-            "jira": "Jira",
-            "github": "GitHub",
-            "gitlab": "GitLab",
-            "trello": "Trello",
-            "asana": "Asana",
-            "mondaycom": "Monday.com",
-            # AI/ML Services
-            "openai": "OpenAI",
-            "anthropic": "Anthropic",
-            "huggingface": "Hugging Face",
-            # Social Media
-            "linkedin": "LinkedIn",
-            "twitter": "Twitter/X",
-            "facebook": "Facebook",
-            "instagram": "Instagram",
-            # E-commerce
-            "shopify": "Shopify",
-            "stripe": "Stripe",
-            "paypal": "PayPal",
-            # Analytics
-            "googleanalytics": "Google Analytics",
-            "mixpanel": "Mixpanel",
-            # Calendar & Tasks
-            "googlecalendar": "Google Calendar",
-            "googletasks": "Google Tasks",
-            "cal": "Cal.com",
-            "calendly": "Calendly",
-            # Forms & Surveys
-            "typeform": "Typeform",
-            "googleforms": "Google Forms",
-            "form": "Form Trigger",
-            # Development Tools
-            "webhook": "Webhook",
-            "httpRequest": "HTTP Request",
-            "graphql": "GraphQL",
-            "sse": "Server-Sent Events",
-            # Utility nodes (exclude from integrations)
-            "set": None,
-            "function": None,
-            "code": None,
-            "if": None,
-            "switch": None,
-            "merge": None,
-            "split": None,
-            "stickynote": None,
-            "stickyNote": None,
-            "wait": None,
-            "schedule": None,
-            "cron": None,
-            "manual": None,
-            "stopanderror": None,
-            "noop": None,
-            "noOp": None,
-            "error": None,
-            "limit": None,
-            "aggregate": None,
-            "summarize": None,
-            "filter": None,
-            "sort": None,
-            "removeDuplicates": None,
-            "dateTime": None,
-            "extractFromFile": None,
-            "convertToFile": None,
-            "readBinaryFile": None,
-            "readBinaryFiles": None,
-            "executionData": None,
-            "executeWorkflow": None,
-            "executeCommand": None,
-            "respondToWebhook": None,
-        }
-
         for node in nodes:
             node_type = node.get("type", "")
             node_name = node.get("name", "").lower()
+            node_type_lower = node_type.lower()
 
             # Determine trigger type
-            if "webhook" in node_type.lower() or "webhook" in node_name:
+            if "webhook" in node_type_lower or "webhook" in node_name:
                 trigger_type = "Webhook"
-            elif "cron" in node_type.lower() or "schedule" in node_type.lower():
+            elif "cron" in node_type_lower or "schedule" in node_type_lower:
                 trigger_type = "Scheduled"
-            elif "trigger" in node_type.lower() and trigger_type == "Manual":
-                if "manual" not in node_type.lower():
+            elif "trigger" in node_type_lower and trigger_type == "Manual":
+                if "manual" not in node_type_lower:
                     trigger_type = "Webhook"
 
-            # Extract integrations with enhanced mapping
-            service_name = None
-
-            # Handle n8n-nodes-base nodes
-            if node_type.startswith("n8n-nodes-base."):
-                raw_service = node_type.replace("n8n-nodes-base.", "").lower()
-                raw_service = raw_service.replace("trigger", "")
-                service_name = service_mappings.get(
-                    raw_service, raw_service.title() if raw_service else None
-                )
-
-            # Handle @n8n/ namespaced nodes
-            elif node_type.startswith("@n8n/"):
-                raw_service = (
-                    node_type.split(".")[-1].lower()
-                    if "." in node_type
-                    else node_type.lower()
-                )
-                raw_service = raw_service.replace("trigger", "")
-                service_name = service_mappings.get(
-                    raw_service, raw_service.title() if raw_service else None
-                )
-
-            # Handle custom nodes
-            elif "-" in node_type or "@" in node_type:
-                # Try to extract service name from custom node names like "n8n-nodes-youtube-transcription-kasha.youtubeTranscripter"
-                parts = node_type.lower().split(".")
-                for part in parts:
-                    if "youtube" in part:
-                        service_name = "YouTube"
-                        break
-                    elif "telegram" in part:
-                        service_name = "Telegram"
-                        break
-                    elif "discord" in part:
-                        service_name = "Discord"
-                        break
-                    elif "calcslive" in part:
-                        service_name = "CalcsLive"
-                        break
-
-            # Also check node names for service hints (but avoid false positives)
-            for service_key, service_value in service_mappings.items():
-                if service_key in node_name and service_value:
-                    # Avoid false positive: "cal" in calcslive-related terms should not match "Cal.com"
-                    if service_key == "cal" and any(
-                        term in node_name.lower()
-                        for term in ["calcslive", "calc", "calculation"]
-                    ):
-                        continue
-                    service_name = service_value
-                    break
+            # Extract integrations: the type gives a default, a service named
+            # in the node name takes precedence
+            service_name = service_from_node_name(node_name) or service_from_node_type(
+                node_type
+            )
 
             # Add to integrations if valid service found
             if service_name and service_name not in ["None", None]:
@@ -456,24 +1639,45 @@ class WorkflowDatabase:
         """Index all workflow files. Only reprocesses changed files unless force_reindex=True."""
         if not os.path.exists(self.workflows_dir):
             print(f"Warning: Workflows directory '{self.workflows_dir}' not found.")
-            return {"processed": 0, "skipped": 0, "errors": 0}
+            return {"processed": 0, "skipped": 0, "errors": 0, "removed": 0}
 
         workflows_path = Path(self.workflows_dir)
         json_files = [str(p) for p in workflows_path.rglob("*.json")]
 
         if not json_files:
             print(f"Warning: No JSON files found in '{self.workflows_dir}' directory.")
-            return {"processed": 0, "skipped": 0, "errors": 0}
+            return {"processed": 0, "skipped": 0, "errors": 0, "removed": 0}
 
         print(f"Indexing {len(json_files)} workflow files...")
 
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        # numpy-backed index builders, imported here to keep it out of API startup
+        from workflow_cooccurrence import apply_cooccurrence_delta
+        from workflow_retrieval import hash_term_weights, workflow_term_weights
+        from workflow_similarity import (
+            lsh_buckets,
+            minhash_signature,
+            similarity_features,
+        )
 
-        stats = {"processed": 0, "skipped": 0, "errors": 0}
+        conn = self.get_db_connection()
+        # One transaction for the run, one savepoint per file: a file that
+        # fails halfway leaves no trace, and rows, co-occurrence counts and
+        # the change record are committed together
+        conn.execute("BEGIN")
+
+        stats = {"processed": 0, "skipped": 0, "errors": 0, "removed": 0}
+        changes = {"added": 0, "updated": 0}
+        integration_deltas: Dict[str, int] = {}
+
+        def count_integrations(integrations, delta: int):
+            for integration in set(integrations):
+                integration_deltas[integration] = (
+                    integration_deltas.get(integration, 0) + delta
+                )
 
         for file_path in json_files:
             filename = os.path.basename(file_path)
+            in_savepoint = False
 
             try:
                 # Check if file needs to be reprocessed
@@ -494,14 +1698,37 @@ class WorkflowDatabase:
                     stats["errors"] += 1
                     continue
 
+                previous = conn.execute(
+                    "SELECT integrations, file_hash FROM workflows WHERE filename = ?",
+                    (workflow_data["filename"],),
+                ).fetchone()
+                previous_integrations = (
+                    json.loads(previous["integrations"] or "[]") if previous else []
+                )
+
+                conn.execute("SAVEPOINT index_file")
+                in_savepoint = True
+
+                # REPLACE gives the row a new id; drop the old postings
+                for table in WORKFLOW_SIDE_TABLES:
+                    conn.execute(
+                        f"""
+                        DELETE FROM {table} WHERE workflow_id IN (
+                            SELECT id FROM workflows WHERE filename = ?
+                        )
+                    """,
+                        (workflow_data["filename"],),
+                    )
+
                 # Insert or update in database
-                conn.execute(
-                    """
+                cursor = conn.execute(
+                    f"""
                     INSERT OR REPLACE INTO workflows (
                         filename, name, workflow_id, active, description, trigger_type,
                         complexity, node_count, integrations, tags, created_at, updated_at,
-                        file_hash, file_size, analyzed_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                        file_hash, file_size, analyzed_at, {", ".join(GRAPH_METRIC_COLUMNS.values())}
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP,
+                        {", ".join("?" * len(GRAPH_METRIC_COLUMNS))})
                 """,
                     (
                         workflow_data["filename"],
@@ -518,24 +1745,232 @@ class WorkflowDatabase:
                         workflow_data["updated_at"],
                         workflow_data["file_hash"],
                         workflow_data["file_size"],
+                        *(
+                            workflow_data["graph_metrics"][metric]
+                            for metric in GRAPH_METRIC_COLUMNS
+                        ),
+                    ),
+                )
+                conn.executemany(
+                    "INSERT INTO workflow_nodes (workflow_id, node_type, count) VALUES (?, ?, ?)",
+                    [
+                        (cursor.lastrowid, node_type, count)
+                        for node_type, count in workflow_data["node_types"].items()
+                    ],
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO workflow_integrations (integration, workflow_id) VALUES (?, ?)",
+                    [
+                        (integration, cursor.lastrowid)
+                        for integration in workflow_data["integrations"]
+                    ],
+                )
+                conn.executemany(
+                    "INSERT INTO workflow_edge_grams (gram, workflow_id) VALUES (?, ?)",
+                    [(gram, cursor.lastrowid) for gram in workflow_data["edge_grams"]],
+                )
+                conn.execute(
+                    "INSERT INTO workflow_graphs (workflow_id, graph) VALUES (?, ?)",
+                    (cursor.lastrowid, json.dumps(workflow_data["graph"])),
+                )
+                conn.execute(
+                    "INSERT INTO workflow_vectors (workflow_id, columns, weights) VALUES (?, ?, ?)",
+                    (
+                        cursor.lastrowid,
+                        *hash_term_weights(
+                            workflow_term_weights(
+                                workflow_data["name"],
+                                workflow_data["description"],
+                                workflow_data["integrations"],
+                                workflow_data["node_types"],
+                            )
+                        ),
                     ),
                 )
+                signature = minhash_signature(
+                    similarity_features(
+                        workflow_data["node_types"], workflow_data["integrations"]
+                    )
+                )
+                if signature is not None:
+                    conn.execute(
+                        "INSERT INTO workflow_minhash (workflow_id, signature) VALUES (?, ?)",
+                        (cursor.lastrowid, signature.tobytes()),
+                    )
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO workflow_lsh_buckets (band, bucket, workflow_id) VALUES (?, ?, ?)",
+                        [
+                            (band, bucket, cursor.lastrowid)
+                            for band, bucket in enumerate(lsh_buckets(signature))
+                        ],
+                    )
+
+                apply_cooccurrence_delta(conn, previous_integrations, -1)
+                apply_cooccurrence_delta(conn, workflow_data["integrations"], 1)
+                conn.execute("RELEASE index_file")
+                in_savepoint = False
+
+                # A NULL hash was cleared by a migration (or predates hashing),
+                # not changed by an edit, so neither it nor a forced reindex of
+                # an unchanged file counts as an update
+                if previous is None:
+                    changes["added"] += 1
+                    count_integrations(workflow_data["integrations"], 1)
+                elif previous["file_hash"] not in (None, workflow_data["file_hash"]):
+                    changes["updated"] += 1
+                    count_integrations(previous_integrations, -1)
+                    count_integrations(workflow_data["integrations"], 1)
 
                 stats["processed"] += 1
 
             except Exception as e:
+                if in_savepoint:
+                    conn.execute("ROLLBACK TO index_file")
+                    conn.execute("RELEASE index_file")
                 print(f"Error processing {file_path}: {str(e)}")
                 stats["errors"] += 1
                 continue
 
+        # Files that disappeared from the directory leave the index, unless
+        # so many vanished that the directory is more likely incomplete
+        present = {os.path.basename(file_path) for file_path in json_files}
+        indexed = conn.execute(
+            "SELECT id, filename, integrations FROM workflows"
+        ).fetchall()
+        missing = [row for row in indexed if row["filename"] not in present]
+        if len(missing) > MAX_REMOVED_FRACTION * len(indexed) and not force_reindex:
+            print(
+                f"Warning: {len(missing)} of {len(indexed)} indexed workflows are "
+                f"missing from '{self.workflows_dir}'; not removing them. "
+                "Reindex with force_reindex=True if they were deleted."
+            )
+            missing = []
+        for row in missing:
+            for table in WORKFLOW_SIDE_TABLES:
+                conn.execute(f"DELETE FROM {table} WHERE workflow_id = ?", (row["id"],))
+            conn.execute("DELETE FROM workflows WHERE id = ?", (row["id"],))
+            removed_integrations = json.loads(row["integrations"] or "[]")
+            apply_cooccurrence_delta(conn, removed_integrations, -1)
+            count_integrations(removed_integrations, -1)
+            stats["removed"] += 1
+
+        if stats["processed"] or stats["removed"]:
+            self.rebuild_search_terms(conn)
+            if self.tokenizer_mode == "cjk":
+                self.rebuild_cjk_index(conn)
+            self.bump_index_generation(conn)
+
+        integration_deltas = {
+            integration: delta
+            for integration, delta in integration_deltas.items()
+            if delta
+        }
+        if (
+            changes["added"]
+            or changes["updated"]
+            or stats["removed"]
+            or integration_deltas
+        ):
+            self.record_index_changes(
+                conn,
+                changes["added"],
+                changes["updated"],
+                stats["removed"],
+                integration_deltas,
+            )
+
         conn.commit()
         conn.close()
+        # Let this process's caches see the new generation right away
+        self._generation_check.reset()
 
         print(
-            f"✅ Indexing complete: {stats['processed']} processed, {stats['skipped']} skipped, {stats['errors']} errors"
+            f"✅ Indexing complete: {stats['processed']} processed, {stats['skipped']} skipped, "
+            f"{stats['removed']} removed, {stats['errors']} errors"
         )
         return stats
 
+    def row_to_workflow(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a workflows row to a dict with parsed JSON fields."""
+        workflow = dict(row)
+        workflow["integrations"] = json.loads(workflow["integrations"] or "[]")
+
+        # Parse tags and convert dict tags to strings
+        raw_tags = json.loads(workflow["tags"] or "[]")
+        clean_tags = []
+        for tag in raw_tags:
+            if isinstance(tag, dict):
+                # Extract name from tag dict if available
+                clean_tags.append(tag.get("name", str(tag.get("id", "tag"))))
+            else:
+                clean_tags.append(str(tag))
+        workflow["tags"] = clean_tags
+
+        return workflow
+
+    def iter_workflows(
+        self,
+        trigger_filter: str = "all",
+        complexity_filter: str = "all",
+        active_only: bool = False,
+        batch_size: int = 500,
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream every matching workflow from a cursor, without a row limit.
+
+        Rows are fetched in batches of ``batch_size`` so memory stays flat no
+        matter how large the corpus is. The connection may be consumed from a
+        different thread than the one that created it (e.g. a threadpool
+        driving a streaming HTTP response).
+        """
+        self.ensure_schema()
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+
+        where_conditions = ["1=1"]
+        params = []
+
+        if active_only:
+            where_conditions.append("active = 1")
+
+        if trigger_filter != "all":
+            where_conditions.append("trigger_type = ?")
+            params.append(trigger_filter)
+
+        if complexity_filter != "all":
+            where_conditions.append("complexity = ?")
+            params.append(complexity_filter)
+
+        try:
+            # Filename order keeps positions stable across reindexing, which
+            # INSERT OR REPLACE does not guarantee for ids
+            cursor = conn.execute(
+                f"SELECT * FROM workflows WHERE {' AND '.join(where_conditions)} ORDER BY filename",
+                params,
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield self.row_to_workflow(row)
+        finally:
+            conn.close()
+
+    def cached_search(self, key: tuple, compute) -> Tuple[List[Dict], int]:
+        """Serve a (results, total) pair from the result cache or compute it.
+
+        Callers get deep copies of the result dicts, so mutating them (or the
+        lists inside) never alters the cached entry.
+        """
+        generation = self.current_index_generation()
+        cached = self.result_cache.get(key, generation)
+        if cached is None:
+            cached = compute()
+            self.result_cache.set(key, cached, generation)
+
+        results, total = cached
+        return copy_result(results), total
+
     def search_workflows(
         self,
         query: str = "",
@@ -544,10 +1979,73 @@ class WorkflowDatabase:
         active_only: bool = False,
         limit: int = 50,
         offset: int = 0,
+        node_types: Optional[List[str]] = None,
+        metric_ranges: Optional[Dict[str, Tuple[Optional[int], Optional[int]]]] = None,
+        sort_by: str = "",
+        sort_desc: bool = True,
     ) -> Tuple[List[Dict], int]:
-        """Fast search with filters and pagination."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        """Fast search with filters and pagination.
+
+        ``node_types`` keeps only workflows containing every listed node type.
+        ``metric_ranges`` maps graph metric names (see GRAPH_METRIC_COLUMNS) to
+        inclusive (min, max) bounds, either of which may be None; ``sort_by``
+        orders by one of those metrics instead of relevance or recency.
+        """
+        node_types = sorted(
+            {normalize_node_type(t) for t in node_types or [] if t.strip()}
+        )
+        metric_ranges = {
+            metric: bounds
+            for metric, bounds in (metric_ranges or {}).items()
+            if bounds != (None, None)
+        }
+        for metric in [*metric_ranges, *([sort_by] if sort_by else [])]:
+            if metric not in GRAPH_METRIC_COLUMNS:
+                raise ValueError(f"Unknown graph metric: {metric}")
+
+        key = (
+            "search",
+            normalize_query(query),
+            trigger_filter,
+            complexity_filter,
+            bool(active_only),
+            limit,
+            offset,
+            tuple(node_types),
+            tuple(sorted(metric_ranges.items())),
+            sort_by,
+            sort_desc,
+        )
+        return self.cached_search(
+            key,
+            lambda: self._search_workflows_uncached(
+                query,
+                trigger_filter,
+                complexity_filter,
+                active_only,
+                limit,
+                offset,
+                node_types,
+                metric_ranges,
+                sort_by,
+                sort_desc,
+            ),
+        )
+
+    def _search_workflows_uncached(
+        self,
+        query: str,
+        trigger_filter: str,
+        complexity_filter: str,
+        active_only: bool,
+        limit: int,
+        offset: int,
+        node_types: List[str],
+        metric_ranges: Dict[str, Tuple[Optional[int], Optional[int]]],
+        sort_by: str,
+        sort_desc: bool,
+    ) -> Tuple[List[Dict], int]:
+        conn = self.get_db_connection()
 
         # Build WHERE clause
         where_conditions = []
@@ -564,16 +2062,52 @@ class WorkflowDatabase:
             where_conditions.append("w.complexity = ?")
             params.append(complexity_filter)
 
+        if node_types:
+            # Intersect the posting lists; each is a range of the primary key
+            postings = " INTERSECT ".join(
+                ["SELECT workflow_id FROM workflow_nodes WHERE node_type = ?"]
+                * len(node_types)
+            )
+            where_conditions.append(f"w.id IN ({postings})")
+            params.extend(node_types)
+
+        for metric, (minimum, maximum) in metric_ranges.items():
+            column = GRAPH_METRIC_COLUMNS[metric]
+            if minimum is not None:
+                where_conditions.append(f"w.{column} >= ?")
+                params.append(minimum)
+            if maximum is not None:
+                where_conditions.append(f"w.{column} <= ?")
+                params.append(maximum)
+
         # Use FTS search if query provided
         if query.strip():
             # FTS search with ranking
-            base_query = """
-                SELECT w.*, rank
-                FROM workflows_fts fts
+            fts_table, match_query = self.get_fts_source(query)
+            weights = ", ".join(str(weight) for weight in self.bm25_weights)
+            rank = f"bm25({fts_table}, {weights})"
+            stats_join = ""
+            has_stats = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'workflow_stats'"
+            ).fetchone()
+            if self.popularity_weight and has_stats:
+                # bm25() is negative (lower is better); popularity scales it up
+                rank += f"""
+                    * (1 + {self.popularity_weight}
+                        * COALESCE(ws.popularity_score, 0)
+                        / (COALESCE(ws.popularity_score, 0) + {POPULARITY_SATURATION}.0))
+                """
+                stats_join = (
+                    "LEFT JOIN workflow_stats ws ON ws.workflow_id = w.filename"
+                )
+            base_query = f"""
+                SELECT w.*, {rank} AS rank
+                FROM {fts_table} fts
                 JOIN workflows w ON w.id = fts.rowid
-                WHERE workflows_fts MATCH ?
+                {stats_join}
+                WHERE {fts_table} MATCH ?
             """
-            params.insert(0, query)
+            params.insert(0, match_query)
         else:
             # Regular query without FTS
             base_query = """
@@ -587,11 +2121,17 @@ class WorkflowDatabase:
 
         # Count total results
         count_query = f"SELECT COUNT(*) as total FROM ({base_query}) t"
-        cursor = conn.execute(count_query, params)
+        cursor = execute_match(conn, count_query, params)
         total = cursor.fetchone()["total"]
 
         # Get paginated results
-        if query.strip():
+        if sort_by:
+            direction = "DESC" if sort_desc else "ASC"
+            tie_break = "rank" if query.strip() else "w.analyzed_at DESC"
+            base_query += (
+                f" ORDER BY w.{GRAPH_METRIC_COLUMNS[sort_by]} {direction}, {tie_break}"
+            )
+        elif query.strip():
             base_query += " ORDER BY rank"
         else:
             base_query += " ORDER BY w.analyzed_at DESC"
@@ -602,31 +2142,409 @@ class WorkflowDatabase:
         rows = cursor.fetchall()
 
         # Convert to dictionaries and parse JSON fields
-        results = []
+        results = [self.row_to_workflow(row) for row in rows]
+
+        conn.close()
+        return results, total
+
+    def search_by_pattern(
+        self, steps: List[str], limit: int = 50, offset: int = 0
+    ) -> Tuple[List[Dict], int]:
+        """Workflows containing a connected path of the given node types.
+
+        Candidates come from intersecting the edge n-gram posting lists (one
+        per window of up to four steps), then each is verified against its
+        stored graph. Results carry the node names of the matched path.
+        """
+        steps = [step.strip() for step in steps if step.strip()]
+        if not MIN_PATTERN_LENGTH <= len(steps) <= MAX_PATTERN_LENGTH:
+            raise ValueError(
+                f"Patterns need {MIN_PATTERN_LENGTH} to {MAX_PATTERN_LENGTH} steps"
+            )
+
+        return self.cached_search(
+            ("pattern", tuple(steps), limit, offset),
+            lambda: self._search_by_pattern_uncached(steps, limit, offset),
+        )
+
+    def _search_by_pattern_uncached(
+        self, steps: List[str], limit: int, offset: int
+    ) -> Tuple[List[Dict], int]:
+        keys = [pattern_step_key(step) for step in steps]
+        window = min(len(keys), MAX_INDEXED_PATH_LENGTH)
+        grams = {
+            PATTERN_STEP_SEPARATOR.join(keys[start : start + window])
+            for start in range(len(keys) - window + 1)
+        }
+
+        conn = self.get_db_connection()
+        postings = " INTERSECT ".join(
+            ["SELECT workflow_id FROM workflow_edge_grams WHERE gram = ?"] * len(grams)
+        )
+        rows = conn.execute(
+            f"""
+            SELECT w.*, g.graph AS stored_graph
+            FROM workflows w
+            JOIN workflow_graphs g ON g.workflow_id = w.id
+            WHERE w.id IN ({postings})
+            ORDER BY w.analyzed_at DESC, w.id
+        """,
+            sorted(grams),
+        ).fetchall()
+        conn.close()
+
+        # Windows can match in different places; keep only true paths
+        matches = []
         for row in rows:
-            workflow = dict(row)
-            workflow["integrations"] = json.loads(workflow["integrations"] or "[]")
-
-            # Parse tags and convert dict tags to strings
-            raw_tags = json.loads(workflow["tags"] or "[]")
-            clean_tags = []
-            for tag in raw_tags:
-                if isinstance(tag, dict):
-                    # Extract name from tag dict if available
-                    clean_tags.append(tag.get("name", str(tag.get("id", "tag"))))
-                else:
-                    clean_tags.append(str(tag))
-            workflow["tags"] = clean_tags
+            path = find_pattern_path(json.loads(row["stored_graph"]), steps)
+            if path:
+                workflow = self.row_to_workflow(row)
+                del workflow["stored_graph"]
+                workflow["matched_path"] = path
+                matches.append(workflow)
+
+        return matches[offset : offset + limit], len(matches)
+
+    def search_with_fallback(
+        self, query: str = "", **filters
+    ) -> Tuple[List[Dict], int, Optional[str]]:
+        """search_workflows(), retried with typos corrected if nothing matched.
+
+        Returns the results, the total and the corrected query (None when the
+        original query was used).
+        """
+        results, total = self.search_workflows(query, **filters)
+        if total or not query.strip():
+            return results, total, None
+
+        corrected = self.correct_query(query)
+        if not corrected:
+            return results, total, None
+
+        results, total = self.search_workflows(corrected, **filters)
+        return results, total, corrected if total else None
+
+    def get_facet_counts(
+        self,
+        query: str = "",
+        trigger_filter: str = "all",
+        complexity_filter: str = "all",
+        active_only: bool = False,
+        category_filter: str = "all",
+        category_lookup: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """Counts per trigger, complexity, category and integration.
+
+        Each dimension is counted with every filter applied except its own,
+        so a selected trigger still shows how many results the other triggers
+        would give. Integrations are counted over the filtered result set.
+        Categories need ``category_lookup`` (filename -> category).
+
+        Matches are grouped by (trigger, complexity, category) in SQL, so
+        Python only folds the few resulting groups; integrations are grouped
+        from workflow_integrations, or read from integration_counts when
+        nothing is filtered.
+        """
+        conn = self.get_db_connection()
+
+        category_column = "NULL"
+        category_join = ""
+        if category_lookup is not None:
+            conn.execute("""
+                CREATE TEMP TABLE facet_categories (
+                    filename TEXT PRIMARY KEY,
+                    category TEXT NOT NULL
+                ) WITHOUT ROWID
+            """)
+            conn.executemany(
+                "INSERT OR REPLACE INTO facet_categories (filename, category) VALUES (?, ?)",
+                category_lookup.items(),
+            )
+            category_column = "COALESCE(c.category, 'Uncategorized')"
+            category_join = "LEFT JOIN facet_categories c ON c.filename = w.filename"
+
+        params = []
+        if query.strip():
+            fts_table, match_query = self.get_fts_source(query)
+            source = f"FROM {fts_table} fts JOIN workflows w ON w.id = fts.rowid {category_join}"
+            where = f"WHERE {fts_table} MATCH ?"
+            params.append(match_query)
+        else:
+            source = f"FROM workflows w {category_join}"
+            where = "WHERE 1=1"
+
+        if active_only:
+            where += " AND w.active = 1"
+
+        filters = {
+            "trigger": trigger_filter,
+            "complexity": complexity_filter,
+            "category": category_filter if category_lookup is not None else "all",
+        }
+        facets = {
+            "trigger": {},
+            "complexity": {},
+            "category": {},
+            "integration": {},
+        }
+        total = 0
+
+        groups = execute_match(
+            conn,
+            f"""
+            SELECT w.trigger_type AS "trigger", w.complexity AS complexity,
+                {category_column} AS category, COUNT(*) AS workflows
+            {source} {where}
+            GROUP BY 1, 2, 3
+        """,
+            params,
+        )
+        for group in groups:
+            failed = [
+                dimension
+                for dimension, selected in filters.items()
+                if selected != "all" and group[dimension] != selected
+            ]
+
+            # A group counts for a dimension if only that dimension's filter fails
+            for dimension in filters:
+                value = group[dimension]
+                if value is None or failed not in ([], [dimension]):
+                    continue
+                counts = facets[dimension]
+                counts[value] = counts.get(value, 0) + group["workflows"]
 
-            results.append(workflow)
+            if not failed:
+                total += group["workflows"]
+
+        if total:
+            unfiltered = not query.strip() and not active_only
+            if unfiltered and all(selected == "all" for selected in filters.values()):
+                integrations = conn.execute(
+                    "SELECT integration, workflows FROM integration_counts"
+                )
+            else:
+                filter_columns = {
+                    "trigger": "w.trigger_type",
+                    "complexity": "w.complexity",
+                    "category": category_column,
+                }
+                selected_filters = [
+                    (filter_columns[dimension], selected)
+                    for dimension, selected in filters.items()
+                    if selected != "all"
+                ]
+                integrations = conn.execute(
+                    f"""
+                    SELECT i.integration, COUNT(*) AS workflows
+                    {source}
+                    JOIN workflow_integrations i ON i.workflow_id = w.id
+                    {where}
+                    {"".join(f" AND {column} = ?" for column, _ in selected_filters)}
+                    GROUP BY i.integration
+                """,
+                    params + [selected for _, selected in selected_filters],
+                )
+            facets["integration"] = {row[0]: row[1] for row in integrations}
 
         conn.close()
-        return results, total
+
+        if not total and query.strip():
+            corrected = self.correct_query(query)
+            if corrected:
+                result = self.get_facet_counts(
+                    corrected,
+                    trigger_filter,
+                    complexity_filter,
+                    active_only,
+                    category_filter,
+                    category_lookup,
+                )
+                if result["total"]:
+                    result["corrected_query"] = corrected
+                    return result
+
+        return {
+            "total": total,
+            "facets": {
+                dimension: dict(
+                    sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+                )
+                for dimension, counts in facets.items()
+            },
+            "corrected_query": None,
+        }
+
+    def get_corpus_digest(self) -> str:
+        """Digest over every workflow's filename and content hash.
+
+        Changes whenever a workflow is added, removed or modified, so build
+        steps can skip work when the indexed corpus is unchanged.
+        """
+        conn = self.get_db_connection()
+        digest = hashlib.sha256()
+        cursor = conn.execute(
+            "SELECT filename, file_hash FROM workflows ORDER BY filename"
+        )
+        for row in cursor:
+            digest.update(f"{row['filename']}:{row['file_hash']}\n".encode("utf-8"))
+        conn.close()
+        return digest.hexdigest()
+
+    def get_index_generation(self) -> int:
+        """Counter bumped by every indexing run that changed workflows.
+
+        In-memory structures derived from the index (suggestion tries, caches)
+        compare it to decide when to rebuild.
+        """
+        conn = self.get_db_connection()
+        generation = read_index_generation(conn)
+        conn.close()
+        return generation
+
+    def current_index_generation(self) -> int:
+        """get_index_generation(), re-read at most every GENERATION_CHECK_INTERVAL.
+
+        For per-request cache checks; a reindex by another process is noticed
+        within the interval, one by this process immediately.
+        """
+        with self._generation_lock:
+            if self._generation_check.due():
+                self._generation = self.get_index_generation()
+            return self._generation
+
+    def bump_index_generation(self, conn: sqlite3.Connection):
+        """Increment the index generation inside the caller's transaction."""
+        conn.execute("""
+            INSERT INTO schema_info (key, value) VALUES ('index_generation', '1')
+            ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+        """)
+
+    def record_index_changes(
+        self,
+        conn: sqlite3.Connection,
+        added: int,
+        updated: int,
+        removed: int,
+        integration_deltas: Dict[str, int],
+    ):
+        """Append an indexing run to index_changes and fold it into the day's rollups."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        day = utc_day(now)
+        generation = read_index_generation(conn)
+        total, nodes = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(node_count), 0) FROM workflows"
+        ).fetchone()
+
+        conn.execute(
+            """
+            INSERT INTO index_changes (generation, indexed_at, added, updated, removed, integration_deltas)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """,
+            (
+                generation,
+                now.isoformat(),
+                added,
+                updated,
+                removed,
+                json.dumps(integration_deltas, sort_keys=True),
+            ),
+        )
+        conn.execute(
+            """
+            INSERT INTO index_daily_changes (day, runs, added, updated, removed, workflows, nodes)
+            VALUES (?, 1, ?, ?, ?, ?, ?)
+            ON CONFLICT(day) DO UPDATE SET
+                runs = runs + 1,
+                added = added + excluded.added,
+                updated = updated + excluded.updated,
+                removed = removed + excluded.removed,
+                workflows = excluded.workflows,
+                nodes = excluded.nodes
+        """,
+            (day, added, updated, removed, total, nodes),
+        )
+        conn.executemany(
+            """
+            INSERT INTO integration_daily_deltas (day, integration, delta) VALUES (?, ?, ?)
+            ON CONFLICT(day, integration) DO UPDATE SET delta = delta + excluded.delta
+        """,
+            [
+                (day, integration, delta)
+                for integration, delta in integration_deltas.items()
+            ],
+        )
+
+    def get_integration_counts(self) -> Dict[str, int]:
+        """Number of workflows using each integration."""
+        conn = self.get_db_connection()
+        cursor = conn.execute("""
+            SELECT j.value AS integration, COUNT(*) AS count
+            FROM workflows w, json_each(w.integrations) j
+            GROUP BY j.value
+        """)
+        counts = {row["integration"]: row["count"] for row in cursor.fetchall()}
+        conn.close()
+        return counts
+
+    def get_node_type_counts(self, contains: str = "") -> List[Dict[str, Any]]:
+        """Usage per node type: workflows containing it and total node count."""
+        conn = self.get_db_connection()
+        cursor = conn.execute(
+            """
+            SELECT node_type, COUNT(*) AS workflows, SUM(count) AS nodes
+            FROM workflow_nodes
+            WHERE instr(lower(node_type), lower(?)) > 0
+            GROUP BY node_type
+            ORDER BY workflows DESC, node_type
+        """,
+            (contains.strip(),),
+        )
+        counts = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return counts
+
+    def suggest_workflow_names(self, query: str, limit: int = 10) -> List[Dict]:
+        """Workflows whose name contains every query word, the last one as a prefix.
+
+        Served from the FTS5 prefix indexes, so it is cheap enough to call on
+        every keystroke.
+        """
+        tokens = QUERY_TOKEN_PATTERN.findall(query.lower())
+        if not tokens:
+            return []
+
+        fts_table, match_query = self.get_fts_source(query, prefix_last=True)
+        if fts_table == "workflows_fts":
+            terms = [f'"{token}"' for token in tokens[:-1]] + [f'"{tokens[-1]}"*']
+            match_query = " AND ".join(terms)
+
+        conn = self.get_db_connection()
+        cursor = conn.execute(
+            f"""
+            SELECT w.filename, w.name
+            FROM {fts_table}
+            JOIN workflows w ON w.id = {fts_table}.rowid
+            WHERE {fts_table} MATCH ?
+            ORDER BY rank
+            LIMIT ?
+        """,
+            (f"name : ({match_query})", limit),
+        )
+        results = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return results
+
+    def get_workflow_count(self) -> int:
+        """Get the number of indexed workflows without a full stats scan."""
+        conn = self.get_db_connection()
+        total = conn.execute("SELECT COUNT(*) FROM workflows").fetchone()[0]
+        conn.close()
+        return total
 
     def get_stats(self) -> Dict[str, Any]:
         """Get database statistics."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self.get_db_connection()
 
         # Basic counts
         cursor = conn.execute("SELECT COUNT(*) as total FROM workflows")
@@ -744,9 +2662,17 @@ class WorkflowDatabase:
         if category not in categories:
             return [], 0
 
-        services = categories[category]
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        return self.cached_search(
+            ("category", category, limit, offset),
+            lambda: self._search_by_category_uncached(
+                categories[category], limit, offset
+            ),
+        )
+
+    def _search_by_category_uncached(
+        self, services: List[str], limit: int, offset: int
+    ) -> Tuple[List[Dict], int]:
+        conn = self.get_db_connection()
 
         # Build OR conditions for all services in category
         service_conditions = []
@@ -774,19 +2700,7 @@ class WorkflowDatabase:
         rows = cursor.fetchall()
 
         # Convert to dictionaries and parse JSON fields
-        results = []
-        for row in rows:
-            workflow = dict(row)
-            workflow["integrations"] = json.loads(workflow["integrations"] or "[]")
-            raw_tags = json.loads(workflow["tags"] or "[]")
-            clean_tags = []
-            for tag in raw_tags:
-                if isinstance(tag, dict):
-                    clean_tags.append(tag.get("name", str(tag.get("id", "tag"))))
-                else:
-                    clean_tags.append(str(tag))
-            workflow["tags"] = clean_tags
-            results.append(workflow)
+        results = [self.row_to_workflow(row) for row in rows]
 
         conn.close()
         return results, total
@@ -811,7 +2725,9 @@ def main():
         print(f"Indexed {stats['processed']} workflows")
 
     elif args.search:
-        results, total = db.search_workflows(args.search, limit=10)
+        results, total, corrected = db.search_with_fallback(args.search, limit=10)
+        if corrected:
+            print(f"No matches for '{args.search}', showing '{corrected}'")
         print(f"Found {total} workflows:")
         for workflow in results:
             print(
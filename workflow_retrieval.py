@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Offline Workflow Retrieval
+Hashed TF-IDF vectors over each workflow's name, description, integrations
+and node types, ranked by cosine similarity in NumPy. No external services.
+"""
+
+import math
+import re
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from workflow_db import IndexGenerationView, pattern_step_key
+from workflow_similarity import stable_hash
+
+# Terms are hashed into this many columns (the "hashing trick"); a random
+# sign per term keeps colliding terms from simply adding up
+VECTOR_DIMENSIONS = 1 << 12
+
+# Term weight per field, applied before IDF
+FIELD_WEIGHTS = {"name": 2.0, "description": 1.0, "integrations": 2.0, "nodes": 1.0}
+
+WORD_PATTERN = re.compile(r"[^\W_]+")
+STOPWORDS = {
+    "a", "an", "and", "any", "are", "as", "at", "be", "by", "can", "for",
+    "from", "find", "get", "how", "i", "in", "into", "is", "it", "me", "my",
+    "need", "of", "on", "or", "show", "some", "that", "the", "this", "to",
+    "use", "uses", "using", "want", "what", "when", "which", "with", "workflow",
+    "workflows", "you",
+}  # fmt: skip
+
+
+def singular(word: str) -> str:
+    """``word`` without a plain plural "s" ("sheets" -> "sheet", not "access")."""
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def text_terms(text: str) -> List[str]:
+    """Lowercased words without stopwords, with a plain plural "s" removed."""
+    return [
+        singular(word)
+        for word in WORD_PATTERN.findall(text.lower())
+        if len(word) >= 2 and word not in STOPWORDS
+    ]
+
+
+def node_type_term(node_type: str) -> str:
+    """A node type as a single term, singular like query terms:
+    "n8n-nodes-base.googleSheets" -> "googlesheet"."""
+    return singular(pattern_step_key(node_type))
+
+
+def workflow_term_weights(
+    name: str, description: str, integrations: Iterable[str], node_types: Iterable[str]
+) -> Dict[str, float]:
+    """Field-weighted term frequencies of one workflow."""
+    fields = {
+        "name": text_terms(name),
+        "description": text_terms(description or ""),
+        "integrations": [
+            t for integration in integrations for t in text_terms(integration)
+        ],
+        "nodes": [node_type_term(node_type) for node_type in node_types],
+    }
+    weights: Dict[str, float] = {}
+    for field, terms in fields.items():
+        for term in terms:
+            if term:
+                weights[term] = weights.get(term, 0.0) + FIELD_WEIGHTS[field]
+    return weights
+
+
+def hashed_column(term: str) -> Tuple[int, float]:
+    """Column and sign of a term in the hashed vector space."""
+    hashed = stable_hash(term)
+    return hashed % VECTOR_DIMENSIONS, 1.0 if (hashed >> 63) & 1 else -1.0
+
+
+def hash_term_weights(weights: Dict[str, float]) -> Tuple[bytes, bytes]:
+    """Sparse hashed vector as (uint32 column indices, float32 values) blobs.
+
+    Values use sublinear term frequency (1 + log tf); IDF is applied when the
+    matrix is loaded, since it depends on the whole collection.
+    """
+    vector: Dict[int, float] = {}
+    for term, weight in weights.items():
+        column, sign = hashed_column(term)
+        vector[column] = vector.get(column, 0.0) + sign * (1.0 + math.log(weight))
+    columns = sorted(vector)
+    return (
+        np.array(columns, dtype=np.uint32).tobytes(),
+        np.array([vector[c] for c in columns], dtype=np.float32).tobytes(),
+    )
+
+
+class VectorSearchIndex(IndexGenerationView):
+    """Row-normalized TF-IDF matrix of all workflows, kept in memory.
+
+    Loaded from workflow_vectors (written by the indexer for changed files
+    only) and reloaded when the index generation changes. Only non-zero
+    entries are kept, in compressed sparse column (CSC) form: the rows with
+    column c are ``rows[column_starts[c]:column_starts[c + 1]]``, so a query
+    touches only the columns of its own terms and memory grows with the
+    number of terms rather than rows x VECTOR_DIMENSIONS.
+    """
+
+    def __init__(self, db_path: str):
+        super().__init__(db_path)
+        self.workflow_ids = np.zeros(0, dtype=np.int64)
+        self.trigger_types = np.zeros(0, dtype=object)
+        self.idf = np.ones(VECTOR_DIMENSIONS, dtype=np.float32)
+        self.column_starts = np.zeros(VECTOR_DIMENSIONS + 1, dtype=np.int64)
+        self.rows = np.zeros(0, dtype=np.int32)
+        self.values = np.zeros(0, dtype=np.float32)
+
+    def load(self, conn: sqlite3.Connection):
+        rows = conn.execute("""
+            SELECT w.id, w.trigger_type, v.columns, v.weights
+            FROM workflows w
+            JOIN workflow_vectors v ON v.workflow_id = w.id
+            ORDER BY w.id
+        """).fetchall()
+
+        columns = [np.frombuffer(row[2], dtype=np.uint32) for row in rows]
+        values = np.concatenate(
+            [np.frombuffer(row[3], dtype=np.float32) for row in rows]
+            or [np.zeros(0, dtype=np.float32)]
+        )
+        entry_rows = np.repeat(
+            np.arange(len(rows), dtype=np.int32), [len(c) for c in columns]
+        )
+        entry_columns = np.concatenate(columns or [np.zeros(0, dtype=np.uint32)])
+        nonzero = values != 0
+        values, entry_rows = values[nonzero], entry_rows[nonzero]
+        entry_columns = entry_columns[nonzero].astype(np.int64)
+
+        document_frequency = np.bincount(entry_columns, minlength=VECTOR_DIMENSIONS)
+        idf = np.log((1 + len(rows)) / (1 + document_frequency)).astype(np.float32) + 1
+        values = values * idf[entry_columns]
+        norms = np.sqrt(
+            np.bincount(
+                entry_rows, weights=values.astype(np.float64) ** 2, minlength=len(rows)
+            )
+        ).astype(np.float32)
+        values /= np.where(norms > 0, norms, 1)[entry_rows]
+
+        order = np.argsort(entry_columns, kind="stable")
+        self.workflow_ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.trigger_types = np.array([row[1] for row in rows], dtype=object)
+        self.idf = idf
+        self.column_starts = np.concatenate(([0], np.cumsum(document_frequency)))
+        self.rows = entry_rows[order]
+        self.values = values[order]
+
+    def query_vector(self, query: str) -> Optional[Dict[int, float]]:
+        """Normalized query weights by column (only non-zero columns)."""
+        vector: Dict[int, float] = {}
+        for term in text_terms(query):
+            column, sign = hashed_column(term)
+            vector[column] = vector.get(column, 0.0) + sign
+        vector = {
+            column: weight * float(self.idf[column])
+            for column, weight in vector.items()
+            if weight
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        if not norm:
+            return None
+        return {column: weight / norm for column, weight in vector.items()}
+
+    def scores(self, vector: Dict[int, float]) -> np.ndarray:
+        """Cosine similarity of every row to a query vector."""
+        scores = np.zeros(len(self.workflow_ids), dtype=np.float32)
+        for column, weight in vector.items():
+            start, end = self.column_starts[column], self.column_starts[column + 1]
+            scores[self.rows[start:end]] += self.values[start:end] * weight
+        return scores
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        trigger_types: Optional[List[str]] = None,
+    ) -> List[Tuple[int, float]]:
+        """(workflow id, cosine similarity) of the best matches, best first."""
+        self.refresh()
+        vector = self.query_vector(query)
+        if vector is None or not len(self.workflow_ids):
+            return []
+
+        scores = self.scores(vector)
+        if trigger_types:
+            scores = np.where(np.isin(self.trigger_types, trigger_types), scores, 0)
+
+        count = min(limit, len(scores))
+        top = np.argpartition(-scores, count - 1)[:count]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            (int(self.workflow_ids[i]), round(float(scores[i]), 4))
+            for i in top
+            if scores[i] > 0
+        ]
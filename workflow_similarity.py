@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Related Workflows
+MinHash signatures over each workflow's node types and integrations, banded
+into LSH buckets at index time so similar workflows are found without
+comparing every pair.
+"""
+
+import hashlib
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from workflow_db import IndexGenerationView
+
+MINHASH_PERMUTATIONS = 128
+# 32 bands of 4 rows: pairs above ~0.42 estimated Jaccard almost always share
+# a bucket, pairs below ~0.2 rarely do
+LSH_BANDS = 32
+LSH_ROWS = MINHASH_PERMUTATIONS // LSH_BANDS
+
+# Universal hashing (a * x + b) mod p; p < 2**31 keeps a * x inside uint64
+MERSENNE_PRIME = (1 << 31) - 1
+_permutations = np.random.RandomState(42)
+PERMUTATION_A = _permutations.randint(
+    1, MERSENNE_PRIME, size=MINHASH_PERMUTATIONS
+).astype(np.uint64)
+PERMUTATION_B = _permutations.randint(
+    0, MERSENNE_PRIME, size=MINHASH_PERMUTATIONS
+).astype(np.uint64)
+
+
+def stable_hash(value: str, signed: bool = False) -> int:
+    """64-bit hash that, unlike hash(), is the same in every process."""
+    digest = hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=signed)
+
+
+def similarity_features(node_types: Iterable[str], integrations: Iterable[str]) -> set:
+    """The set compared between workflows: node types plus integrations."""
+    return {f"node:{node_type}" for node_type in node_types} | {
+        f"integration:{integration}" for integration in integrations
+    }
+
+
+def minhash_signature(features: set) -> Optional[np.ndarray]:
+    """MINHASH_PERMUTATIONS minimum hash values, or None for an empty set."""
+    if not features:
+        return None
+    values = np.array(
+        [stable_hash(feature) % MERSENNE_PRIME for feature in sorted(features)],
+        dtype=np.uint64,
+    )
+    hashed = (np.outer(values, PERMUTATION_A) + PERMUTATION_B) % MERSENNE_PRIME
+    return hashed.min(axis=0).astype(np.uint32)
+
+
+def lsh_buckets(signature: np.ndarray) -> List[int]:
+    """One bucket id per band; workflows sharing any bucket are candidates."""
+    return [
+        stable_hash(
+            signature[band * LSH_ROWS : (band + 1) * LSH_ROWS].tobytes().hex(),
+            signed=True,  # SQLite integers are signed
+        )
+        for band in range(LSH_BANDS)
+    ]
+
+
+class RelatedWorkflowsIndex(IndexGenerationView):
+    """In-memory view of the stored signatures and buckets.
+
+    Reloaded whenever the index generation changes (checked at most every
+    GENERATION_CHECK_INTERVAL seconds), so lookups never touch the tables: a
+    bucket probe plus one vectorized signature comparison.
+    """
+
+    def __init__(self, db_path: str):
+        super().__init__(db_path)
+        self.filenames: List[str] = []
+        self.names: List[str] = []
+        self.descriptions: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.signatures = np.zeros((0, MINHASH_PERMUTATIONS), dtype=np.uint32)
+        self.row_buckets: List[List[Tuple[int, int]]] = []
+        self.buckets: Dict[Tuple[int, int], List[int]] = {}
+
+    def load(self, conn: sqlite3.Connection):
+        rows = conn.execute("""
+            SELECT w.id, w.filename, w.name, w.description, m.signature
+            FROM workflows w
+            JOIN workflow_minhash m ON m.workflow_id = w.id
+            ORDER BY w.id
+        """).fetchall()
+
+        positions_by_id = {row[0]: index for index, row in enumerate(rows)}
+        filenames = [row[1] for row in rows]
+        signatures = np.frombuffer(
+            b"".join(row[4] for row in rows), dtype=np.uint32
+        ).reshape(len(rows), MINHASH_PERMUTATIONS)
+
+        row_buckets: List[List[Tuple[int, int]]] = [[] for _ in rows]
+        buckets: Dict[Tuple[int, int], List[int]] = {}
+        for band, bucket, workflow_id in conn.execute(
+            "SELECT band, bucket, workflow_id FROM workflow_lsh_buckets"
+        ):
+            position = positions_by_id.get(workflow_id)
+            if position is None:
+                continue
+            row_buckets[position].append((band, bucket))
+            buckets.setdefault((band, bucket), []).append(position)
+
+        self.filenames = filenames
+        self.names = [row[2] for row in rows]
+        self.descriptions = [row[3] or "" for row in rows]
+        self.positions = {filename: i for i, filename in enumerate(filenames)}
+        self.signatures = signatures
+        self.row_buckets = row_buckets
+        self.buckets = buckets
+
+    def related(self, filename: str, limit: int = 5) -> List[Dict]:
+        """Top workflows by estimated Jaccard similarity to ``filename``."""
+        self.refresh()
+        position = self.positions.get(filename)
+        if position is None:
+            return []
+
+        candidates = {
+            candidate
+            for key in self.row_buckets[position]
+            for candidate in self.buckets[key]
+        }
+        candidates.discard(position)
+        if not candidates:
+            return []
+
+        candidates = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarity = (
+            np.count_nonzero(
+                self.signatures[candidates] == self.signatures[position], axis=1
+            )
+            / MINHASH_PERMUTATIONS
+        )
+        # Highest similarity first, ties broken by position for stable output
+        order = np.lexsort((candidates, -similarity))[:limit]
+        return [
+            {
+                "filename": self.filenames[candidates[i]],
+                "name": self.names[candidates[i]],
+                "description": self.descriptions[candidates[i]],
+                "similarity": round(float(similarity[i]), 3),
+            }
+            for i in order
+        ]